@@ -7,19 +7,19 @@ Autor: Sistema Idear
 
 import sys
 import os
-from datetime import datetime
 from pathlib import Path
 import pandas as pd
 
 # Importações dos módulos internos
 from otimizador.io import user_input, config_manager
 from otimizador.utils import (
-    gerar_lista_meses,
     converter_projetos_para_modelo,
     renumerar_instrutores_ativos,
     analisar_distribuicao_instrutores_por_projeto
 )
-from otimizador.core import stage_1, stage_2
+from otimizador.calendario import Calendario
+from otimizador.core import stage_1, stage_2, feasibility, planner
+from otimizador.core.solver_config import capturar_ctrl_c, execucao_interrompida
 from otimizador.reporting import plotting, spreadsheets, pdf_generator
 
 
@@ -55,23 +55,38 @@ def main():
         # ===========================
         print("\n--- Etapa 2: Preparação de Dados ---")
 
-        # Calcular intervalo de datas
-        dt_min = min(datetime.strptime(p.data_inicio, "%d/%m/%Y") for p in projetos_config)
-        dt_max = max(datetime.strptime(p.data_termino, "%d/%m/%Y") for p in projetos_config)
+        # Intervalo de datas (já interpretadas na validação de cada projeto)
+        dt_min = min(p.dt_inicio for p in projetos_config)
+        dt_max = max(p.dt_termino for p in projetos_config)
 
         print(f"Período total: {dt_min.strftime('%d/%m/%Y')} até {dt_max.strftime('%d/%m/%Y')}")
 
-        # Gerar lista de meses
-        meses = gerar_lista_meses(
-            dt_min.strftime("%d/%m/%Y"),
-            dt_max.strftime("%d/%m/%Y")
-        )
-        print(f"Total de meses: {len(meses)}")
+        # Calendário do horizonte: meses, férias e índice de meses ativos compartilhados
+        # pela análise, pelos estágios e relatórios
+        calendario = Calendario.dos_projetos(projetos_config, parametros.meses_ferias)
+        print(f"Total de meses: {len(calendario)}")
 
-        # Identificar índices dos meses de férias
-        meses_ferias_idx = [meses.index(m) for m in parametros.meses_ferias if m in meses]
+        meses_ferias_idx = calendario.meses_ferias_idx
         if meses_ferias_idx:
             print(f"Meses de férias identificados: {len(meses_ferias_idx)}")
+        cobertura = calendario.cobertura
+
+        # Pré-verificação de viabilidade: falha cedo apontando o projeto e o mês culpados
+        analise = feasibility.analisar_viabilidade(projetos_config, calendario, parametros, cobertura)
+        if analise['viavel'] is False:
+            print("\n" + "=" * 80)
+            print("[ERRO CRÍTICO] A configuração é INVIÁVEL (detectado antes da otimização):")
+            for problema in analise['problemas']:
+                print(f"  - {problema['mensagem']}")
+            print("\nSUGESTÕES:")
+            print("  - Revise as datas de início/término e a duração dos projetos apontados.")
+            print("  - Considere flexibilizar (aumentar) o parâmetro 'pico_maximo_turmas'.")
+            print("=" * 80)
+            sys.exit(1)
+        elif analise['viavel'] is None:
+            print(f"Análise de viabilidade inconclusiva ({analise['tempo']:.2f}s); prosseguindo com a otimização.")
+        else:
+            print(f"✓ Análise de viabilidade concluída em {analise['tempo']:.2f}s")
 
         # ===========================
         # ETAPA 3: CONVERSÃO PARA MODELO OTIMIZADO
@@ -79,12 +94,18 @@ def main():
         print("\n--- Etapa 3: Conversão de Projetos ---")
         projetos_modelo = converter_projetos_para_modelo(
             projetos_config,
-            meses,
+            calendario,
             meses_ferias_idx,
             parametros
         )
         print(f"Projetos convertidos: {len(projetos_modelo)}")
 
+        # Tamanho estimado dos modelos e motores previstos (antes de construir qualquer modelo)
+        planner.planejar(projetos_modelo, cobertura, parametros)
+
+        # Solução da execução anterior desta configuração (warm start)
+        solucao_anterior = config_manager.carregar_solucao(calendario) or {}
+
         # ===========================
         # ETAPA 4: OTIMIZAÇÃO - ESTÁGIO 1 (Nivelamento de Demanda)
         # ===========================
@@ -92,11 +113,15 @@ def main():
         print("ESTÁGIO 1: OTIMIZAÇÃO DO CRONOGRAMA (Nivelamento de Demanda)")
         print("=" * 80)
 
-        resultados_estagio1 = stage_1.otimizar_curva_demanda(
-            projetos_modelo,
-            meses,
-            parametros
-        )
+        # Ctrl-C durante os estágios interrompe a busca e segue com a melhor solução encontrada
+        with capturar_ctrl_c():
+            resultados_estagio1 = stage_1.otimizar_curva_demanda(
+                projetos_modelo,
+                calendario,
+                parametros,
+                cobertura,
+                solucao_anterior.get('cronograma')
+            )
 
         if not resultados_estagio1:
             print("\n" + "="*80)
@@ -113,7 +138,7 @@ def main():
             sys.exit(1)
 
         resultados_estagio1['periodo'] = f"{dt_min.strftime('%d/%m/%Y')} a {dt_max.strftime('%d/%m/%Y')}"
-        resultados_estagio1['meses_total'] = len(meses)
+        resultados_estagio1['meses_total'] = len(calendario)
 
         print("\n✓ Estágio 1 concluído com sucesso!")
 
@@ -124,13 +149,16 @@ def main():
         print("ESTÁGIO 2: ATRIBUIÇÃO DE INSTRUTORES E BALANCEAMENTO")
         print("=" * 80)
 
-        resultados_estagio2 = stage_2.otimizar_atribuicao_e_carga(
-            resultados_estagio1['cronograma'],
-            projetos_modelo,
-            meses,
-            meses_ferias_idx,
-            parametros
-        )
+        with capturar_ctrl_c():
+            resultados_estagio2 = stage_2.otimizar_atribuicao_e_carga(
+                resultados_estagio1['cronograma'],
+                projetos_modelo,
+                calendario,
+                meses_ferias_idx,
+                parametros,
+                cobertura,
+                solucao_anterior.get('atribuicoes')
+            )
 
         resultados_estagio2['spread_max_permitido'] = parametros.spread_maximo
 
@@ -139,6 +167,10 @@ def main():
             sys.exit(1)
 
         print("\n✓ Estágio 2 concluído com sucesso!")
+        if execucao_interrompida():
+            print("[!] Execução interrompida: os relatórios usam a melhor solução encontrada (rascunho, "
+                  "sem prova de otimalidade).")
+        config_manager.salvar_solucao(resultados_estagio1, resultados_estagio2, calendario)
 
         # ===========================
         # ETAPA 6: PÓS-PROCESSAMENTO
@@ -172,8 +204,9 @@ def main():
         )
         spreadsheets.gerar_planilha_detalhada(
             resultados_estagio2['atribuicoes'],
-            meses,
-            meses_ferias_idx
+            calendario,
+            meses_ferias_idx,
+            cobertura
         )
 
         print("\n2. Gerando gráficos...")
@@ -183,8 +216,9 @@ def main():
             graficos['projeto_mes'] = plotting.gerar_grafico_turmas_projeto_mes(
                 resultados_estagio2['turmas'],
                 projetos_modelo,
-                meses,
-                meses_ferias_idx
+                calendario,
+                meses_ferias_idx,
+                cobertura
             )
             print("  ✓ Gráfico turmas/projeto/mês")
         except Exception as e:
@@ -213,8 +247,9 @@ def main():
             graficos['prog_rob'], serie_temporal_df = plotting.gerar_grafico_demanda_prog_rob(
                 resultados_estagio2['turmas'],
                 projetos_modelo,
-                meses,
-                meses_ferias_idx
+                calendario,
+                meses_ferias_idx,
+                cobertura
             )
             print("  ✓ Gráfico demanda PROG/ROB")
         except Exception as e:
@@ -228,8 +263,9 @@ def main():
             graficos['conclusoes'] = plotting.plotar_conclusoes_por_mes(
                 resultados_estagio2['turmas'],
                 projetos_modelo,
-                meses,
-                meses_ferias_idx
+                calendario,
+                meses_ferias_idx,
+                cobertura
             )
             print("  ✓ Gráfico conclusões/mês")
         except Exception as e:
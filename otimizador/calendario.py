@@ -0,0 +1,252 @@
+# ARQUIVO: otimizador/calendario.py
+"""
+Estruturas de calendário compartilhadas por todos os estágios e relatórios.
+
+A `CoberturaMeses` pré-calcula, uma única vez por execução, em quais meses de
+calendário uma turma fica ativa dado o seu mês de início e a sua duração,
+pulando os meses de férias (mesma regra de `utils.calcular_meses_ativos`).
+
+O `Calendario` representa o horizonte de planejamento: meses como ordinais
+inteiros (ano * 12 + mês - 1), rótulos ('Jul/26') com índice O(1), máscara de
+férias e a cobertura correspondente. Ele também é a sequência de rótulos, de
+modo que pode ser passado onde antes se usava a lista `meses`.
+"""
+
+from collections.abc import Sequence
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+MESES_ABREVIADOS = ('Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez')
+
+
+def ordinal_mes(data: date) -> int:
+    """Ordinal inteiro do mês de uma data (ano * 12 + mês - 1)."""
+    return data.year * 12 + data.month - 1
+
+
+def rotulo_mes(ordinal: int) -> str:
+    """Rótulo do mês no formato 'Jul/26'."""
+    return f"{MESES_ABREVIADOS[ordinal % 12]}/{ordinal // 12 % 100:02d}"
+
+
+class CoberturaMeses:
+    """
+    Índice (duração, mês de início) -> meses ativos, com consultas O(1).
+
+    Para cada duração é mantida uma matriz booleana de formato
+    (num_meses, num_meses), em que a linha é o mês de início e a coluna o mês
+    de calendário. As listas de meses ativos e o mês de término também ficam
+    em cache. Durações ainda não vistas são calculadas sob demanda.
+    """
+
+    def __init__(self, num_meses: int, meses_ferias_idx: Iterable[int], duracoes: Iterable[int] = ()):
+        self.num_meses = num_meses
+        self.meses_ferias_idx = sorted(set(m for m in meses_ferias_idx if 0 <= m < num_meses))
+
+        self.letivo = np.ones(num_meses, dtype=bool)
+        self.letivo[self.meses_ferias_idx] = False
+        self._meses_letivos = np.flatnonzero(self.letivo)
+        # Posição, na sequência de meses letivos, do primeiro mês letivo >= m
+        self._pos_letivo = np.searchsorted(self._meses_letivos, np.arange(num_meses))
+        # letivos_acumulados[m] = meses letivos antes de m (somas de prefixo, num_meses + 1 posições)
+        self.letivos_acumulados = np.concatenate([[0], np.cumsum(self.letivo)])
+
+        self._matrizes: Dict[int, np.ndarray] = {}
+        self._listas: Dict[int, List[Tuple[int, ...]]] = {}
+        self._fim: Dict[int, np.ndarray] = {}
+        for duracao in duracoes:
+            self._construir(duracao)
+
+    def _construir(self, duracao: int):
+        """Calcula e armazena a matriz de cobertura para uma duração."""
+        matriz = np.zeros((self.num_meses, self.num_meses), dtype=bool)
+        fim = np.full(self.num_meses, -1, dtype=np.int64)
+        listas = []
+        for inicio in range(self.num_meses):
+            pos = self._pos_letivo[inicio]
+            ativos = self._meses_letivos[pos:pos + duracao]
+            matriz[inicio, ativos] = True
+            if len(ativos):
+                fim[inicio] = ativos[-1]
+            listas.append(tuple(int(m) for m in ativos))
+        matriz.setflags(write=False)
+        fim.setflags(write=False)
+        self._matrizes[duracao] = matriz
+        self._listas[duracao] = listas
+        self._fim[duracao] = fim
+
+    def matriz(self, duracao: int) -> np.ndarray:
+        """Matriz booleana somente-leitura [mes_inicio, mes] para a duração."""
+        if duracao not in self._matrizes:
+            self._construir(duracao)
+        return self._matrizes[duracao]
+
+    def linhas(self, duracoes: np.ndarray, inicios: np.ndarray) -> np.ndarray:
+        """Matriz booleana [turma, mes] de várias turmas dadas por colunas de duração e mês de início."""
+        duracoes, inicios = np.asarray(duracoes), np.asarray(inicios)
+        resultado = np.zeros((len(duracoes), self.num_meses), dtype=bool)
+        for duracao in np.unique(duracoes):
+            selecao = duracoes == duracao
+            resultado[selecao] = self.matriz(int(duracao))[inicios[selecao]]
+        return resultado
+
+    def meses_fim(self, duracoes: np.ndarray, inicios: np.ndarray) -> np.ndarray:
+        """Último mês ativo (-1 se nenhum) de várias turmas dadas por colunas de duração e mês de início."""
+        duracoes, inicios = np.asarray(duracoes), np.asarray(inicios)
+        resultado = np.full(len(duracoes), -1, dtype=np.int64)
+        for duracao in np.unique(duracoes):
+            selecao = duracoes == duracao
+            if int(duracao) not in self._fim:
+                self._construir(int(duracao))
+            resultado[selecao] = self._fim[int(duracao)][inicios[selecao]]
+        return resultado
+
+    def janelas_inicio(self, inicios: Iterable[int], terminos: Iterable[int],
+                       duracoes: Iterable[int]) -> Dict[str, np.ndarray]:
+        """
+        Janelas de início de vários projetos em uma única chamada vetorizada.
+
+        Começando no mês s, a turma ocupa os meses letivos de posição
+        letivos_acumulados[s] em diante; ela conclui até o término t se
+        letivos_acumulados[s] + duração <= letivos_acumulados[t + 1]. Como os
+        acumulados são crescentes, os inícios válidos formam o intervalo
+        [início, último início], obtido em O(1) por projeto.
+
+        Returns:
+            Dicionário de arrays (um elemento por projeto): 'inicio_min' e
+            'inicio_max' (primeiro e último mês de início que concluem no prazo,
+            -1 se nenhum), 'folga' (meses letivos da janela além da duração;
+            negativa se o curso não cabe) e 'fim_mais_cedo' (término ao começar
+            no início do projeto, -1 se não cabe no horizonte).
+        """
+        inicios = np.asarray(inicios, dtype=np.int64)
+        duracoes = np.asarray(duracoes, dtype=np.int64)
+        terminos = np.minimum(np.asarray(terminos, dtype=np.int64), self.num_meses - 1)
+
+        # Posição (entre os meses letivos) do último mês de uma turma que começa no último início possível
+        ultima_posicao = self.letivos_acumulados[terminos + 1] - duracoes
+        folga = ultima_posicao - self.letivos_acumulados[inicios]
+        viavel = folga >= 0
+        letivos = self._meses_letivos if len(self._meses_letivos) else np.zeros(1, dtype=np.int64)
+        ultimo_letivo = letivos[np.clip(ultima_posicao, 0, len(letivos) - 1)]
+
+        posicao_fim = self.letivos_acumulados[inicios] + duracoes - 1
+        cabe = posicao_fim < len(self._meses_letivos)
+        fim_mais_cedo = np.full(len(inicios), -1, dtype=np.int64)
+        fim_mais_cedo[cabe] = self._meses_letivos[posicao_fim[cabe]]
+        return {
+            "inicio_min": np.where(viavel, inicios, -1),
+            "inicio_max": np.where(viavel, np.minimum(terminos, ultimo_letivo), -1),
+            "folga": folga,
+            "fim_mais_cedo": fim_mais_cedo,
+        }
+
+    def inicios_letivos(self, inicio_min: int, inicio_max: int) -> List[int]:
+        """Meses letivos entre dois meses de início, inclusive (inícios de turma sem férias)."""
+        return (np.flatnonzero(self.letivo[inicio_min:inicio_max + 1]) + inicio_min).tolist()
+
+    def ativo(self, duracao: int, mes_inicio: int, mes: int) -> bool:
+        """Indica se uma turma (duração, início) está ativa no mês informado."""
+        return bool(self.matriz(duracao)[mes_inicio, mes])
+
+    def meses_ativos(self, duracao: int, mes_inicio: int) -> Tuple[int, ...]:
+        """Meses de calendário em que a turma está ativa, em ordem crescente."""
+        if duracao not in self._listas:
+            self._construir(duracao)
+        return self._listas[duracao][mes_inicio]
+
+    def mes_fim(self, duracao: int, mes_inicio: int) -> int:
+        """Último mês ativo da turma (-1 se ela não chega a ter meses ativos)."""
+        if duracao not in self._fim:
+            self._construir(duracao)
+        return int(self._fim[duracao][mes_inicio])
+
+    def completa(self, duracao: int, mes_inicio: int) -> bool:
+        """Indica se a turma cumpre toda a duração dentro do horizonte."""
+        return len(self.meses_ativos(duracao, mes_inicio)) == duracao
+
+
+def construir_cobertura(num_meses: int, meses_ferias_idx: List[int], projetos: Iterable = ()) -> CoberturaMeses:
+    """Cria a cobertura já pré-calculada para as durações dos projetos informados."""
+    return CoberturaMeses(num_meses, meses_ferias_idx, sorted(set(p.duracao for p in projetos)))
+
+
+class Calendario(Sequence):
+    """
+    Horizonte de planejamento com meses inteiros, construído uma vez por execução.
+
+    Como sequência, contém os rótulos dos meses ('Jan/26', 'Fev/26', ...), e
+    `index`/`in` são O(1). `ordinais` guarda o ordinal de cada mês, `ferias` a
+    máscara booleana dos meses de férias e `cobertura` o índice de meses ativos.
+    """
+
+    def __init__(self, ordinal_inicial: int, num_meses: int, meses_ferias: Iterable[str] = (),
+                 duracoes: Iterable[int] = ()):
+        if num_meses <= 0:
+            raise ValueError("O calendário precisa ter pelo menos um mês.")
+        self.ordinal_inicial = ordinal_inicial
+        self.ordinais = np.arange(ordinal_inicial, ordinal_inicial + num_meses, dtype=np.int64)
+        self.rotulos: List[str] = [rotulo_mes(int(o)) for o in self.ordinais]
+        self.indice_rotulo: Dict[str, int] = {rotulo: idx for idx, rotulo in enumerate(self.rotulos)}
+
+        self.ferias = np.zeros(num_meses, dtype=bool)
+        self.ferias[[self.indice_rotulo[m] for m in meses_ferias if m in self.indice_rotulo]] = True
+        self.meses_ferias_idx: List[int] = np.flatnonzero(self.ferias).tolist()
+        self.cobertura = CoberturaMeses(num_meses, self.meses_ferias_idx, duracoes)
+
+    @classmethod
+    def entre(cls, inicio: date, fim: date, meses_ferias: Iterable[str] = (),
+              duracoes: Iterable[int] = ()) -> 'Calendario':
+        """Calendário com todos os meses de `inicio` a `fim`, inclusive."""
+        if fim < inicio:
+            raise ValueError(f"Data final ({fim:%d/%m/%Y}) deve ser posterior à inicial ({inicio:%d/%m/%Y})")
+        return cls(ordinal_mes(inicio), ordinal_mes(fim) - ordinal_mes(inicio) + 1, meses_ferias, duracoes)
+
+    @classmethod
+    def dos_projetos(cls, projetos_config: Iterable, meses_ferias: Iterable[str] = ()) -> 'Calendario':
+        """Calendário do período coberto pelos projetos, usando as datas já interpretadas na configuração."""
+        projetos_config = list(projetos_config)
+        return cls.entre(min(p.dt_inicio for p in projetos_config), max(p.dt_termino for p in projetos_config),
+                         meses_ferias, sorted({p.duracao_curso for p in projetos_config}))
+
+    @property
+    def num_meses(self) -> int:
+        return len(self.rotulos)
+
+    def __len__(self) -> int:
+        return len(self.rotulos)
+
+    def __getitem__(self, indice):
+        return self.rotulos[indice]
+
+    def __iter__(self):
+        return iter(self.rotulos)
+
+    def __contains__(self, rotulo) -> bool:
+        return rotulo in self.indice_rotulo
+
+    def __eq__(self, outro) -> bool:
+        if isinstance(outro, Calendario):
+            return self.rotulos == outro.rotulos and self.meses_ferias_idx == outro.meses_ferias_idx
+        return isinstance(outro, list) and self.rotulos == outro
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Calendario({self.rotulos[0]} a {self.rotulos[-1]}, {len(self)} meses, férias {self.meses_ferias_idx})"
+
+    def index(self, rotulo: str) -> int:
+        """Índice do mês pelo rótulo ('Jul/26'), em O(1)."""
+        try:
+            return self.indice_rotulo[rotulo]
+        except KeyError:
+            raise ValueError(f"{rotulo!r} não está no calendário") from None
+
+    def indice_da_data(self, data: date) -> int:
+        """Índice do mês que contém a data; ValueError se ela estiver fora do horizonte."""
+        indice = ordinal_mes(data) - self.ordinal_inicial
+        if not 0 <= indice < len(self.rotulos):
+            raise ValueError(f"Data {data:%d/%m/%Y} ({rotulo_mes(ordinal_mes(data))}) não está no período de análise.")
+        return indice
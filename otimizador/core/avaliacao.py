@@ -0,0 +1,197 @@
+# ARQUIVO: otimizador/core/avaliacao.py
+"""
+Avaliação vetorizada de cronogramas e atribuições (NumPy, sem solver).
+
+As métricas usadas pelos relatórios e pelas heurísticas (demanda mensal de
+PROG/ROB, turmas ativas e conclusões por projeto e mês, carga mensal e número
+de turmas por instrutor, spread) são somas das linhas da cobertura de meses,
+acumuladas com `np.add.at` sobre as colunas de `TabelaTurmas`/`Atribuicoes`.
+
+Para busca local, `AvaliadorCronograma` (Estágio 1) e `AvaliadorCargas`
+(Estágio 2) mantêm essas somas e as atualizam a cada movimento somando apenas
+a diferença entre as linhas envolvidas.
+
+As habilidades são indexadas por código: 0 = PROG e 1 = ROB/ROBOTICA.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Import relativo para acessar modelos de dados
+from ..data_models import Turma, Projeto, TabelaTurmas, Atribuicoes
+from ..calendario import CoberturaMeses
+
+
+def codigo_habilidade(habilidade: str) -> int:
+    """Código da habilidade: 0 para 'PROG', 1 para 'ROB'/'ROBOTICA'."""
+    return 0 if habilidade == 'PROG' else 1
+
+
+def linhas_de_cobertura(turmas: Sequence[Turma], cobertura: CoberturaMeses) -> np.ndarray:
+    """Matriz inteira [turma, mês] com 1 nos meses ativos de cada turma."""
+    tabela = TabelaTurmas.de_turmas(turmas)
+    return cobertura.linhas(tabela.duracao, tabela.mes_inicio).astype(np.int64)
+
+
+def demanda_mensal(turmas: Sequence[Turma], cobertura: CoberturaMeses) -> np.ndarray:
+    """Turmas ativas por habilidade e mês, matriz [2, num_meses] (linha 0 = PROG, 1 = ROB)."""
+    tabela = TabelaTurmas.de_turmas(turmas)
+    demanda = np.zeros((2, cobertura.num_meses), dtype=np.int64)
+    np.add.at(demanda, tabela.habilidade, linhas_de_cobertura(tabela, cobertura))
+    return demanda
+
+
+def ativas_por_projeto(turmas: Sequence[Turma], cobertura: CoberturaMeses, por_base: bool = True) -> np.ndarray:
+    """
+    Turmas ativas por projeto e mês. Com `por_base`, as linhas seguem
+    `TabelaTurmas.projetos_base` (ondas somadas); senão, `TabelaTurmas.projetos`.
+    """
+    tabela = TabelaTurmas.de_turmas(turmas)
+    grupos, nomes = (tabela.projeto_base, tabela.projetos_base) if por_base else (tabela.projeto, tabela.projetos)
+    ativas = np.zeros((len(nomes), cobertura.num_meses), dtype=np.int64)
+    np.add.at(ativas, grupos, linhas_de_cobertura(tabela, cobertura))
+    return ativas
+
+
+def conclusoes_por_projeto(turmas: Sequence[Turma], cobertura: CoberturaMeses, por_base: bool = True) -> np.ndarray:
+    """Turmas concluídas (último mês ativo) por projeto e mês, com as linhas como em `ativas_por_projeto`."""
+    tabela = TabelaTurmas.de_turmas(turmas)
+    grupos, nomes = (tabela.projeto_base, tabela.projetos_base) if por_base else (tabela.projeto, tabela.projetos)
+    mes_fim = cobertura.meses_fim(tabela.duracao, tabela.mes_inicio)
+    concluidas = mes_fim >= 0
+    conclusoes = np.zeros((len(nomes), cobertura.num_meses), dtype=np.int64)
+    np.add.at(conclusoes, (grupos[concluidas], mes_fim[concluidas]), 1)
+    return conclusoes
+
+
+def cargas_mensais(atribuicoes: Sequence[Dict], cobertura: CoberturaMeses) -> np.ndarray:
+    """Turmas ativas de cada instrutor por mês, matriz [instrutor, mês] na ordem de `Atribuicoes.instrutores`."""
+    atribuicoes = Atribuicoes.de_lista(atribuicoes)
+    cargas = np.zeros((len(atribuicoes.instrutores), cobertura.num_meses), dtype=np.int64)
+    np.add.at(cargas, atribuicoes.instrutor_da_turma, linhas_de_cobertura(atribuicoes.turmas, cobertura))
+    return cargas
+
+
+def turmas_por_instrutor_e_projeto(atribuicoes: Sequence[Dict], por_base: bool = True) -> np.ndarray:
+    """Número de turmas de cada instrutor em cada projeto, matriz [instrutor, projeto]."""
+    atribuicoes = Atribuicoes.de_lista(atribuicoes)
+    turmas = atribuicoes.turmas
+    grupos, nomes = (turmas.projeto_base, turmas.projetos_base) if por_base else (turmas.projeto, turmas.projetos)
+    contagem = np.zeros((len(atribuicoes.instrutores), len(nomes)), dtype=np.int64)
+    np.add.at(contagem, (atribuicoes.instrutor_da_turma, grupos), 1)
+    return contagem
+
+
+def spread(totais: np.ndarray) -> int:
+    """Diferença entre a maior e a menor carga (número de turmas) dos instrutores com turmas."""
+    usados = totais[totais > 0]
+    return int(usados.max() - usados.min()) if len(usados) else 0
+
+
+class AvaliadorCronograma:
+    """
+    Demanda mensal por habilidade e conclusões por projeto de um cronograma do
+    Estágio 1, com movimentos incrementais.
+
+    Os projetos são indexados na ordem em que foram informados; mover k turmas
+    de um projeto do mês de início a para b soma k x (linha de b - linha de a)
+    à demanda da habilidade, sem reconstruir a curva.
+    """
+
+    def __init__(self, cobertura: CoberturaMeses, duracoes: Iterable[int]):
+        self.cobertura = cobertura
+        self.duracoes = [int(d) for d in duracoes]
+        self.demanda = np.zeros((2, cobertura.num_meses), dtype=np.int64)
+        self.conclusoes = np.zeros((len(self.duracoes), cobertura.num_meses), dtype=np.int64)
+
+    @classmethod
+    def do_cronograma(cls, cronograma: Dict[str, List[Dict]], projetos: List[Projeto],
+                      cobertura: CoberturaMeses) -> 'AvaliadorCronograma':
+        """Avaliador preenchido com um cronograma no formato do Estágio 1 ({projeto: [{'mes_inicio', ...}]})."""
+        avaliador = cls(cobertura, (p.duracao for p in projetos))
+        for p, proj in enumerate(projetos):
+            for crono in cronograma.get(proj.nome, []):
+                avaliador.adicionar(p, codigo_habilidade(crono['habilidade']), crono['mes_inicio'], crono['num_turmas'])
+        return avaliador
+
+    def linha(self, projeto: int, mes_inicio: int) -> np.ndarray:
+        """Meses ativos de uma turma do projeto que começa em `mes_inicio`."""
+        return self.cobertura.matriz(self.duracoes[projeto])[mes_inicio]
+
+    def adicionar(self, projeto: int, habilidade: int, mes_inicio: int, k: int = 1):
+        """Inclui k turmas (ou remove, com k negativo) do projeto e habilidade no mês de início."""
+        self.demanda[habilidade] += k * self.linha(projeto, mes_inicio)
+        fim = self.cobertura.mes_fim(self.duracoes[projeto], mes_inicio)
+        if fim >= 0:
+            self.conclusoes[projeto, fim] += k
+
+    def delta_mover(self, projeto: int, origem: int, destino: int, k: int = 1) -> np.ndarray:
+        """Variação da demanda mensal da habilidade ao mover k turmas do projeto de `origem` para `destino`."""
+        return k * (self.linha(projeto, destino).astype(np.int64) - self.linha(projeto, origem))
+
+    def mover(self, projeto: int, habilidade: int, origem: int, destino: int, k: int = 1):
+        """Move k turmas do projeto e habilidade do mês de início `origem` para `destino`."""
+        self.adicionar(projeto, habilidade, origem, -k)
+        self.adicionar(projeto, habilidade, destino, k)
+
+    def picos(self) -> Tuple[int, int]:
+        """Picos de demanda (PROG, ROB)."""
+        return int(self.demanda[0].max()), int(self.demanda[1].max())
+
+
+class AvaliadorCargas:
+    """
+    Carga mensal e número de turmas por instrutor de uma atribuição, com
+    reatribuições incrementais.
+
+    Trabalha sobre as linhas de cobertura das turmas e o vetor turma -> índice
+    do instrutor, que é alterado no lugar a cada reatribuição.
+    """
+
+    def __init__(self, linhas: np.ndarray, instrutor_da_turma: np.ndarray, num_instrutores: Optional[int] = None):
+        self.linhas = linhas
+        self.instrutor_da_turma = instrutor_da_turma
+        if num_instrutores is None:
+            num_instrutores = int(instrutor_da_turma.max()) + 1 if len(instrutor_da_turma) else 0
+        self.carga_mensal = np.zeros((num_instrutores, linhas.shape[1]), dtype=linhas.dtype)
+        np.add.at(self.carga_mensal, instrutor_da_turma, linhas)
+        self.totais = np.bincount(instrutor_da_turma, minlength=num_instrutores)
+
+    @classmethod
+    def de_atribuicoes(cls, atribuicoes: Sequence[Dict], cobertura: CoberturaMeses) -> 'AvaliadorCargas':
+        """Avaliador de uma atribuição do Estágio 2 (instrutores na ordem de `Atribuicoes.instrutores`)."""
+        atribuicoes = Atribuicoes.de_lista(atribuicoes)
+        return cls(linhas_de_cobertura(atribuicoes.turmas, cobertura), atribuicoes.instrutor_da_turma.copy(),
+                   len(atribuicoes.instrutores))
+
+    def cabe(self, turma: int, instrutor: int, capacidade: int) -> bool:
+        """Indica se o instrutor recebe a turma sem passar da capacidade em nenhum mês."""
+        return bool(((self.carga_mensal[instrutor] + self.linhas[turma]) <= capacidade).all())
+
+    def totais_com_reatribuicao(self, turma: int, destino: int) -> np.ndarray:
+        """Número de turmas por instrutor caso a turma passe para `destino` (sem aplicar)."""
+        totais = self.totais.copy()
+        totais[self.instrutor_da_turma[turma]] -= 1
+        totais[destino] += 1
+        return totais
+
+    def reatribuir(self, turma: int, destino: int):
+        """Passa a turma do instrutor atual para `destino`."""
+        origem = self.instrutor_da_turma[turma]
+        self.carga_mensal[origem] -= self.linhas[turma]
+        self.carga_mensal[destino] += self.linhas[turma]
+        self.totais[origem] -= 1
+        self.totais[destino] += 1
+        self.instrutor_da_turma[turma] = destino
+
+    def abrir_instrutor(self) -> int:
+        """Acrescenta um instrutor sem turmas e retorna o seu índice."""
+        self.carga_mensal = np.vstack([self.carga_mensal, np.zeros((1, self.carga_mensal.shape[1]),
+                                                                   dtype=self.carga_mensal.dtype)])
+        self.totais = np.append(self.totais, 0)
+        return len(self.totais) - 1
+
+    def spread(self) -> int:
+        """Spread entre os instrutores com turmas."""
+        return spread(self.totais)
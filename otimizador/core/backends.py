@@ -0,0 +1,289 @@
+# ARQUIVO: otimizador/core/backends.py
+"""
+Interface comum aos solvers usados pelos modelos lineares dos estágios.
+
+Um backend cria variáveis inteiras, recebe restrições e objetivos lineares
+(montados com os operadores da própria biblioteca), aceita dicas, resolve com
+limite de tempo e devolve os valores da solução. Estão disponíveis o CP-SAT
+e os solvers MIP do OR-Tools (SCIP e CBC, via pywraplp). A heurística não é
+um backend: ela é escolhida pelo motor de cada estágio.
+
+Os status seguem os nomes do CP-SAT: 'OPTIMAL', 'FEASIBLE', 'INFEASIBLE',
+'MODEL_INVALID' e 'UNKNOWN'.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+from ortools.sat.python import cp_model
+
+# Import relativo para acessar modelos de dados
+from ..data_models import ParametrosOtimizacao
+from .solver_config import configurar_solver, capturar_ctrl_c, CriterioParada
+
+# Chamado a cada solução encontrada com uma função que lê o valor de uma variável e o valor do objetivo
+CallbackSolucao = Callable[[Callable, float], None]
+
+STATUS_COM_SOLUCAO = ('OPTIMAL', 'FEASIBLE')
+
+
+class BackendSolver(ABC):
+    """Operações de construção e resolução comuns a todos os backends."""
+
+    nome = ''
+
+    @abstractmethod
+    def nova_inteira(self, minimo: int, maximo: int, nome: str):
+        """Nova variável inteira no intervalo [minimo, maximo]."""
+
+    @abstractmethod
+    def nova_booleana(self, nome: str):
+        """Nova variável 0/1."""
+
+    @abstractmethod
+    def soma(self, termos: List):
+        """Expressão linear com a soma dos termos."""
+
+    @abstractmethod
+    def adicionar(self, restricao):
+        """Adiciona uma restrição linear (por exemplo, `x + y <= 3`)."""
+
+    @abstractmethod
+    def minimizar(self, expressao):
+        """Define o objetivo, substituindo o anterior."""
+
+    @abstractmethod
+    def dica(self, variavel, valor: int):
+        """Valor sugerido para a variável na próxima resolução."""
+
+    @abstractmethod
+    def limpar_dicas(self):
+        """Descarta as dicas informadas até aqui."""
+
+    @abstractmethod
+    def resolver(self, tempo_limite: float, ao_encontrar_solucao: Optional[CallbackSolucao] = None,
+                 registrar_log: bool = False, criterio: Optional[CriterioParada] = None) -> str:
+        """
+        Resolve o modelo e retorna o nome do status. Com `criterio`, a busca pode
+        parar antes do tempo; se parou no limite inferior, o status é 'OPTIMAL'.
+        `ao_encontrar_solucao` é chamado a cada solução que o backend consegue
+        observar (ver a documentação de cada backend).
+        """
+
+    @abstractmethod
+    def valor(self, variavel) -> int:
+        """Valor da variável na solução."""
+
+    @abstractmethod
+    def valores(self, variaveis: List) -> np.ndarray:
+        """Valores de várias variáveis da solução, lidos em bloco."""
+
+    @abstractmethod
+    def valor_objetivo(self) -> float:
+        """Valor do objetivo na solução."""
+
+    @abstractmethod
+    def limite_objetivo(self) -> float:
+        """Melhor limite inferior do objetivo provado pelo solver."""
+
+
+class _CallbackCpSat(cp_model.CpSolverSolutionCallback):
+    """
+    Repassa cada solução do CP-SAT ao callback genérico do backend e ao critério
+    de parada, e guarda o vetor completo da última solução (lido de uma vez).
+    """
+
+    def __init__(self, ao_encontrar_solucao: Optional[CallbackSolucao], criterio: Optional[CriterioParada]):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.__ao_encontrar_solucao = ao_encontrar_solucao
+        self.__criterio = criterio
+        self.solucao: Optional[np.ndarray] = None
+        self.objetivo: Optional[float] = None
+
+    def on_solution_callback(self):
+        # Cada solução informada pelo CP-SAT melhora a anterior
+        self.solucao = np.asarray(self.Response().solution, dtype=np.int64)
+        self.objetivo = self.ObjectiveValue()
+        if self.__ao_encontrar_solucao is not None:
+            self.__ao_encontrar_solucao(self.Value, self.objetivo)
+        if self.__criterio is not None and self.__criterio.nova_solucao(self.objetivo, self.BestObjectiveBound(),
+                                                                        self.DeterministicTime()):
+            self.StopSearch()
+
+
+class BackendCpSat(BackendSolver):
+    """
+    CP-SAT, configurado por `configurar_solver` a cada resolução.
+
+    O callback é chamado a cada solução encontrada. Se a busca terminar sem
+    devolver solução (p.ex. um KeyboardInterrupt que escape da captura do
+    Ctrl-C), vale a última solução vista pelo callback, com status 'FEASIBLE'.
+    O modelo (`model`) fica acessível para formulações que só o CP-SAT
+    aceita, como intervalos e restrições cumulativas.
+    """
+
+    nome = 'cpsat'
+
+    def __init__(self, parametros: ParametrosOtimizacao):
+        self.parametros = parametros
+        self.model = cp_model.CpModel()
+        self.solver = cp_model.CpSolver()
+        self._solucao: Optional[np.ndarray] = None
+        self._objetivo: Optional[float] = None
+
+    def nova_inteira(self, minimo: int, maximo: int, nome: str):
+        return self.model.NewIntVar(minimo, maximo, nome)
+
+    def nova_booleana(self, nome: str):
+        return self.model.NewBoolVar(nome)
+
+    def soma(self, termos: List):
+        return cp_model.LinearExpr.Sum(termos)
+
+    def adicionar(self, restricao):
+        self.model.Add(restricao)
+
+    def minimizar(self, expressao):
+        self.model.Minimize(expressao)
+
+    def dica(self, variavel, valor: int):
+        self.model.AddHint(variavel, int(valor))
+
+    def limpar_dicas(self):
+        self.model.ClearHints()
+
+    def resolver(self, tempo_limite: float, ao_encontrar_solucao: Optional[CallbackSolucao] = None,
+                 registrar_log: bool = False, criterio: Optional[CriterioParada] = None) -> str:
+        self.solver = cp_model.CpSolver()
+        configurar_solver(self.solver, self.parametros, max(1.0, tempo_limite))
+        self.solver.parameters.log_search_progress = registrar_log
+        callback = _CallbackCpSat(ao_encontrar_solucao, criterio)
+        vigia = capturar_ctrl_c(self.solver.StopSearch) if criterio is None \
+            else criterio.vigiar(self.solver.StopSearch)
+        try:
+            with vigia:
+                status = self.solver.StatusName(self.solver.Solve(self.model, callback))
+        except KeyboardInterrupt:
+            if criterio is not None:
+                criterio.motivo = 'interrompido'
+            status = 'UNKNOWN'
+        if status in STATUS_COM_SOLUCAO:
+            self._solucao = np.asarray(self.solver.ResponseProto().solution, dtype=np.int64)
+            self._objetivo = self.solver.ObjectiveValue()
+            if status == 'FEASIBLE' and criterio is not None and criterio.limite_atingido:
+                status = 'OPTIMAL'
+        elif callback.solucao is not None:
+            print("[!] Usando a última solução capturada durante a busca.")
+            self._solucao, self._objetivo, status = callback.solucao, callback.objetivo, 'FEASIBLE'
+        else:
+            self._solucao = self._objetivo = None
+        return status
+
+    def valor(self, variavel) -> int:
+        return int(self._solucao[variavel.Index()])
+
+    def valores(self, variaveis: List) -> np.ndarray:
+        return self._solucao[np.fromiter((v.Index() for v in variaveis), dtype=np.int64, count=len(variaveis))]
+
+    def valor_objetivo(self) -> float:
+        return self._objetivo
+
+    def limite_objetivo(self) -> float:
+        return self.solver.BestObjectiveBound()
+
+
+class BackendLinear(BackendSolver):
+    """
+    Solvers MIP do OR-Tools (SCIP ou CBC) via pywraplp.
+
+    O pywraplp não expõe as soluções intermediárias em Python: o callback é
+    chamado uma única vez, ao final, com a solução devolvida pelo solver (não
+    há progresso durante a busca). Do critério de parada valem o
+    gap relativo (repassado ao solver como RELATIVE_MIP_GAP), o Ctrl-C e o tempo
+    sem melhoria, estes dois via InterruptSolve.
+    """
+
+    _STATUS = {
+        pywraplp.Solver.OPTIMAL: 'OPTIMAL',
+        pywraplp.Solver.FEASIBLE: 'FEASIBLE',
+        pywraplp.Solver.INFEASIBLE: 'INFEASIBLE',
+        pywraplp.Solver.MODEL_INVALID: 'MODEL_INVALID',
+    }
+
+    def __init__(self, parametros: ParametrosOtimizacao, nome_solver: str):
+        self.parametros = parametros
+        self.nome = nome_solver.lower()
+        self.solver = pywraplp.Solver.CreateSolver(nome_solver.upper())
+        if self.solver is None:
+            raise ValueError(f"Solver '{nome_solver}' indisponível nesta instalação do OR-Tools.")
+        self._dicas: Dict = {}
+
+    def nova_inteira(self, minimo: int, maximo: int, nome: str):
+        return self.solver.IntVar(minimo, maximo, nome)
+
+    def nova_booleana(self, nome: str):
+        return self.solver.BoolVar(nome)
+
+    def soma(self, termos: List):
+        return self.solver.Sum(termos)
+
+    def adicionar(self, restricao):
+        self.solver.Add(restricao)
+
+    def minimizar(self, expressao):
+        self.solver.Minimize(expressao)
+
+    def dica(self, variavel, valor: int):
+        self._dicas[variavel.index()] = (variavel, float(valor))
+
+    def limpar_dicas(self):
+        self._dicas = {}
+
+    def resolver(self, tempo_limite: float, ao_encontrar_solucao: Optional[CallbackSolucao] = None,
+                 registrar_log: bool = False, criterio: Optional[CriterioParada] = None) -> str:
+        if self._dicas:
+            variaveis, valores = zip(*self._dicas.values())
+            self.solver.SetHint(list(variaveis), list(valores))
+        if self.parametros.num_workers_solver > 0:
+            self.solver.SetNumThreads(self.parametros.num_workers_solver)
+        self.solver.SetTimeLimit(int(max(1.0, tempo_limite) * 1000))
+        if registrar_log:
+            self.solver.EnableOutput()
+        parametros_mip = pywraplp.MPSolverParameters()
+        if criterio is not None and criterio.gap_relativo > 0:
+            parametros_mip.SetDoubleParam(pywraplp.MPSolverParameters.RELATIVE_MIP_GAP, criterio.gap_relativo)
+        vigia = capturar_ctrl_c(self.solver.InterruptSolve) if criterio is None \
+            else criterio.vigiar(self.solver.InterruptSolve)
+        with vigia:
+            status = self._STATUS.get(self.solver.Solve(parametros_mip), 'UNKNOWN')
+        if status in STATUS_COM_SOLUCAO:
+            if ao_encontrar_solucao is not None:
+                ao_encontrar_solucao(self.valor, self.valor_objetivo())
+            if criterio is not None and criterio.nova_solucao(self.valor_objetivo(), self.limite_objetivo()) \
+                    and criterio.limite_atingido:
+                status = 'OPTIMAL'
+        return status
+
+    def valor(self, variavel) -> int:
+        return int(round(variavel.solution_value()))
+
+    def valores(self, variaveis: List) -> np.ndarray:
+        # O pywraplp não tem leitura em bloco: uma chamada por variável
+        return np.rint([v.solution_value() for v in variaveis]).astype(np.int64)
+
+    def valor_objetivo(self) -> float:
+        return self.solver.Objective().Value()
+
+    def limite_objetivo(self) -> float:
+        return self.solver.Objective().BestBound()
+
+
+def criar_backend(nome: str, parametros: ParametrosOtimizacao) -> BackendSolver:
+    """Instancia o backend pelo nome ('cpsat', 'scip' ou 'cbc')."""
+    if nome == 'cpsat':
+        return BackendCpSat(parametros)
+    if nome in ('scip', 'cbc'):
+        return BackendLinear(parametros, nome)
+    raise ValueError(f"Backend de solver desconhecido: {nome}")
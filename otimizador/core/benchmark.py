@@ -0,0 +1,116 @@
+# ARQUIVO: otimizador/core/benchmark.py
+"""
+Comparação das formulações do Estágio 2 sobre uma configuração salva.
+
+Uso:
+    python -m otimizador.core.benchmark [arquivo_config.json] [--tempo 30] [--motores turmas intervalos]
+
+O Estágio 1 é resolvido uma vez; em seguida cada formulação resolve a mesma
+alocação com o mesmo orçamento de tempo e a mesma dica (a heurística
+construtiva, como no fluxo principal), e são comparados o tempo de construção,
+o tempo de resolução, o status e o resultado.
+"""
+
+import argparse
+import contextlib
+import io
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import List, Dict, Optional, Sequence
+
+from ..calendario import Calendario
+from ..io import config_manager
+from ..utils import converter_projetos_para_modelo
+from . import stage_1, stage_2
+
+
+def preparar_instancia(arquivo_config: Path) -> Dict:
+    """Carrega a configuração, resolve o Estágio 1 e cria as turmas do Estágio 2."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        parametros, projetos_config = config_manager.carregar_configuracao(arquivo_config)
+        calendario = Calendario.dos_projetos(projetos_config, parametros.meses_ferias)
+        projetos_modelo = converter_projetos_para_modelo(projetos_config, calendario, calendario.meses_ferias_idx,
+                                                         parametros)
+        resultados_estagio1 = stage_1.otimizar_curva_demanda(projetos_modelo, calendario, parametros,
+                                                             calendario.cobertura)
+    if not resultados_estagio1:
+        raise ValueError(f"O Estágio 1 não encontrou solução para {arquivo_config}.")
+    return {
+        "parametros": parametros,
+        "num_meses": len(calendario),
+        "cobertura": calendario.cobertura,
+        "turmas": stage_2._criar_turmas(resultados_estagio1['cronograma'], projetos_modelo),
+    }
+
+
+def comparar_formulacoes(arquivo_config: Path,
+                         motores: Sequence[str] = ('turmas', 'coortes', 'intervalos'),
+                         tempo_limite: float = 30.0) -> List[Dict]:
+    """
+    Resolve o Estágio 2 da configuração com cada formulação informada.
+
+    Returns:
+        Uma linha por motor com tempos de construção e resolução, status,
+        número de instrutores, spread e gap da primeira fase.
+    """
+    instancia = preparar_instancia(arquivo_config)
+    turmas = instancia["turmas"]
+    dicas = stage_2._resolver_heuristico(turmas, instancia["parametros"], instancia["num_meses"],
+                                         instancia["cobertura"])["atribuicoes"]
+    linhas = []
+    for motor in motores:
+        parametros = replace(instancia["parametros"], motor_estagio2=motor)
+        inicio = time.time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = stage_2._resolver_pool_dinamico(turmas, parametros, instancia["num_meses"],
+                                                         instancia["cobertura"], tempo_limite, registrar_log=False,
+                                                         dicas=dicas)
+        duracao = time.time() - inicio
+        cargas = list(stage_2._contar_cargas(resultado["atribuicoes"]).values())
+        linhas.append({
+            "motor": motor,
+            "turmas": len(turmas),
+            "construcao": sum(resultado["tempos_construcao"].values()),
+            "resolucao": duracao,
+            "status": resultado["status_solver"],
+            "instrutores": len(cargas) if cargas else None,
+            "spread": max(cargas) - min(cargas) if cargas else None,
+            "gap": resultado["fases"][0]["gap"],
+        })
+    return linhas
+
+
+def _imprimir_tabela(linhas: List[Dict]):
+    """Imprime a comparação em formato de tabela."""
+    print(f"\n{'Motor':<12}{'Turmas':>8}{'Constr.(s)':>12}{'Total(s)':>10}{'Status':>11}"
+          f"{'Instr.':>8}{'Spread':>8}{'Gap F1':>8}")
+    for linha in linhas:
+        gap = f"{linha['gap']:.1%}" if linha['gap'] is not None else "-"
+        print(f"{linha['motor']:<12}{linha['turmas']:>8}{linha['construcao']:>12.3f}{linha['resolucao']:>10.2f}"
+              f"{linha['status']:>11}{str(linha['instrutores'] or '-'):>8}"
+              f"{'-' if linha['spread'] is None else linha['spread']:>8}{gap:>8}")
+
+
+def main(argumentos: Optional[List[str]] = None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description="Compara as formulações do Estágio 2.")
+    parser.add_argument("config", nargs="?", type=Path,
+                        help="Arquivo de configuração (padrão: a configuração salva mais recente)")
+    parser.add_argument("--tempo", type=float, default=30.0, help="Tempo limite por formulação, em segundos")
+    parser.add_argument("--motores", nargs="+", default=['turmas', 'coortes', 'intervalos'],
+                        choices=['turmas', 'coortes', 'intervalos'])
+    args = parser.parse_args(argumentos)
+
+    arquivo = args.config
+    if arquivo is None:
+        salvas = config_manager.listar_configuracoes_salvas()
+        if not salvas:
+            parser.error("nenhuma configuração salva encontrada; informe o arquivo.")
+        arquivo = salvas[0]
+    print(f"Configuração: {arquivo}")
+    _imprimir_tabela(comparar_formulacoes(arquivo, args.motores, args.tempo))
+
+
+if __name__ == "__main__":
+    main()
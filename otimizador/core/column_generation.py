@@ -0,0 +1,253 @@
+# ARQUIVO: otimizador/core/column_generation.py
+"""
+Motor de particionamento de conjuntos / geração de colunas para o Estágio 2.
+
+Uma "escala" é o conjunto de turmas de um instrutor cuja carga mensal nunca
+passa da capacidade. Turmas de uma mesma habilidade com a mesma duração e o
+mesmo mês de início são intercambiáveis, então uma escala é descrita pelo
+número de turmas de cada tipo (duração, início). O problema mestre escolhe o
+menor número de escalas que cobre todas as turmas:
+
+    min  sum_r x_r   s.a.  sum_r a_rk x_r >= n_k (para cada tipo k),  x_r >= 0
+
+O mestre restrito é resolvido como LP (GLOP) e o subproblema de preço
+(a escala de maior valor dual) com o CP-SAT. Ao final, o mestre inteiro
+(SCIP, ou CBC) escolhe as escalas entre as colunas geradas. O limite de
+Farley z_LP / max(1, valor do preço) é um limite inferior válido a cada
+iteração e coincide com o ótimo do LP quando nenhuma coluna melhora.
+"""
+
+import math
+import time
+from collections import defaultdict
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+from ortools.sat.python import cp_model
+
+# Import relativo para acessar modelos de dados
+from ..data_models import Turma, ParametrosOtimizacao
+from ..calendario import CoberturaMeses
+from .heuristics import balancear_cargas, atribuicoes_dos_vetores
+from .solver_config import configurar_solver, capturar_ctrl_c, execucao_interrompida
+
+# Escala inteira dos valores duais no objetivo do subproblema de preço (CP-SAT)
+ESCALA_DUAIS = 10000
+TOLERANCIA = 1e-6
+
+
+def _tipos_de_turma(turmas_hab: List[Turma]) -> Tuple[List[Tuple[int, int]], List[List[int]]]:
+    """Tipos (duração, mês de início) da habilidade e as posições das turmas de cada tipo."""
+    posicoes = defaultdict(list)
+    for pos, t in enumerate(turmas_hab):
+        posicoes[(t.duracao, t.mes_inicio)].append(pos)
+    tipos = sorted(posicoes)
+    return tipos, [posicoes[tipo] for tipo in tipos]
+
+
+def _colunas_iniciais(turmas_hab: List[Turma], atribuicoes: List[Dict],
+                      indice_tipo: Dict[Tuple[int, int], int]) -> List[np.ndarray]:
+    """Uma coluna por instrutor de uma atribuição conhecida (a heurística construtiva)."""
+    por_instrutor = defaultdict(lambda: np.zeros(len(indice_tipo), dtype=np.int64))
+    ids_hab = {t.id for t in turmas_hab}
+    for atr in atribuicoes:
+        t = atr['turma']
+        if t.id in ids_hab:
+            por_instrutor[atr['instrutor'].id][indice_tipo[(t.duracao, t.mes_inicio)]] += 1
+    return list(por_instrutor.values())
+
+
+class _MestreRestrito:
+    """Mestre restrito em LP (GLOP), ampliado coluna a coluna."""
+
+    def __init__(self, demanda: np.ndarray):
+        self.solver = pywraplp.Solver.CreateSolver('GLOP')
+        self.restricoes = [self.solver.Constraint(float(n), self.solver.infinity()) for n in demanda]
+        self.objetivo = self.solver.Objective()
+        self.objetivo.SetMinimization()
+        self.colunas: List[np.ndarray] = []
+
+    def adicionar(self, coluna: np.ndarray):
+        x = self.solver.NumVar(0.0, self.solver.infinity(), f'x_{len(self.colunas)}')
+        for k in np.flatnonzero(coluna):
+            self.restricoes[k].SetCoefficient(x, float(coluna[k]))
+        self.objetivo.SetCoefficient(x, 1.0)
+        self.colunas.append(coluna)
+
+    def resolver(self) -> Tuple[float, np.ndarray]:
+        """Valor do LP e os duais das restrições de cobertura."""
+        if self.solver.Solve() != pywraplp.Solver.OPTIMAL:
+            raise RuntimeError("Mestre restrito sem solução ótima.")
+        return self.objetivo.Value(), np.array([c.dual_value() for c in self.restricoes])
+
+
+def _precificar(duais: np.ndarray, ativos: np.ndarray, demanda: np.ndarray, capacidade: int,
+                parametros: ParametrosOtimizacao, tempo_limite: float) -> Tuple[Optional[np.ndarray], float]:
+    """
+    Subproblema de preço: a escala viável de maior valor dual sum_k duais_k a_k.
+
+    Returns:
+        A melhor coluna encontrada (ou None) e um limite superior do valor dual ótimo.
+    """
+    uteis = np.flatnonzero(duais > TOLERANCIA)
+    if not len(uteis):
+        return None, 0.0
+    model = cp_model.CpModel()
+    maximo = {k: int(min(demanda[k], capacidade)) for k in uteis}
+    a = {k: model.NewIntVar(0, maximo[k], f'a_{k}') for k in uteis}
+    for linha in {tuple(uteis[ativos[uteis, m]]) for m in range(ativos.shape[1])}:
+        if sum(maximo[k] for k in linha) > capacidade:
+            model.Add(cp_model.LinearExpr.Sum([a[k] for k in linha]) <= capacidade)
+    # Pesos arredondados para cima: o limite do CP-SAT dividido pela escala é um limite superior válido
+    pesos = {k: int(math.ceil(duais[k] * ESCALA_DUAIS)) for k in uteis}
+    model.Maximize(cp_model.LinearExpr.WeightedSum([a[k] for k in uteis], [pesos[k] for k in uteis]))
+
+    solver = cp_model.CpSolver()
+    configurar_solver(solver, parametros, max(0.1, tempo_limite))
+    with capturar_ctrl_c(solver.StopSearch):
+        status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None, float('inf')
+    coluna = np.zeros(len(duais), dtype=np.int64)
+    for k in uteis:
+        coluna[k] = solver.Value(a[k])
+    return coluna, solver.BestObjectiveBound() / ESCALA_DUAIS
+
+
+def _resolver_mestre_inteiro(colunas: List[np.ndarray], demanda: np.ndarray, tempo_limite: float,
+                             dica: Optional[List[int]] = None) -> Optional[np.ndarray]:
+    """Mestre inteiro sobre as colunas geradas: quantas vezes cada escala é usada."""
+    solver = pywraplp.Solver.CreateSolver('SCIP') or pywraplp.Solver.CreateSolver('CBC')
+    if solver is None:
+        return None
+    x = [solver.IntVar(0, int(demanda.sum()), f'x_{r}') for r in range(len(colunas))]
+    for k, n in enumerate(demanda):
+        restricao = solver.Constraint(float(n), solver.infinity())
+        for r, coluna in enumerate(colunas):
+            if coluna[k]:
+                restricao.SetCoefficient(x[r], float(coluna[k]))
+    objetivo = solver.Objective()
+    for var in x:
+        objetivo.SetCoefficient(var, 1.0)
+    objetivo.SetMinimization()
+    if dica:
+        solver.SetHint(x, [float(v) for v in dica])
+    solver.SetTimeLimit(int(max(1.0, tempo_limite) * 1000))
+    if solver.Solve() not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        return None
+    return np.array([int(round(var.solution_value())) for var in x], dtype=np.int64)
+
+
+def _gerar_colunas_habilidade(turmas_hab: List[Turma], atribuicoes_iniciais: List[Dict], num_meses: int,
+                              cobertura: CoberturaMeses, parametros: ParametrosOtimizacao,
+                              tempo_limite: float) -> Dict:
+    """Geração de colunas e mestre inteiro para uma habilidade."""
+    inicio = time.time()
+    capacidade = parametros.capacidade_max_instrutor
+    tipos, posicoes = _tipos_de_turma(turmas_hab)
+    indice_tipo = {tipo: k for k, tipo in enumerate(tipos)}
+    demanda = np.array([len(p) for p in posicoes], dtype=np.int64)
+    ativos = np.array([cobertura.matriz(d)[m] for d, m in tipos], dtype=bool).reshape(len(tipos), num_meses)
+
+    mestre = _MestreRestrito(demanda)
+    iniciais = _colunas_iniciais(turmas_hab, atribuicoes_iniciais, indice_tipo)
+    for coluna in iniciais:
+        mestre.adicionar(coluna)
+
+    tempo_colunas = tempo_limite * 0.7
+    limite_lp, valor_lp, iteracoes, lp_otimo = 0.0, float('inf'), 0, False
+    while time.time() - inicio < tempo_colunas and not execucao_interrompida():
+        valor_lp, duais = mestre.resolver()
+        coluna, valor_preco = _precificar(duais, ativos, demanda, capacidade, parametros,
+                                          tempo_colunas - (time.time() - inicio))
+        iteracoes += 1
+        limite_lp = max(limite_lp, valor_lp / max(1.0, valor_preco))
+        if coluna is None or float(duais @ coluna) <= 1 + TOLERANCIA:
+            lp_otimo = valor_preco <= 1 + TOLERANCIA
+            break
+        mestre.adicionar(coluna)
+
+    # Interrompida (Ctrl-C): sem mestre inteiro, fica com a cobertura da heurística (a dica)
+    interrompido = execucao_interrompida()
+    dica = [1] * len(iniciais) + [0] * (len(mestre.colunas) - len(iniciais))
+    uso = None if interrompido else \
+        _resolver_mestre_inteiro(mestre.colunas, demanda, tempo_limite - (time.time() - inicio), dica)
+    if uso is None:
+        uso = np.array(dica, dtype=np.int64)
+
+    # Escalas escolhidas -> vetor turma -> instrutor (turmas cobertas em excesso são descartadas)
+    vetor = np.full(len(turmas_hab), -1, dtype=np.int64)
+    restantes = [list(p) for p in posicoes]
+    instrutor = 0
+    for r in np.flatnonzero(uso):
+        for _ in range(uso[r]):
+            recebeu = False
+            for k in np.flatnonzero(mestre.colunas[r]):
+                for _ in range(min(mestre.colunas[r][k], len(restantes[k]))):
+                    vetor[restantes[k].pop()] = instrutor
+                    recebeu = True
+            instrutor += recebeu
+    limite_inferior = int(math.ceil(limite_lp - TOLERANCIA))
+    return {
+        "vetor": vetor,
+        "instrutores": instrutor,
+        "limite_lp": limite_lp,
+        "limite_inferior": limite_inferior,
+        "lp_otimo": lp_otimo,
+        "interrompido": interrompido,
+        "colunas": len(mestre.colunas),
+        "iteracoes": iteracoes,
+        "tempo": time.time() - inicio,
+    }
+
+
+def resolver_por_geracao_colunas(turmas: List[Turma], num_meses: int, cobertura: CoberturaMeses,
+                                 parametros: ParametrosOtimizacao, atribuicoes_iniciais: List[Dict],
+                                 tempo_limite: Optional[float] = None) -> Dict:
+    """
+    Alocação do Estágio 2 por geração de colunas, habilidade a habilidade.
+
+    `atribuicoes_iniciais` (a heurística construtiva) fornece as colunas
+    iniciais e a dica do mestre inteiro. As cargas são depois balanceadas
+    entre os instrutores escolhidos, como na heurística, para o spread máximo.
+
+    Returns:
+        Dicionário com 'atribuicoes', 'limite_lp' e 'limite_inferior' por
+        habilidade, 'otimo' (número de instrutores provado mínimo; nunca após
+        uma interrupção) e 'fases'.
+    """
+    tempo_limite = parametros.timeout_segundos if tempo_limite is None else tempo_limite
+    turmas_por_habilidade = defaultdict(list)
+    for t in turmas: turmas_por_habilidade[t.habilidade].append(t)
+
+    resultados, linhas_por_hab, instrutor_por_hab = {}, {}, {}
+    for hab, turmas_hab in turmas_por_habilidade.items():
+        fracao = len(turmas_hab) / max(1, len(turmas))
+        resultados[hab] = _gerar_colunas_habilidade(turmas_hab, atribuicoes_iniciais, num_meses, cobertura,
+                                                    parametros, tempo_limite * fracao)
+        r = resultados[hab]
+        print(f"  • {hab}: {r['instrutores']} instrutores | limite LP {r['limite_lp']:.2f} "
+              f"({'ótimo' if r['lp_otimo'] else 'Farley'}) | {r['colunas']} colunas, "
+              f"{r['iteracoes']} iterações em {r['tempo']:.2f}s")
+        linhas_por_hab[hab] = np.array([cobertura.matriz(t.duracao)[t.mes_inicio] for t in turmas_hab],
+                                       dtype=np.int32)
+        instrutor_por_hab[hab] = r["vetor"]
+
+    if turmas_por_habilidade:
+        balancear_cargas(linhas_por_hab, instrutor_por_hab, parametros.capacidade_max_instrutor,
+                         parametros.spread_maximo)
+    atribuicoes = atribuicoes_dos_vetores(turmas_por_habilidade, instrutor_por_hab,
+                                          parametros.capacidade_max_instrutor)
+    usados = {hab: len(np.unique(vetor)) for hab, vetor in instrutor_por_hab.items()}
+
+    return {
+        "atribuicoes": atribuicoes,
+        "limite_lp": {hab: r["limite_lp"] for hab, r in resultados.items()},
+        "limite_inferior": {hab: r["limite_inferior"] for hab, r in resultados.items()},
+        "otimo": all(usados[hab] <= r["limite_inferior"] and not r["interrompido"] for hab, r in resultados.items()),
+        "fases": [{"fase": "geracao_colunas", "habilidade": hab, "status": "OPTIMAL" if r["lp_otimo"] else "FEASIBLE",
+                   "tempo": r["tempo"], "objetivo": float(usados[hab]), "limite": r["limite_lp"],
+                   "gap": (usados[hab] - r["limite_lp"]) / max(1.0, usados[hab])}
+                  for hab, r in resultados.items()],
+    }
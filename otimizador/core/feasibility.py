@@ -0,0 +1,243 @@
+# ARQUIVO: otimizador/core/feasibility.py
+"""
+Análise de viabilidade executada antes da construção dos modelos.
+
+As verificações analíticas provam inviabilidade em milissegundos e apontam o
+projeto e o mês responsáveis. Quando elas não decidem, um modelo de viabilidade
+do Estágio 1 com suposições (assumptions) do CP-SAT extrai um núcleo inviável.
+"""
+
+import time
+from collections import defaultdict
+from typing import List, Dict, Optional, Sequence
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+# Import relativo para acessar modelos de dados e utils
+from ..data_models import ConfiguracaoProjeto, ParametrosOtimizacao, Turma, Projeto
+from ..calendario import CoberturaMeses
+from ..utils import calcular_janelas_projetos, calcular_turmas_por_projeto
+
+
+def _janelas_inicio(projetos_config: List[ConfiguracaoProjeto], meses: Sequence[str],
+                    cobertura: CoberturaMeses) -> Dict[str, Dict]:
+    """Inícios válidos (sem férias e com término dentro do prazo) e folga de cada projeto."""
+    calculadas = calcular_janelas_projetos(projetos_config, meses, cobertura)
+    janelas = {}
+    for k, config in enumerate(projetos_config):
+        folga = int(calculadas['folga'][k])
+        validos = cobertura.inicios_letivos(config.mes_inicio_idx, int(calculadas['inicio_max'][k])) \
+            if folga >= 0 else []
+        prog, rob = calcular_turmas_por_projeto(config.num_turmas, config.percentual_prog)
+        janelas[config.nome] = {'inicio': config.mes_inicio_idx, 'termino': config.mes_termino_idx,
+                                'validos': validos, 'folga': folga,
+                                'fim_mais_cedo': int(calculadas['fim_mais_cedo'][k]),
+                                'duracao': config.duracao_curso, 'prog': prog, 'rob': rob}
+    return janelas
+
+
+def _verificar_janelas(janelas: Dict, meses: Sequence[str], cobertura: CoberturaMeses) -> List[Dict]:
+    """Projetos sem nenhum mês de início que permita concluir o curso no prazo."""
+    problemas = []
+    for nome, j in janelas.items():
+        if j['validos']:
+            continue
+        detalhe = (f"término mais cedo possível em {meses[j['fim_mais_cedo']]}"
+                   if j['fim_mais_cedo'] >= 0 else "o curso não cabe no horizonte")
+        problemas.append({
+            'tipo': 'janela_vazia', 'projeto': nome, 'mes': meses[j['termino']],
+            'mensagem': (f"Projeto '{nome}': duração de {j['duracao']} meses letivos (pulando férias) não cabe "
+                         f"entre {meses[j['inicio']]} e {meses[j['termino']]} (faltam {-j['folga']} meses "
+                         f"letivos); {detalhe}.")
+        })
+    return problemas
+
+
+def _verificar_demanda_obrigatoria(janelas: Dict, meses: Sequence[str], cobertura: CoberturaMeses,
+                                   pico_maximo: int) -> List[Dict]:
+    """
+    Meses cobertos por qualquer início válido de um projeto recebem todas as suas
+    turmas; se a soma dessas demandas obrigatórias excede o pico máximo, é inviável.
+    """
+    obrigatoria = np.zeros(cobertura.num_meses, dtype=np.int64)
+    contribuicoes = defaultdict(list)
+    for nome, j in janelas.items():
+        if not j['validos']: continue
+        sempre_ativo = cobertura.matriz(j['duracao'])[j['validos']].all(axis=0)
+        obrigatoria += sempre_ativo * (j['prog'] + j['rob'])
+        for m in np.flatnonzero(sempre_ativo):
+            contribuicoes[int(m)].append(nome)
+
+    problemas = []
+    for m in np.flatnonzero(obrigatoria > pico_maximo):
+        problemas.append({
+            'tipo': 'pico_obrigatorio', 'projeto': ', '.join(contribuicoes[int(m)]), 'mes': meses[m],
+            'mensagem': (f"Em {meses[m]} as turmas de {', '.join(contribuicoes[int(m)])} estão ativas em qualquer "
+                         f"cronograma possível: {int(obrigatoria[m])} turmas > pico máximo {pico_maximo}.")
+        })
+    return problemas
+
+
+def _verificar_capacidade_intervalos(janelas: Dict, meses: Sequence[str], cobertura: CoberturaMeses,
+                                     pico_maximo: int) -> List[Dict]:
+    """
+    Para cada intervalo de meses [a, b], as turmas de projetos que obrigatoriamente
+    começam e terminam dentro dele somam duração x turmas meses-turma, que precisam
+    caber em pico_maximo x (meses letivos do intervalo). Reporta o menor intervalo violado.
+    """
+    num_meses = cobertura.num_meses
+    letivos_acumulados = np.concatenate([[0], np.cumsum(cobertura.letivo)])
+    limites = []
+    for nome, j in janelas.items():
+        if not j['validos']: continue
+        primeiro = j['validos'][0]
+        ultimo = cobertura.mes_fim(j['duracao'], j['validos'][-1])
+        limites.append((primeiro, ultimo, (j['prog'] + j['rob']) * j['duracao'], nome))
+
+    pior = None
+    for a in range(num_meses):
+        for b in range(a, num_meses):
+            dentro = [lim for lim in limites if lim[0] >= a and lim[1] <= b]
+            if not dentro: continue
+            carga = sum(lim[2] for lim in dentro)
+            capacidade = pico_maximo * int(letivos_acumulados[b + 1] - letivos_acumulados[a])
+            if carga > capacidade and (pior is None or b - a < pior[1] - pior[0]):
+                pior = (a, b, carga, capacidade, [lim[3] for lim in dentro])
+    if pior is None:
+        return []
+    a, b, carga, capacidade, nomes = pior
+    return [{
+        'tipo': 'capacidade_periodo', 'projeto': ', '.join(nomes), 'mes': f"{meses[a]} a {meses[b]}",
+        'mensagem': (f"Entre {meses[a]} e {meses[b]} os projetos {', '.join(nomes)} exigem {carga} meses-turma, "
+                     f"mas o pico máximo permite no máximo {capacidade} nos meses letivos do período.")
+    }]
+
+
+def _extrair_nucleo_inviavel(janelas: Dict, meses: Sequence[str], cobertura: CoberturaMeses, pico_maximo: int,
+                             tempo_limite: float) -> Optional[List[Dict]]:
+    """
+    Modelo de viabilidade do Estágio 1 em que o total de cada projeto e o pico de
+    cada mês são condicionados a literais de suposição. Se o CP-SAT provar a
+    inviabilidade, o subconjunto suficiente de suposições aponta os culpados.
+
+    Returns:
+        Lista de problemas (vazia se viável) ou None se o solver não decidiu a tempo.
+    """
+    model = cp_model.CpModel()
+    demanda = defaultdict(list)
+    suposicoes = {}
+    for nome, j in janelas.items():
+        if not j['validos']: continue
+        total = j['prog'] + j['rob']
+        inicios = {m: model.NewIntVar(0, total, f'x_{nome}_{m}') for m in j['validos']}
+        literal = model.NewBoolVar(f'total_{nome}')
+        model.Add(sum(inicios.values()) == total).OnlyEnforceIf(literal)
+        suposicoes[literal.Index()] = ('projeto', nome, literal)
+        for m_i, var in inicios.items():
+            for m in cobertura.meses_ativos(j['duracao'], m_i):
+                demanda[m].append(var)
+    for m, termos in demanda.items():
+        literal = model.NewBoolVar(f'pico_{m}')
+        model.Add(sum(termos) <= pico_maximo).OnlyEnforceIf(literal)
+        suposicoes[literal.Index()] = ('mes', meses[m], literal)
+    model.AddAssumptions([lit for _, _, lit in suposicoes.values()])
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(tempo_limite)
+    solver.parameters.num_workers = 1  # o núcleo de suposições exige busca sequencial
+    status = solver.Solve(model)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return []
+    if status != cp_model.INFEASIBLE:
+        return None
+
+    nucleo = [suposicoes[idx] for idx in solver.SufficientAssumptionsForInfeasibility()]
+    projetos = [nome for tipo, nome, _ in nucleo if tipo == 'projeto']
+    meses_nucleo = [nome for tipo, nome, _ in nucleo if tipo == 'mes']
+    return [{
+        'tipo': 'nucleo_inviavel', 'projeto': ', '.join(projetos), 'mes': ', '.join(meses_nucleo),
+        'mensagem': (f"Núcleo inviável (CP-SAT): os totais de turmas de {', '.join(projetos) or '-'} não cabem "
+                     f"sob o pico máximo {pico_maximo} nos meses {', '.join(meses_nucleo) or '-'}.")
+    }]
+
+
+def analisar_viabilidade(projetos_config: List[ConfiguracaoProjeto],
+                         meses: Sequence[str],
+                         parametros: ParametrosOtimizacao,
+                         cobertura: CoberturaMeses,
+                         usar_nucleo_cpsat: bool = True) -> Dict:
+    """
+    Pré-verificação do Estágio 1, executada antes de qualquer modelo.
+
+    Returns:
+        Dicionário com 'viavel' (True, False ou None se indeterminado),
+        'problemas' (lista de dicts com tipo, projeto, mes e mensagem) e 'tempo'.
+    """
+    inicio = time.time()
+    janelas = _janelas_inicio(projetos_config, meses, cobertura)
+    problemas = (_verificar_janelas(janelas, meses, cobertura)
+                 + _verificar_demanda_obrigatoria(janelas, meses, cobertura, parametros.pico_maximo_turmas))
+    if not problemas:
+        problemas = _verificar_capacidade_intervalos(janelas, meses, cobertura, parametros.pico_maximo_turmas)
+
+    viavel = not problemas
+    if viavel and usar_nucleo_cpsat:
+        nucleo = _extrair_nucleo_inviavel(janelas, meses, cobertura, parametros.pico_maximo_turmas,
+                                          tempo_limite=min(10.0, parametros.timeout_segundos / 10))
+        if nucleo is None:
+            viavel = None
+        else:
+            problemas, viavel = nucleo, not nucleo
+    return {'viavel': viavel, 'problemas': problemas, 'tempo': time.time() - inicio}
+
+
+def limites_inferiores_pico(projetos_flexiveis: List[Projeto], cobertura: CoberturaMeses) -> Dict[str, int]:
+    """
+    Limites inferiores dos picos do Estágio 1 por habilidade ('PROG', 'ROB'):
+    o maior entre a demanda obrigatória de um mês (ativa em qualquer início
+    válido) e a energia dos projetos contidos em um intervalo de meses dividida
+    pelos meses letivos do intervalo (arredondada para cima).
+    """
+    num_meses = cobertura.num_meses
+    letivos_acumulados = cobertura.letivos_acumulados
+    limites = {}
+    for hab_nome, campo in (('PROG', 'prog'), ('ROB', 'rob')):
+        obrigatoria = np.zeros(num_meses, dtype=np.int64)
+        intervalos = []
+        for proj in projetos_flexiveis:
+            turmas = getattr(proj, campo)
+            validos = cobertura.inicios_letivos(proj.inicio_min, proj.inicio_max)
+            if turmas <= 0 or not validos: continue
+            obrigatoria += cobertura.matriz(proj.duracao)[validos].all(axis=0) * turmas
+            intervalos.append((validos[0], cobertura.mes_fim(proj.duracao, validos[-1]), turmas * proj.duracao))
+        limite = int(obrigatoria.max()) if num_meses else 0
+        for a in range(num_meses):
+            for b in range(a, num_meses):
+                letivos = int(letivos_acumulados[b + 1] - letivos_acumulados[a])
+                energia = sum(e for inicio, fim, e in intervalos if inicio >= a and 0 <= fim <= b)
+                if letivos and energia:
+                    limite = max(limite, -(-energia // letivos))
+        limites[hab_nome] = limite
+    return limites
+
+
+def analisar_spread_estagio2(turmas: List[Turma], limites_inferiores: Dict[str, int],
+                             spread_maximo: int) -> Optional[str]:
+    """
+    Com o pool dinâmico o Estágio 2 é sempre viável (no limite, um instrutor por
+    turma). Ainda assim, se o spread máximo não puder ser atendido com o número
+    mínimo de instrutores, retorna um aviso: a carga máxima é pelo menos
+    ceil(T/n) e a mínima no máximo floor(T/n) em cada habilidade.
+    """
+    totais = defaultdict(int)
+    for t in turmas: totais[t.habilidade] += 1
+    habs = [h for h in totais if limites_inferiores.get(h, 0) > 0]
+    if not habs:
+        return None
+    maior_max = max(-(-totais[h] // limites_inferiores[h]) for h in habs)
+    menor_min = min(totais[h] // limites_inferiores[h] for h in habs)
+    if maior_max - menor_min <= spread_maximo:
+        return None
+    return (f"Com o número mínimo de instrutores ({', '.join(f'{h}: {limites_inferiores[h]}' for h in habs)}) "
+            f"o spread é de pelo menos {maior_max - menor_min} (> {spread_maximo}); serão necessários mais instrutores.")
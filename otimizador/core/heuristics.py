@@ -0,0 +1,268 @@
+# ARQUIVO: otimizador/core/heuristics.py
+"""
+Heurísticas construtivas rápidas (Python/NumPy puro, sem solver).
+
+Cada turma é um intervalo de meses ativos (com lacunas nas férias); a carga
+mensal de um instrutor é a soma das linhas de cobertura das suas turmas.
+"""
+
+import time
+from collections import defaultdict
+from typing import List, Dict
+
+import numpy as np
+
+# Import relativo para acessar modelos de dados
+from ..data_models import Turma, Instrutor, Atribuicoes
+from ..calendario import CoberturaMeses
+from .solver_config import execucao_interrompida
+from .avaliacao import AvaliadorCronograma, AvaliadorCargas, codigo_habilidade
+
+
+def _primeiro_encaixe(linhas: np.ndarray, ordem: np.ndarray, capacidade: int) -> np.ndarray:
+    """
+    First-fit: percorre as turmas na ordem dada e coloca cada uma no primeiro
+    instrutor cuja carga mensal continue <= capacidade, abrindo um novo se preciso.
+
+    Returns:
+        Vetor turma -> índice do instrutor.
+    """
+    num_turmas, num_meses = linhas.shape
+    cargas = np.zeros((num_turmas, num_meses), dtype=np.int32)
+    instrutor_da_turma = np.full(num_turmas, -1, dtype=np.int64)
+    num_abertos = 0
+    for k in ordem:
+        cabe = np.flatnonzero(((cargas[:num_abertos] + linhas[k]) <= capacidade).all(axis=1))
+        if len(cabe):
+            i = cabe[0]
+        else:
+            i = num_abertos
+            num_abertos += 1
+        cargas[i] += linhas[k]
+        instrutor_da_turma[k] = i
+    return instrutor_da_turma
+
+
+def balancear_cargas(linhas_por_hab: Dict[str, np.ndarray], instrutor_por_hab: Dict[str, np.ndarray],
+                     capacidade: int, spread_maximo: int):
+    """
+    Balanceia o número de turmas por instrutor com movimentos de turmas entre
+    instrutores da mesma habilidade, sempre do mais carregado para um mais leve
+    (diferença >= 2) e respeitando a capacidade mensal. Se o spread global
+    continuar acima do máximo, abre um instrutor para a habilidade mais
+    carregada e repete. Altera `instrutor_por_hab` no lugar.
+    """
+    avaliadores = {hab: AvaliadorCargas(linhas, instrutor_por_hab[hab]) for hab, linhas in linhas_por_hab.items()}
+
+    def mover(hab: str, origem: int, destino: int) -> bool:
+        avaliador = avaliadores[hab]
+        for k in np.flatnonzero(avaliador.instrutor_da_turma == origem):
+            if avaliador.cabe(k, destino, capacidade):
+                avaliador.reatribuir(k, destino)
+                return True
+        return False
+
+    while True:
+        # Movimentos dentro de cada habilidade; cada um reduz a soma dos quadrados das cargas
+        melhorou = True
+        while melhorou:
+            melhorou = False
+            for hab, avaliador in avaliadores.items():
+                total = avaliador.totais
+                for origem in np.argsort(-total, kind='stable'):
+                    for destino in np.argsort(total, kind='stable'):
+                        if total[origem] - total[destino] < 2:
+                            break
+                        if mover(hab, origem, destino):
+                            melhorou = True
+                            break
+                    if melhorou:
+                        break
+
+        maximos = {hab: int(a.totais.max()) for hab, a in avaliadores.items()}
+        minimos = {hab: int(a.totais.min()) for hab, a in avaliadores.items()}
+        spread = max(maximos.values()) - min(minimos.values())
+        hab_pesada = max(maximos, key=maximos.get)
+        if spread <= spread_maximo or len(avaliadores[hab_pesada].totais) >= len(instrutor_por_hab[hab_pesada]):
+            return
+        avaliadores[hab_pesada].abrir_instrutor()
+
+
+def construir_atribuicao_heuristica(turmas: List[Turma], num_meses: int, cobertura: CoberturaMeses,
+                                    capacidade: int, spread_maximo: int) -> Atribuicoes:
+    """
+    Atribuição viável do Estágio 2 em milissegundos: first-fit em duas ordens
+    (duração decrescente e mês de início), mantendo a que usa menos instrutores,
+    seguido de balanceamento de carga para atender ao spread máximo.
+    Os ids dos instrutores seguem `atribuicoes_dos_vetores`.
+    """
+    turmas_por_habilidade = defaultdict(list)
+    for t in turmas: turmas_por_habilidade[t.habilidade].append(t)
+    if not turmas_por_habilidade:
+        return Atribuicoes([], [], [])
+
+    linhas_por_hab, instrutor_por_hab = {}, {}
+    for hab, turmas_hab in turmas_por_habilidade.items():
+        linhas = np.array([cobertura.matriz(t.duracao)[t.mes_inicio] for t in turmas_hab], dtype=np.int32)
+        inicios = np.array([t.mes_inicio for t in turmas_hab])
+        duracoes = np.array([t.duracao for t in turmas_hab])
+        candidatas = [_primeiro_encaixe(linhas, ordem, capacidade)
+                      for ordem in (np.lexsort((inicios, -duracoes)), np.lexsort((-duracoes, inicios)))]
+        linhas_por_hab[hab] = linhas
+        instrutor_por_hab[hab] = min(candidatas, key=lambda v: int(v.max()))
+
+    balancear_cargas(linhas_por_hab, instrutor_por_hab, capacidade, spread_maximo)
+    return atribuicoes_dos_vetores(turmas_por_habilidade, instrutor_por_hab, capacidade)
+
+
+def atribuicoes_dos_vetores(turmas_por_habilidade: Dict[str, List[Turma]], instrutor_por_hab: Dict[str, np.ndarray],
+                            capacidade: int) -> Atribuicoes:
+    """
+    Converte vetores turma -> índice de instrutor (por habilidade) em atribuições
+    com ids do pool do Estágio 2 ('PROG_0', ...): o índice 0 fica com a primeira
+    turma de cada habilidade e os demais seguem em ordem decrescente de carga,
+    de forma compatível com a quebra de simetria.
+    """
+    turmas, instrutores, indices = [], [], []
+    for hab, turmas_hab in turmas_por_habilidade.items():
+        vetor = instrutor_por_hab[hab]
+        totais = np.bincount(vetor)
+        primeiro = vetor[0]
+        outros = sorted((i for i in range(len(totais)) if i != primeiro and totais[i] > 0),
+                        key=lambda i: (-totais[i], i))
+        # Posição de cada índice do vetor na lista de instrutores (na ordem dos novos ids)
+        posicao = np.zeros(len(totais), dtype=np.int64)
+        posicao[[primeiro] + outros] = len(instrutores) + np.arange(1 + len(outros))
+        instrutores += [Instrutor(id=f'{hab}_{k}', habilidade=hab, capacidade=capacidade, laboratorio_id=None)
+                        for k in range(1 + len(outros))]
+        turmas += turmas_hab
+        indices.append(posicao[vetor])
+    return Atribuicoes(turmas, instrutores, np.concatenate(indices) if indices else [])
+
+
+class AvaliadorDemanda(AvaliadorCronograma):
+    """
+    Avaliador incremental da curva de demanda do Estágio 1 com o custo usado
+    pela heurística de nivelamento.
+
+    O custo de um movimento (início de turmas trocado de mês) é calculado
+    somando à demanda apenas a diferença entre as linhas de cobertura, sem
+    reconstruir a curva a partir das turmas.
+    """
+
+    def __init__(self, cobertura: CoberturaMeses, duracoes, pico_maximo: int):
+        super().__init__(cobertura, duracoes)
+        self.pico_maximo = pico_maximo
+
+    def _custo(self, prog: np.ndarray, rob: np.ndarray) -> tuple:
+        """(excesso sobre o pico máximo, pico PROG + pico ROB, soma dos quadrados) — menor é melhor."""
+        excesso = max(0, int((prog + rob).max()) - self.pico_maximo)
+        return excesso, int(prog.max()) + int(rob.max()), int((prog * prog).sum() + (rob * rob).sum())
+
+    def custo(self) -> tuple:
+        return self._custo(self.demanda[0], self.demanda[1])
+
+    def custo_com_delta(self, habilidade: int, delta: np.ndarray) -> tuple:
+        """Custo caso `delta` (variação mensal) seja aplicado à demanda da habilidade."""
+        if habilidade == 0:
+            return self._custo(self.demanda[0] + delta, self.demanda[1])
+        return self._custo(self.demanda[0], self.demanda[1] + delta)
+
+
+def nivelar_demanda_heuristica(projetos: List, cobertura: CoberturaMeses, meses_ferias_idx: List[int],
+                               pico_maximo: int, tempo_limite: float = 10.0) -> Dict:
+    """
+    Cronograma do Estágio 1 sem solver: preenchimento guloso ("water-filling")
+    seguido de busca local com movimentos e trocas de inícios de turmas.
+
+    O guloso coloca uma turma por vez, começando pelos projetos de janela mais
+    estreita, no início válido cujos meses ativos têm a menor demanda máxima da
+    habilidade. A busca local move uma turma de um mês de início para outro
+    (ou troca inícios entre dois projetos da mesma habilidade) enquanto o custo
+    (excesso sobre o pico máximo, soma dos picos, soma dos quadrados) diminuir.
+
+    Returns:
+        Dicionário com 'contagens' {(projeto, 'PROG'|'ROB', mes): n}, 'pico_prog',
+        'pico_rob' e 'excesso' (turmas acima de `pico_maximo` no pior mês).
+    """
+    inicio = time.time()
+    avaliador = AvaliadorDemanda(cobertura, (p.duracao for p in projetos), pico_maximo)
+    # Folga (meses letivos de sobra na janela) de todos os projetos em uma única chamada
+    folgas = cobertura.janelas_inicio([p.inicio_min for p in projetos], [p.mes_fim_projeto for p in projetos],
+                                      [p.duracao for p in projetos])["folga"]
+
+    # Unidades de decisão: (projeto, habilidade) com seus inícios válidos e linhas de cobertura
+    unidades = []
+    for p, (proj, folga) in enumerate(zip(projetos, folgas)):
+        validos = cobertura.inicios_letivos(proj.inicio_min, proj.inicio_max)
+        if not validos: continue
+        linhas = cobertura.matriz(proj.duracao)[validos].astype(np.int64)
+        for hab, total in (('PROG', proj.prog), ('ROB', proj.rob)):
+            if total > 0:
+                unidades.append({'projeto': proj.nome, 'indice': p, 'habilidade': hab,
+                                 'codigo': codigo_habilidade(hab), 'total': total, 'validos': validos,
+                                 'folga': int(folga), 'linhas': linhas,
+                                 'contagem': np.zeros(len(validos), dtype=np.int64)})
+
+    # --- Guloso: projetos mais restritos (menor folga, duração longa) primeiro ---
+    for u in sorted(unidades, key=lambda u: (u['folga'], -u['linhas'].sum(axis=1).max())):
+        demanda = avaliador.demanda[u['codigo']]
+        for _ in range(u['total']):
+            mascarada = np.where(u['linhas'] > 0, demanda, -1)
+            pico_linhas = mascarada.max(axis=1)
+            soma_linhas = (u['linhas'] * demanda).sum(axis=1)
+            s = int(np.lexsort((soma_linhas, pico_linhas))[0])
+            u['contagem'][s] += 1
+            avaliador.adicionar(u['indice'], u['codigo'], u['validos'][s])
+
+    # --- Busca local: primeira melhoria até o ótimo local ou o fim do tempo ---
+    custo_atual = avaliador.custo()
+    melhorou = True
+    while melhorou and time.time() - inicio < tempo_limite and not execucao_interrompida():
+        melhorou = False
+        for u in unidades:
+            for a in np.flatnonzero(u['contagem']):
+                for b in range(len(u['validos'])):
+                    if b == a: continue
+                    delta = avaliador.delta_mover(u['indice'], u['validos'][a], u['validos'][b])
+                    custo = avaliador.custo_com_delta(u['codigo'], delta)
+                    if custo < custo_atual:
+                        avaliador.mover(u['indice'], u['codigo'], u['validos'][a], u['validos'][b])
+                        u['contagem'][a] -= 1
+                        u['contagem'][b] += 1
+                        custo_atual, melhorou = custo, True
+                        break
+                if melhorou: break
+            if melhorou: break
+
+        if melhorou: continue
+        # Trocas: uma turma de cada projeto (mesma habilidade) troca de mês de início com a outra
+        for u, v in ((u, v) for u in unidades for v in unidades
+                     if u is not v and u['habilidade'] == v['habilidade']):
+            for a in np.flatnonzero(u['contagem']):
+                mes_a = u['validos'][a]
+                for c in np.flatnonzero(v['contagem']):
+                    mes_c = v['validos'][c]
+                    if mes_a == mes_c or mes_c not in u['validos'] or mes_a not in v['validos']: continue
+                    b, d = u['validos'].index(mes_c), v['validos'].index(mes_a)
+                    delta = (avaliador.delta_mover(u['indice'], mes_a, mes_c)
+                             + avaliador.delta_mover(v['indice'], mes_c, mes_a))
+                    custo = avaliador.custo_com_delta(u['codigo'], delta)
+                    if custo < custo_atual:
+                        avaliador.mover(u['indice'], u['codigo'], mes_a, mes_c)
+                        avaliador.mover(v['indice'], v['codigo'], mes_c, mes_a)
+                        u['contagem'][a] -= 1; u['contagem'][b] += 1
+                        v['contagem'][c] -= 1; v['contagem'][d] += 1
+                        custo_atual, melhorou = custo, True
+                        break
+                if melhorou: break
+            if melhorou or time.time() - inicio >= tempo_limite or execucao_interrompida(): break
+
+    contagens = {(u['projeto'], u['habilidade'], m): int(n)
+                 for u in unidades for m, n in zip(u['validos'], u['contagem']) if n > 0}
+    return {
+        "contagens": contagens,
+        "pico_prog": avaliador.picos()[0],
+        "pico_rob": avaliador.picos()[1],
+        "excesso": custo_atual[0],
+    }
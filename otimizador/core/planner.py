@@ -0,0 +1,260 @@
+# ARQUIVO: otimizador/core/planner.py
+"""
+Estimativa do tamanho dos modelos e escolha automática dos motores.
+
+Antes de construir qualquer modelo, o tamanho de cada formulação (variáveis,
+restrições, termos e memória esperada) é estimado a partir dos projetos, dos
+meses e do pool de instrutores. Com motor 'auto', cada estágio usa a
+formulação exata mais detalhada que cabe nos limites; se nenhuma cabe, a
+heurística. Motores escolhidos explicitamente são respeitados e, se
+excederem a memória disponível, geram apenas um aviso.
+
+As constantes de memória são aproximações do consumo do CP-SAT (variável com
+domínio e termos nas restrições lineares após o presolve).
+"""
+
+import math
+from dataclasses import replace
+from typing import List, Dict, Optional
+
+import numpy as np
+
+# Import relativo para acessar modelos de dados
+from ..data_models import Projeto, ParametrosOtimizacao
+from ..calendario import CoberturaMeses
+
+# Bytes aproximados por variável e por termo de restrição no CP-SAT
+MEMORIA_POR_VARIAVEL = 500
+MEMORIA_POR_TERMO = 40
+
+# Variáveis de decisão acima das quais um modelo exato raramente fecha no tempo usual
+LIMITE_VARIAVEIS_ESTAGIO1 = 200_000
+LIMITE_VARIAVEIS_ESTAGIO2 = 50_000
+
+# Variáveis auxiliares por instrutor no Estágio 2 (uso, carga, carga ajustada, simetria)
+AUXILIARES_POR_INSTRUTOR = 4
+
+# Colunas (escalas) esperadas por instrutor do pool no mestre da geração de colunas
+COLUNAS_POR_INSTRUTOR = 5
+
+# Ordem de preferência do motor 'auto' no Estágio 2: (estratégia, motor). A formulação
+# por intervalos não entra: tem as mesmas variáveis de atribuição da formulação por
+# turmas e ainda os intervalos, então nunca cabe onde aquela não cabe.
+ESTRATEGIAS_ESTAGIO2 = (('turmas', 'turmas'), ('coortes', 'coortes'), ('decomposto', 'coortes'),
+                        ('horizonte_rolante', 'coortes'), ('geracao_colunas', 'geracao_colunas'))
+
+
+def _memoria_mb(variaveis: int, termos: int) -> float:
+    """Memória esperada, em MB, para um modelo com o número de variáveis e termos informado."""
+    return (variaveis * MEMORIA_POR_VARIAVEL + termos * MEMORIA_POR_TERMO) / 2 ** 20
+
+
+def estimar_estagio1(projetos: List[Projeto], cobertura: CoberturaMeses) -> Dict:
+    """
+    Tamanho do modelo do Estágio 1: uma variável por (projeto, habilidade, início
+    letivo), uma restrição de total por projeto e habilidade e três por mês.
+    """
+    variaveis, termos = 2, 0
+    restricoes = 3 * cobertura.num_meses
+    for proj in projetos:
+        inicios = int(cobertura.letivo[proj.inicio_min:proj.inicio_max + 1].sum())
+        habilidades = (proj.prog > 0) + (proj.rob > 0)
+        variaveis += inicios * habilidades
+        restricoes += habilidades
+        # Total do projeto + duas linhas (pico consolidado e da habilidade) por mês ativo
+        termos += inicios * habilidades * (1 + 2 * proj.duracao)
+    return {"variaveis": variaveis, "restricoes": restricoes, "termos": termos,
+            "memoria_mb": _memoria_mb(variaveis, termos)}
+
+
+def perfis_dos_projetos(projetos: List[Projeto], cobertura: CoberturaMeses,
+                        parametros: ParametrosOtimizacao) -> Dict[str, Dict]:
+    """
+    Perfil de cada habilidade do Estágio 2 antes do Estágio 1: turmas, coortes
+    possíveis (limitadas pelos inícios letivos), duração média e o pool
+    estimado pelo pior pico permitido (pico máximo / capacidade).
+    """
+    perfis = {}
+    for hab, campo in (('PROG', 'prog'), ('ROBOTICA', 'rob')):
+        com_turmas = [p for p in projetos if getattr(p, campo) > 0]
+        turmas = sum(getattr(p, campo) for p in com_turmas)
+        if not turmas: continue
+        coortes = sum(min(getattr(p, campo), int(cobertura.letivo[p.inicio_min:p.inicio_max + 1].sum()))
+                      for p in com_turmas)
+        perfis[hab] = {
+            "turmas": turmas,
+            "coortes": coortes,
+            "duracao_media": sum(getattr(p, campo) * p.duracao for p in com_turmas) / turmas,
+            "pool": max(1, math.ceil(min(turmas, parametros.pico_maximo_turmas) / parametros.capacidade_max_instrutor)),
+        }
+    return perfis
+
+
+def perfis_das_turmas(turmas_por_habilidade: Dict[str, List], limites_inferiores: Dict[str, int]) -> Dict[str, Dict]:
+    """Perfil de cada habilidade a partir das turmas já criadas e do limite inferior de instrutores."""
+    perfis = {}
+    for hab, turmas in turmas_por_habilidade.items():
+        if not turmas: continue
+        perfis[hab] = {
+            "turmas": len(turmas),
+            "coortes": len({(t.projeto, t.mes_inicio) for t in turmas}),
+            "duracao_media": float(np.mean([t.duracao for t in turmas])),
+            "pool": max(1, limites_inferiores.get(hab, 0)),
+        }
+    return perfis
+
+
+def _tamanho_estagio2(perfis: Dict[str, Dict], itens: str, num_meses: int, fracao: float = 1.0) -> Dict:
+    """
+    Tamanho de um modelo do Estágio 2 em que cada item ('turmas' ou 'coortes')
+    tem uma variável por instrutor do pool; `fracao` reduz os itens (janelas).
+    """
+    variaveis = restricoes = termos = 0
+    for perfil in perfis.values():
+        n_itens = max(1, math.ceil(perfil[itens] * fracao))
+        atribuicao = n_itens * perfil["pool"]
+        variaveis += atribuicao + AUXILIARES_POR_INSTRUTOR * perfil["pool"]
+        restricoes += n_itens + perfil["pool"] * (num_meses + 6)
+        # Cobertura do item + carga + uma linha de capacidade por mês ativo
+        termos += atribuicao * (2 + perfil["duracao_media"])
+    return {"variaveis": int(variaveis), "restricoes": int(restricoes), "termos": int(termos),
+            "memoria_mb": _memoria_mb(variaveis, termos)}
+
+
+def _tamanho_geracao_colunas(perfis: Dict[str, Dict], num_meses: int) -> Dict:
+    """
+    Tamanho da geração de colunas: o subproblema de preço tem uma variável por
+    coorte e uma linha de capacidade por mês; o mestre, uma linha por coorte e
+    COLUNAS_POR_INSTRUTOR colunas por instrutor do pool. Não cresce com pool x itens.
+    """
+    variaveis = restricoes = termos = 0
+    for perfil in perfis.values():
+        colunas = COLUNAS_POR_INSTRUTOR * perfil["pool"]
+        variaveis += perfil["coortes"] + colunas
+        restricoes += perfil["coortes"] + num_meses
+        termos += perfil["coortes"] * (perfil["duracao_media"] + colunas)
+    return {"variaveis": int(variaveis), "restricoes": int(restricoes), "termos": int(termos),
+            "memoria_mb": _memoria_mb(variaveis, termos)}
+
+
+def estimar_estagio2(perfis: Dict[str, Dict], num_meses: int, parametros: ParametrosOtimizacao) -> Dict[str, Dict]:
+    """
+    Tamanho de cada estratégia do Estágio 2: formulação por turmas, por coortes,
+    decomposição por habilidade (maior subproblema), horizonte rolante (uma
+    janela) e geração de colunas.
+    """
+    estimativas = {
+        "turmas": _tamanho_estagio2(perfis, "turmas", num_meses),
+        "coortes": _tamanho_estagio2(perfis, "coortes", num_meses),
+    }
+    if len(perfis) > 1:
+        por_habilidade = [_tamanho_estagio2({h: p}, "coortes", num_meses) for h, p in perfis.items()]
+        estimativas["decomposto"] = dict(max(por_habilidade, key=lambda e: e["variaveis"]),
+                                         memoria_mb=sum(e["memoria_mb"] for e in por_habilidade))
+    if num_meses > parametros.janela_meses:
+        estimativas["horizonte_rolante"] = _tamanho_estagio2(perfis, "coortes", num_meses,
+                                                             parametros.janela_meses / num_meses)
+    estimativas["geracao_colunas"] = _tamanho_geracao_colunas(perfis, num_meses)
+    return estimativas
+
+
+def _cabe(estimativa: Dict, limite_variaveis: int, parametros: ParametrosOtimizacao) -> bool:
+    """Indica se o modelo estimado respeita o limite de variáveis e a memória máxima."""
+    return estimativa["variaveis"] <= limite_variaveis and estimativa["memoria_mb"] <= parametros.memoria_maxima_mb
+
+
+def escolher_motor_estagio1(projetos: List[Projeto], cobertura: CoberturaMeses,
+                            parametros: ParametrosOtimizacao) -> Dict:
+    """Modelo exato do Estágio 1 se couber nos limites; caso contrário, a heurística de nivelamento."""
+    estimativa = estimar_estagio1(projetos, cobertura)
+    motor = 'cpsat' if _cabe(estimativa, LIMITE_VARIAVEIS_ESTAGIO1, parametros) else 'heuristica'
+    return {"motor": motor, "estimativa": estimativa}
+
+
+def escolher_motor_estagio2(perfis: Dict[str, Dict], num_meses: int, parametros: ParametrosOtimizacao) -> Dict:
+    """
+    Primeira estratégia que cabe nos limites, na ordem de ESTRATEGIAS_ESTAGIO2
+    (turmas, coortes, decomposição por habilidade, horizonte rolante, geração
+    de colunas) e, por fim, a heurística construtiva.
+
+    `horizonte_rolante` ou `decompor_por_habilidade` ligados explicitamente
+    fixam a estratégia (o horizonte rolante prevalece, como na execução) e o
+    motor 'auto' escolhe apenas a formulação, mesmo que a estimativa exceda os limites.
+
+    Returns:
+        Dicionário com 'motor', 'decompor_por_habilidade', 'horizonte_rolante',
+        'estrategia' e as 'estimativas' de cada estratégia.
+    """
+    estimativas = estimar_estagio2(perfis, num_meses, parametros)
+    explicita = ('horizonte_rolante' if parametros.horizonte_rolante
+                 else 'decomposto' if parametros.decompor_por_habilidade else None)
+    if explicita in estimativas:
+        escolha = {"motor": 'coortes', "estrategia": explicita}
+    else:
+        escolha = {"motor": 'heuristica', "estrategia": 'heuristica'}
+        for estrategia, motor in ESTRATEGIAS_ESTAGIO2:
+            if estrategia in estimativas and _cabe(estimativas[estrategia], LIMITE_VARIAVEIS_ESTAGIO2, parametros):
+                escolha = {"motor": motor, "estrategia": estrategia}
+                break
+    escolha["decompor_por_habilidade"] = escolha["estrategia"] == 'decomposto'
+    escolha["horizonte_rolante"] = escolha["estrategia"] == 'horizonte_rolante'
+    escolha["estimativas"] = estimativas
+    return escolha
+
+
+def aplicar_escolha_estagio2(parametros: ParametrosOtimizacao, escolha: Dict) -> ParametrosOtimizacao:
+    """
+    Cópia dos parâmetros com a estratégia escolhida para o Estágio 2. Flags
+    ligadas explicitamente pelo usuário continuam ligadas.
+    """
+    return replace(parametros, motor_estagio2=escolha["motor"],
+                   decompor_por_habilidade=parametros.decompor_por_habilidade or escolha["decompor_por_habilidade"],
+                   horizonte_rolante=parametros.horizonte_rolante or escolha["horizonte_rolante"])
+
+
+def _linha(nome: str, estimativa: Dict) -> str:
+    """Linha da tabela de estimativas."""
+    return (f"  {nome:<28}{estimativa['variaveis']:>12,}{estimativa['restricoes']:>12,}"
+            f"{estimativa['memoria_mb']:>12.1f}")
+
+
+def planejar(projetos: List[Projeto], cobertura: CoberturaMeses, parametros: ParametrosOtimizacao) -> Dict:
+    """
+    Estima os dois estágios a partir dos projetos e imprime o plano. Com motor
+    'auto' informa a estratégia prevista (o Estágio 2 refaz a escolha com as
+    turmas reais); com motor explícito, avisa se a memória estimada excede o limite.
+
+    Returns:
+        Dicionário com 'estagio1' e 'estagio2' (escolhas e estimativas).
+    """
+    estagio1 = escolher_motor_estagio1(projetos, cobertura, parametros)
+    estagio2 = escolher_motor_estagio2(perfis_dos_projetos(projetos, cobertura, parametros),
+                                       cobertura.num_meses, parametros)
+
+    print(f"\nEstimativa dos modelos (limite de memória {parametros.memoria_maxima_mb} MB):")
+    print(f"  {'Modelo':<28}{'Variáveis':>12}{'Restrições':>12}{'Memória(MB)':>12}")
+    print(_linha("estágio 1", estagio1["estimativa"]))
+    for nome, estimativa in estagio2["estimativas"].items():
+        print(_linha(f"estágio 2/{nome}", estimativa))
+
+    if parametros.motor_estagio1 == 'auto':
+        print(f"Motor do Estágio 1 (auto): {estagio1['motor']}")
+    if parametros.motor_estagio2 == 'auto':
+        print(f"Estratégia do Estágio 2 (auto, prevista): {estagio2['estrategia']}")
+    else:
+        explicita = _estrategia_configurada(parametros)
+        estimativa = estagio2["estimativas"].get(explicita)
+        if estimativa and estimativa["memoria_mb"] > parametros.memoria_maxima_mb:
+            print(f"[!] A estratégia configurada ({explicita}) deve exceder a memória: "
+                  f"{estimativa['memoria_mb']:.0f} MB > {parametros.memoria_maxima_mb} MB. "
+                  f"Considere motor_estagio2 = 'auto'.")
+    return {"estagio1": estagio1, "estagio2": estagio2}
+
+
+def _estrategia_configurada(parametros: ParametrosOtimizacao) -> Optional[str]:
+    """Estratégia do Estágio 2 correspondente a um motor escolhido explicitamente."""
+    if parametros.horizonte_rolante:
+        return 'horizonte_rolante'
+    if parametros.decompor_por_habilidade:
+        return 'decomposto'
+    return parametros.motor_estagio2 if parametros.motor_estagio2 in ('turmas', 'coortes', 'geracao_colunas') else None
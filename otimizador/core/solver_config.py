@@ -0,0 +1,241 @@
+# ARQUIVO: otimizador/core/solver_config.py
+"""
+Configuração comum dos parâmetros do CP-SAT usada pelos dois estágios, o
+critério de parada antecipada (limite inferior, gap ou tempo sem melhoria) e
+o tratamento do Ctrl-C como interrupção graciosa da busca.
+"""
+
+import select
+import signal
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from ortools.sat.python import cp_model
+
+# Import relativo para acessar modelos de dados
+from ..data_models import ParametrosOtimizacao
+
+# Perfis nomeados de parâmetros do CP-SAT (aplicados antes das configurações individuais)
+AJUSTES_POR_PERFIL: Dict[str, Dict] = {
+    'padrao': {},
+    # Menos relaxação linear: soluções iniciais mais rápidas, limites inferiores mais fracos
+    'rapido': {'linearization_level': 0},
+    # Relaxação linear completa: mais lento por nó, porém prova otimalidade com mais frequência
+    'prova_otimalidade': {'linearization_level': 2},
+}
+
+# No modo determinístico, o tempo real de cada busca fica limitado a este múltiplo do tempo
+# previsto, apenas como salvaguarda (quem decide a parada é o tempo determinístico)
+FOLGA_TEMPO_REAL_DETERMINISTICO = 10
+
+# Marcada no primeiro Ctrl-C: as buscas seguintes param logo e os estágios usam a melhor solução disponível
+_interrupcao = threading.Event()
+# Em processos auxiliares, o evento do processo pai que também pede a interrupção (ver vincular_interrupcao)
+_interrupcao_externa = None
+
+
+def vincular_interrupcao(evento):
+    """
+    Faz `evento` (um multiprocessing.Event do processo pai) valer como Ctrl-C
+    neste processo. Usado como `initializer` dos processos auxiliares: o pai
+    marca o evento quando é interrompido e as buscas em andamento aqui param
+    com a melhor solução que tiverem.
+    """
+    global _interrupcao_externa
+    _interrupcao_externa = evento
+
+
+def execucao_interrompida() -> bool:
+    """Indica se o usuário pediu a interrupção (Ctrl-C) durante a otimização, aqui ou no processo pai."""
+    if _interrupcao_externa is not None and _interrupcao_externa.is_set():
+        _interrupcao.set()
+    return _interrupcao.is_set()
+
+
+@contextmanager
+def capturar_ctrl_c(parar: Optional[Callable[[], None]] = None):
+    """
+    Durante o bloco, Ctrl-C não levanta KeyboardInterrupt: a execução é marcada
+    como interrompida e `parar` (p.ex. StopSearch do solver) é chamado.
+
+    O handler Python só roda quando a thread principal volta ao interpretador,
+    o que não acontece durante um Solve; por isso o sinal também é escrito em
+    um socket (signal.set_wakeup_fd) lido por uma thread vigia, que chama
+    `parar` imediatamente. A mesma thread atende ao pedido do processo pai
+    (vincular_interrupcao). Fora da thread principal o bloco não muda nada.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    leitura, escrita = socket.socketpair()
+    escrita.setblocking(False)
+    encerrar = threading.Event()
+
+    def vigia():
+        externa_atendida = False
+        while not encerrar.is_set():
+            prontos, _, _ = select.select([leitura], [], [], 0.25)
+            if prontos and signal.SIGINT in leitura.recv(64):
+                if not _interrupcao.is_set():
+                    print("\n[!] Interrupção solicitada: usando a melhor solução encontrada até agora...", flush=True)
+                _interrupcao.set()
+                if parar is not None:
+                    parar()
+            elif not externa_atendida and _interrupcao_externa is not None and _interrupcao_externa.is_set():
+                externa_atendida = True
+                _interrupcao.set()
+                if parar is not None:
+                    parar()
+
+    handler_anterior = signal.signal(signal.SIGINT, lambda *_: _interrupcao.set())
+    fd_anterior = signal.set_wakeup_fd(escrita.fileno())
+    thread = threading.Thread(target=vigia, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        encerrar.set()
+        thread.join()
+        signal.set_wakeup_fd(fd_anterior)
+        signal.signal(signal.SIGINT, handler_anterior)
+        leitura.close()
+        escrita.close()
+
+
+def configurar_solver(solver: cp_model.CpSolver,
+                      parametros: ParametrosOtimizacao,
+                      tempo_limite: Optional[float] = None):
+    """
+    Aplica ao solver o limite de tempo e as configurações de paralelismo,
+    semente, tempo determinístico e perfil definidas em `parametros`.
+
+    No modo determinístico o limite da busca é o tempo determinístico
+    (`limite_tempo_deterministico`, ou `tempo_limite` na mesma unidade) e o
+    tempo real vira só uma salvaguarda. A semente só é alterada quando
+    `semente_solver` foi informada.
+    """
+    tempo = float(parametros.timeout_segundos if tempo_limite is None else tempo_limite)
+
+    for nome, valor in AJUSTES_POR_PERFIL.get(parametros.perfil_solver, {}).items():
+        setattr(solver.parameters, nome, valor)
+
+    if parametros.num_workers_solver > 0:
+        solver.parameters.num_workers = parametros.num_workers_solver
+    if parametros.semente_solver is not None:
+        solver.parameters.random_seed = parametros.semente_solver
+    if parametros.modo_deterministico:
+        solver.parameters.max_deterministic_time = float(parametros.limite_tempo_deterministico or tempo)
+        solver.parameters.max_time_in_seconds = FOLGA_TEMPO_REAL_DETERMINISTICO * tempo
+        # Com busca intercalada o CP-SAT é reproduzível para a mesma semente e número de workers
+        solver.parameters.interleave_search = True
+    else:
+        solver.parameters.max_time_in_seconds = tempo
+        if parametros.limite_tempo_deterministico > 0:
+            solver.parameters.max_deterministic_time = float(parametros.limite_tempo_deterministico)
+    # O Ctrl-C é tratado por capturar_ctrl_c (marca a interrupção e chama StopSearch)
+    solver.parameters.catch_sigint_signal = False
+
+
+class CriterioParada:
+    """
+    Decide quando interromper a busca antes do limite de tempo (minimização).
+
+    A busca para quando a solução atinge o limite inferior calculado (ótimo
+    provado), quando o gap relativo em relação ao melhor limite fica abaixo de
+    `gap_relativo_parada`, ou quando passam `segundos_sem_melhoria` sem nova
+    solução. Este último é vigiado por uma thread, pois o callback de solução
+    só é chamado quando há solução nova. Um Ctrl-C durante a busca também a
+    encerra (motivo 'interrompido'). O motivo da parada fica em `motivo`.
+
+    No modo determinístico nada depende do relógio: o gap e o limite inferior
+    já são avaliados a cada solução, e o tempo sem melhoria é medido em tempo
+    determinístico entre soluções (informado pelo backend), sem a thread. A
+    busca então para na primeira solução que chega depois do intervalo; sem
+    nova solução, quem encerra é o limite de tempo determinístico.
+    """
+
+    def __init__(self, parametros: ParametrosOtimizacao, limite_inferior: Optional[float] = None):
+        self.limite_inferior = limite_inferior
+        self.gap_relativo = parametros.gap_relativo_parada
+        self.segundos_sem_melhoria = parametros.segundos_sem_melhoria
+        self.deterministico = parametros.modo_deterministico
+        self.motivo: Optional[str] = None
+        self._ultima_melhoria: Optional[float] = None
+        self._melhor: Optional[float] = None
+
+    @property
+    def limite_atingido(self) -> bool:
+        """Indica se a parada ocorreu por atingir o limite inferior (a solução é ótima)."""
+        return self.motivo == 'limite_inferior'
+
+    def nova_solucao(self, objetivo: float, limite_solver: Optional[float] = None,
+                     tempo_deterministico: Optional[float] = None) -> bool:
+        """
+        Registra uma solução; retorna True se a busca deve parar.
+        `tempo_deterministico` (do solver) é o relógio do modo determinístico.
+        """
+        agora = tempo_deterministico if self.deterministico else time.time()
+        sem_melhoria = False
+        if self._melhor is None or objetivo < self._melhor:
+            sem_melhoria = self.deterministico and self.segundos_sem_melhoria > 0 and agora is not None \
+                and self._ultima_melhoria is not None and agora - self._ultima_melhoria >= self.segundos_sem_melhoria
+            self._melhor, self._ultima_melhoria = objetivo, agora
+        limite = max(v for v in (self.limite_inferior, limite_solver, float('-inf')) if v is not None)
+        if execucao_interrompida():
+            # Interrompida antes desta busca: a primeira solução basta
+            self.motivo = 'interrompido'
+        elif self.limite_inferior is not None and objetivo <= self.limite_inferior + 1e-9:
+            self.motivo = 'limite_inferior'
+        elif self.gap_relativo > 0 and limite > float('-inf') and \
+                (objetivo - limite) / max(1.0, abs(objetivo)) <= self.gap_relativo:
+            self.motivo = 'gap'
+        elif sem_melhoria:
+            self.motivo = 'sem_melhoria'
+        return self.motivo is not None
+
+    @contextmanager
+    def vigiar(self, parar: Callable[[], None]):
+        """
+        Durante o bloco, chama `parar` em um Ctrl-C ou se não houver melhoria
+        por `segundos_sem_melhoria`.
+        """
+        def interromper():
+            self.motivo = 'interrompido'
+            parar()
+
+        with capturar_ctrl_c(interromper):
+            with self._vigiar_melhoria(parar):
+                yield
+
+    @contextmanager
+    def _vigiar_melhoria(self, parar: Callable[[], None]):
+        """Thread que chama `parar` após `segundos_sem_melhoria` sem nova solução (tempo real)."""
+        if self.segundos_sem_melhoria <= 0 or self.deterministico:
+            yield
+            return
+        encerrar = threading.Event()
+
+        def vigia():
+            while not encerrar.wait(0.25):
+                if self._ultima_melhoria is not None and \
+                        time.time() - self._ultima_melhoria >= self.segundos_sem_melhoria:
+                    self.motivo = self.motivo or 'sem_melhoria'
+                    parar()
+                    return
+
+        thread = threading.Thread(target=vigia, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            encerrar.set()
+            thread.join()
+
+    def descrever(self) -> str:
+        """Motivo da parada antecipada em texto, ou string vazia."""
+        return {'limite_inferior': "limite inferior atingido",
+                'gap': f"gap abaixo de {self.gap_relativo:.1%}",
+                'sem_melhoria': f"{self.segundos_sem_melhoria}s sem melhoria",
+                'interrompido': "interrompida pelo usuário (Ctrl-C)"}.get(self.motivo, "")
@@ -1,40 +1,56 @@
 # ARQUIVO: otimizador/core/stage_1.py
 
 from collections import defaultdict
-from typing import List, Dict, Optional
-from ortools.sat.python import cp_model
+from typing import List, Dict, Optional, Sequence, Tuple
 import time  # <<< ALTERAÇÃO >>>
 
 # Import relativo para acessar modelos de dados e utils
 from ..data_models import Projeto, ParametrosOtimizacao
-from ..utils import calcular_meses_ativos
+from ..calendario import Calendario, CoberturaMeses, construir_cobertura
+from .backends import BackendSolver, criar_backend, STATUS_COM_SOLUCAO
+from .heuristics import nivelar_demanda_heuristica
+from .planner import escolher_motor_estagio1
+from .feasibility import limites_inferiores_pico
+from .solver_config import CriterioParada, execucao_interrompida
 
 
 # <<< ALTERAÇÃO: INÍCIO DA DEFINIÇÃO DO CALLBACK >>>
-class Stage1Callback(cp_model.CpSolverSolutionCallback):
-    """Callback para monitorar o progresso da otimização do Estágio 1."""
+class Stage1Callback:
+    """Callback para monitorar o progresso da otimização do Estágio 1 (qualquer backend)."""
 
-    def __init__(self, pico_prog_var, pico_rob_var):
-        cp_model.CpSolverSolutionCallback.__init__(self)
+    def __init__(self, pico_prog_var, pico_rob_var, variaveis: Optional[Dict] = None,
+                 intervalo_progresso: float = 1.0):
         self.__pico_prog = pico_prog_var
         self.__pico_rob = pico_rob_var
+        self.__variaveis = variaveis or {}
+        self.__intervalo_progresso = intervalo_progresso
+        self.__ultimo_progresso = float('-inf')
         self.__solution_count = 0
         self.__start_time = time.time()
+        # Cópia dos valores da melhor solução (refeita a cada solução), usada se a busca for
+        # interrompida sem devolver solução
+        self.melhor_solucao: Optional[Dict] = None
         print("\n[Callback] Monitorando o progresso da otimização do Estágio 1...")
 
-    def on_solution_callback(self):
-        """Chamado pelo solver a cada nova solução encontrada."""
+    def __call__(self, valor, objetivo: float):
+        """Chamado pelo backend a cada nova solução encontrada."""
         current_time = time.time()
-        pico_prog_val = self.Value(self.__pico_prog)
-        pico_rob_val = self.Value(self.__pico_rob)
-
         self.__solution_count += 1
+        # Cada solução melhora a anterior: a cópia nunca fica atrás da melhor solução
+        if self.__variaveis:
+            self.melhor_solucao = {chave: valor(var) for chave, var in self.__variaveis.items()}
 
+        # Só a mensagem de progresso é limitada pelo intervalo
+        if current_time - self.__ultimo_progresso < self.__intervalo_progresso:
+            return
+        self.__ultimo_progresso = current_time
+        pico_prog_val = valor(self.__pico_prog)
+        pico_rob_val = valor(self.__pico_rob)
         print(f"  > Sol. #{self.__solution_count} "
               f"({current_time - self.__start_time:.2f}s) | "
               f"Pico PROG: {pico_prog_val}, "
               f"Pico ROB: {pico_rob_val} | "
-              f"Objetivo: {self.ObjectiveValue():.0f}")
+              f"Objetivo: {objetivo:.0f}")
 
     def solution_count(self):
         return self.__solution_count
@@ -43,95 +59,269 @@ class Stage1Callback(cp_model.CpSolverSolutionCallback):
 # <<< ALTERAÇÃO: FIM DA DEFINIÇÃO DO CALLBACK >>>
 
 
-def otimizar_curva_demanda(projetos_flexiveis: List[Projeto],
-                           meses: List[str],
-                           parametros: ParametrosOtimizacao) -> Optional[Dict]:
-    """Otimiza o cronograma de início das turmas minimizando pico de demanda."""
-    print("\n" + "=" * 80 + "\nESTÁGIO 1: Otimização da Curva de Demanda\n" + "=" * 80)
-    model = cp_model.CpModel()
-    num_meses = len(meses)
-    meses_ferias_idx = [meses.index(m) for m in parametros.meses_ferias if m in meses]
+def _reparar_cronograma_anterior(cronograma_anterior: Dict,
+                                 projetos_flexiveis: List[Projeto],
+                                 meses_ferias_idx: List[int]) -> Dict[Tuple[str, str, int], int]:
+    """
+    Ajusta o cronograma de uma execução anterior aos projetos atuais para uso como dica.
+
+    Inícios fora da janela atual ou em meses de férias são descartados; se o
+    total de turmas mudou, o excedente sai dos meses mais carregados e o que
+    falta entra nos menos carregados. Projetos novos recebem uma distribuição
+    uniforme na janela.
+    """
+    dicas = {}
+    for proj in projetos_flexiveis:
+        validos = [m for m in range(proj.inicio_min, proj.inicio_max + 1) if m not in meses_ferias_idx]
+        if not validos: continue
+        for hab_flag, hab_nome in [('prog', 'PROG'), ('rob', 'ROB')]:
+            total = getattr(proj, hab_flag)
+            if total <= 0: continue
+            contagem = {m: 0 for m in validos}
+            for crono in cronograma_anterior.get(proj.nome, []):
+                if crono.get('habilidade', 'PROG') == hab_nome and crono['mes_inicio'] in contagem:
+                    contagem[crono['mes_inicio']] += crono['num_turmas']
+            diferenca = sum(contagem.values()) - total
+            while diferenca > 0:
+                contagem[max(contagem, key=contagem.get)] -= 1
+                diferenca -= 1
+            while diferenca < 0:
+                contagem[min(contagem, key=contagem.get)] += 1
+                diferenca += 1
+            for m, num_turmas in contagem.items():
+                dicas[(proj.nome, hab_nome, m)] = num_turmas
+    return dicas
+
+
+def _cronograma_das_contagens(contagens: Dict[Tuple[str, str, int], int],
+                              projetos_flexiveis: List[Projeto]) -> Dict:
+    """Converte contagens (projeto, habilidade, mês) no formato de cronograma do Estágio 1."""
+    cronograma_flexivel = defaultdict(list)
+    for proj in projetos_flexiveis:
+        for hab_nome in ('PROG', 'ROB'):
+            for m in range(proj.inicio_min, proj.inicio_max + 1):
+                num_turmas = contagens.get((proj.nome, hab_nome, m), 0)
+                if num_turmas > 0:
+                    cronograma_flexivel[proj.nome].append(
+                        {'mes_inicio': m, 'num_turmas': num_turmas, 'habilidade': hab_nome})
+    return dict(cronograma_flexivel)
+
+
+def _grupos_ondas_identicas(projetos_flexiveis: List[Projeto]) -> List[List[str]]:
+    """
+    Agrupa as ondas (`<projeto>_OndaN`) de um mesmo projeto com contagens,
+    duração e janela idênticas; dentro de um grupo elas são intercambiáveis.
+    """
+    grupos = defaultdict(list)
+    for proj in projetos_flexiveis:
+        base, sep, onda = proj.nome.rpartition('_Onda')
+        if sep and onda.isdigit():
+            grupos[(base, proj.prog, proj.rob, proj.duracao, proj.inicio_min, proj.inicio_max)].append(proj.nome)
+    return [nomes for nomes in grupos.values() if len(nomes) > 1]
+
+
+def _construir_modelo(projetos_flexiveis: List[Projeto], cobertura: CoberturaMeses, pico_maximo: int,
+                      backend: BackendSolver) -> Dict:
+    """
+    Monta o modelo do Estágio 1 no backend informado (CP-SAT ou MIP).
+
+    Só existem variáveis para os meses de início válidos (dentro da janela e
+    fora das férias), com domínio limitado pelas turmas de cada projeto; os
+    picos são limitados pelo pico máximo e definidos apenas por `pico >= demanda`,
+    o que basta para a minimização. O modelo é puramente linear.
+    """
 
     # --- Variáveis de Decisão (Início das turmas) ---
     inicio_vars_prog, inicio_vars_rob = {}, {}
+    demanda_m_prog_list, demanda_m_rob_list = defaultdict(list), defaultdict(list)
     for proj in projetos_flexiveis:
-        for m in range(proj.inicio_min, proj.inicio_max + 1):
-            if proj.prog > 0: inicio_vars_prog[(proj.nome, m)] = model.NewIntVar(0, proj.prog, f'p_{proj.nome}_{m}')
-            if proj.rob > 0: inicio_vars_rob[(proj.nome, m)] = model.NewIntVar(0, proj.rob, f'r_{proj.nome}_{m}')
+        inicios_validos = cobertura.inicios_letivos(proj.inicio_min, proj.inicio_max)
+        for m_i in inicios_validos:
+            if proj.prog > 0: inicio_vars_prog[(proj.nome, m_i)] = backend.nova_inteira(0, proj.prog, f'p_{proj.nome}_{m_i}')
+            if proj.rob > 0: inicio_vars_rob[(proj.nome, m_i)] = backend.nova_inteira(0, proj.rob, f'r_{proj.nome}_{m_i}')
+            # Cada início contribui para a demanda de todos os meses que a turma cobre
+            for m in cobertura.meses_ativos(proj.duracao, m_i):
+                if proj.prog > 0: demanda_m_prog_list[m].append(inicio_vars_prog[(proj.nome, m_i)])
+                if proj.rob > 0: demanda_m_rob_list[m].append(inicio_vars_rob[(proj.nome, m_i)])
 
-    # --- Restrição 1: Total de Turmas por Projeto ---
-    for proj in projetos_flexiveis:
-        if proj.prog > 0: model.Add(sum(
-            inicio_vars_prog.get((proj.nome, m), 0) for m in range(proj.inicio_min, proj.inicio_max + 1)) == proj.prog)
-        if proj.rob > 0: model.Add(sum(
-            inicio_vars_rob.get((proj.nome, m), 0) for m in range(proj.inicio_min, proj.inicio_max + 1)) == proj.rob)
-
-    # --- Restrição 2: Proibir INÍCIO de turmas nas férias ---
-    for mes_ferias in meses_ferias_idx:
-        for proj in projetos_flexiveis:
-            if proj.prog > 0 and (proj.nome, mes_ferias) in inicio_vars_prog:
-                model.Add(inicio_vars_prog[(proj.nome, mes_ferias)] == 0)
-            if proj.rob > 0 and (proj.nome, mes_ferias) in inicio_vars_rob:
-                model.Add(inicio_vars_rob[(proj.nome, mes_ferias)] == 0)
-
-    # --- Restrição 3: Cálculo da Demanda usando a nova lógica de "pulo" ---
-    demanda_total_prog, demanda_total_rob = {}, {}
-    for m in range(num_meses):
-        demanda_m_prog_list = [
-            inicio_vars_prog[(p.nome, m_i)]
-            for p in projetos_flexiveis if p.prog > 0
-            for m_i in range(p.inicio_min, p.inicio_max + 1)
-            if m in calcular_meses_ativos(m_i, p.duracao, meses_ferias_idx, num_meses)
-        ]
-        demanda_m_rob_list = [
-            inicio_vars_rob[(p.nome, m_i)]
-            for p in projetos_flexiveis if p.rob > 0
-            for m_i in range(p.inicio_min, p.inicio_max + 1)
-            if m in calcular_meses_ativos(m_i, p.duracao, meses_ferias_idx, num_meses)
-        ]
-        demanda_total_prog[m] = model.NewIntVar(0, 300, f'dt_prog_{m}')
-        demanda_total_rob[m] = model.NewIntVar(0, 300, f'dt_rob_{m}')
-        model.Add(demanda_total_prog[m] == sum(demanda_m_prog_list))
-        model.Add(demanda_total_rob[m] == sum(demanda_m_rob_list))
-
-    # --- Definição do Objetivo e Resolução ---
-    pico_prog = model.NewIntVar(0, 300, 'pico_prog')
-    pico_rob = model.NewIntVar(0, 300, 'pico_rob')
-    pico_consolidado_total = parametros.pico_maximo_turmas
-    for m in range(num_meses):
-        model.Add(demanda_total_prog[m] + demanda_total_rob[m] <= pico_consolidado_total)
-
-    model.AddMaxEquality(pico_prog, list(demanda_total_prog.values()))
-    model.AddMaxEquality(pico_rob, list(demanda_total_rob.values()))
-    model.Minimize(pico_prog + pico_rob)
+        # --- Restrição 1: Total de Turmas por Projeto ---
+        if proj.prog > 0: backend.adicionar(backend.soma([inicio_vars_prog[(proj.nome, m)] for m in inicios_validos]) == proj.prog)
+        if proj.rob > 0: backend.adicionar(backend.soma([inicio_vars_rob[(proj.nome, m)] for m in inicios_validos]) == proj.rob)
+
+    # --- Restrição 2: Pico consolidado e picos por habilidade ---
+    total_prog = sum(p.prog for p in projetos_flexiveis)
+    total_rob = sum(p.rob for p in projetos_flexiveis)
+    pico_prog = backend.nova_inteira(0, min(total_prog, pico_maximo), 'pico_prog')
+    pico_rob = backend.nova_inteira(0, min(total_rob, pico_maximo), 'pico_rob')
+    for m in set(demanda_m_prog_list) | set(demanda_m_rob_list):
+        demanda_prog = backend.soma(demanda_m_prog_list[m])
+        demanda_rob = backend.soma(demanda_m_rob_list[m])
+        backend.adicionar(backend.soma(demanda_m_prog_list[m] + demanda_m_rob_list[m]) <= pico_maximo)
+        if demanda_m_prog_list[m]: backend.adicionar(pico_prog >= demanda_prog)
+        if demanda_m_rob_list[m]: backend.adicionar(pico_rob >= demanda_rob)
+
+    # --- Restrição 3: Quebra de simetria entre ondas idênticas ---
+    # Trocar os cronogramas de duas ondas idênticas não muda a demanda: exige-se
+    # que o "centro de massa" dos inícios seja não decrescente ao longo das ondas.
+    grupos_ondas = _grupos_ondas_identicas(projetos_flexiveis)
+    for nomes in grupos_ondas:
+        centros = [backend.soma([m * var for vars_dict in (inicio_vars_prog, inicio_vars_rob)
+                                 for (nome_var, m), var in vars_dict.items() if nome_var == nome]) for nome in nomes]
+        for anterior, seguinte in zip(centros, centros[1:]):
+            backend.adicionar(anterior <= seguinte)
+
+    backend.minimizar(pico_prog + pico_rob)
+    return {
+        "backend": backend,
+        "inicio_prog": inicio_vars_prog,
+        "inicio_rob": inicio_vars_rob,
+        "pico_prog": pico_prog,
+        "pico_rob": pico_rob,
+        "grupos_ondas": grupos_ondas,
+    }
+
+
+def _ordenar_dicas_ondas(dicas: Dict[Tuple[str, str, int], int],
+                         grupos_ondas: List[List[str]]) -> Dict[Tuple[str, str, int], int]:
+    """Permuta os cronogramas-dica das ondas idênticas para respeitar a quebra de simetria."""
+    dicas = dict(dicas)
+    for nomes in grupos_ondas:
+        por_onda = {nome: {(hab, m): n for (proj, hab, m), n in dicas.items() if proj == nome} for nome in nomes}
+        ordenadas = sorted(nomes, key=lambda nome: sum(m * n for (_, m), n in por_onda[nome].items()))
+        for destino, origem in zip(nomes, ordenadas):
+            for (hab, m), n in por_onda[destino].items():
+                dicas[(destino, hab, m)] = 0
+            for (hab, m), n in por_onda[origem].items():
+                dicas[(destino, hab, m)] = n
+    return dicas
+
+
+def otimizar_curva_demanda(projetos_flexiveis: List[Projeto],
+                           meses: Sequence[str],
+                           parametros: ParametrosOtimizacao,
+                           cobertura: Optional[CoberturaMeses] = None,
+                           cronograma_anterior: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Otimiza o cronograma de início das turmas minimizando pico de demanda.
+
+    Com o motor 'heuristica' (escolhido ou decidido por 'auto') o cronograma vem apenas da
+    heurística de nivelamento; caso contrário ela serve de dica para o modelo
+    exato, resolvido pelo backend `parametros.backend_estagio1`.
+    Se `cronograma_anterior` for informado, ele é reparado para os projetos
+    atuais e usado como dica (warm start) no lugar da heurística.
+    """
+    print("\n" + "=" * 80 + "\nESTÁGIO 1: Otimização da Curva de Demanda\n" + "=" * 80)
+    num_meses = len(meses)
+    if cobertura is None and isinstance(meses, Calendario):
+        cobertura = meses.cobertura
+    if cobertura is None:
+        ferias = set(parametros.meses_ferias)
+        cobertura = construir_cobertura(num_meses, [idx for idx, m in enumerate(meses) if m in ferias],
+                                        projetos_flexiveis)
+    meses_ferias_idx = cobertura.meses_ferias_idx
+
+    motor = parametros.motor_estagio1
+    if motor == 'auto':
+        motor = escolher_motor_estagio1(projetos_flexiveis, cobertura, parametros)["motor"]
+        print(f"Motor escolhido automaticamente: {motor}")
+
+    # --- Heurística de nivelamento: motor próprio ou ponto de partida do CP-SAT ---
+    # Seu tempo (e o da construção do modelo) sai do orçamento do estágio, não se soma a ele
+    inicio = time.time()
+    heuristico = nivelar_demanda_heuristica(projetos_flexiveis, cobertura, meses_ferias_idx,
+                                            parametros.pico_maximo_turmas,
+                                            tempo_limite=min(10.0, parametros.timeout_segundos / 4))
+    print(f"Heurística de nivelamento: Pico PROG {heuristico['pico_prog']}, Pico ROB {heuristico['pico_rob']}")
+    if motor != 'heuristica' and execucao_interrompida():
+        print("[!] Execução interrompida: o Estágio 1 usa o cronograma da heurística.")
+        motor = 'heuristica'
+    if motor == 'heuristica':
+        if heuristico['excesso'] > 0:
+            print(f"\n[✗] FALHA: a heurística excedeu o pico máximo em {heuristico['excesso']} turmas.")
+            return None
+        print("\n[✓] SUCESSO! Status: HEURISTICA")
+        return _resultado(heuristico['contagens'], heuristico['pico_prog'], heuristico['pico_rob'],
+                          'HEURISTICA', projetos_flexiveis, meses_ferias_idx, parametros)
+
+    backend = criar_backend(parametros.backend_estagio1, parametros)
+    modelo = _construir_modelo(projetos_flexiveis, cobertura, parametros.pico_maximo_turmas, backend)
+    inicio_vars_prog, inicio_vars_rob = modelo["inicio_prog"], modelo["inicio_rob"]
+    pico_prog, pico_rob = modelo["pico_prog"], modelo["pico_rob"]
+
+    # --- Warm start: execução anterior, ou o cronograma da heurística ---
+    if cronograma_anterior:
+        dicas = _reparar_cronograma_anterior(cronograma_anterior, projetos_flexiveis, meses_ferias_idx)
+        print(f"[Warm start] Dicas aplicadas a partir da solução anterior ({len(dicas)} inícios).")
+    else:
+        dicas = heuristico['contagens']
+    dicas = _ordenar_dicas_ondas(dicas, modelo["grupos_ondas"])
+    for (proj_nome, m), var in inicio_vars_prog.items():
+        backend.dica(var, dicas.get((proj_nome, 'PROG', m), 0))
+    for (proj_nome, m), var in inicio_vars_rob.items():
+        backend.dica(var, dicas.get((proj_nome, 'ROB', m), 0))
+
+    # --- Limites inferiores dos picos: restrições e critério de parada ---
+    limites = limites_inferiores_pico(projetos_flexiveis, cobertura)
+    backend.adicionar(pico_prog >= limites['PROG'])
+    backend.adicionar(pico_rob >= limites['ROB'])
+    print(f"Limite inferior dos picos: PROG {limites['PROG']}, ROB {limites['ROB']}")
+    criterio = CriterioParada(parametros, limites['PROG'] + limites['ROB'])
 
     # --- Resolução do Modelo ---
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = float(parametros.timeout_segundos)
+    print(f"Resolvendo com o backend '{backend.nome}'...")
 
     # <<< ALTERAÇÃO: INSTANCIAR E USAR O CALLBACK >>>
-    callback = Stage1Callback(pico_prog, pico_rob)
-    status = solver.Solve(model, callback)
-
-    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        print(f"\n[✓] SUCESSO! Status: {solver.StatusName(status)}")
-        cronograma_flexivel = defaultdict(list)
-        for proj in projetos_flexiveis:
-            for hab_flag, vars_dict, hab_nome in [('prog', inicio_vars_prog, 'PROG'), ('rob', inicio_vars_rob, 'ROB')]:
-                if getattr(proj, hab_flag) > 0:
-                    for m in range(proj.inicio_min, proj.inicio_max + 1):
-                        num_turmas = solver.Value(vars_dict.get((proj.nome, m), 0))
-                        if num_turmas > 0:
-                            cronograma_flexivel[proj.nome].append(
-                                {'mes_inicio': m, 'num_turmas': num_turmas, 'habilidade': hab_nome})
-        return {
-            "cronograma": dict(cronograma_flexivel),
-            "pico_max": solver.Value(pico_prog) + solver.Value(pico_rob),
-            "pico_prog": solver.Value(pico_prog),
-            "pico_rob": solver.Value(pico_rob),
-            "meses_ferias": meses_ferias_idx,
-            "parametros": parametros
-        }
+    variaveis = {(proj_nome, hab_nome, m): var
+                 for hab_nome, vars_dict in (('PROG', inicio_vars_prog), ('ROB', inicio_vars_rob))
+                 for (proj_nome, m), var in vars_dict.items()}
+    variaveis.update({'pico_prog': pico_prog, 'pico_rob': pico_rob})
+    callback = Stage1Callback(pico_prog, pico_rob, variaveis, parametros.intervalo_captura_segundos)
+    try:
+        # No modo determinístico o limite não pode depender do relógio, ou a execução deixa de ser reprodutível
+        tempo_restante = parametros.timeout_segundos if parametros.modo_deterministico \
+            else max(1.0, parametros.timeout_segundos - (time.time() - inicio))
+        status = backend.resolver(tempo_restante, callback, criterio=criterio)
+    except KeyboardInterrupt:
+        criterio.motivo, status = 'interrompido', 'UNKNOWN'
+    if criterio.motivo:
+        print(f"Busca encerrada antes do tempo limite: {criterio.descrever()}")
+
+    if status in STATUS_COM_SOLUCAO:
+        valores = {chave: backend.valor(var) for chave, var in variaveis.items()}
+    elif callback.melhor_solucao is not None:
+        # Interrompida sem solução final: vale a melhor solução copiada pelo callback
+        valores, status = callback.melhor_solucao, 'FEASIBLE'
+    elif execucao_interrompida() and heuristico['excesso'] == 0:
+        print("[!] Execução interrompida antes da primeira solução: usando o cronograma da heurística.")
+        valores = dict(heuristico['contagens'], pico_prog=heuristico['pico_prog'], pico_rob=heuristico['pico_rob'])
+        status = 'HEURISTICA'
     else:
-        print(f"\n[✗] FALHA: Status {solver.StatusName(status)}")
-        return None
\ No newline at end of file
+        print(f"\n[✗] FALHA: Status {status}")
+        return None
+
+    print(f"\n[✓] SUCESSO! Status: {status}")
+    contagens = {chave: n for chave, n in valores.items() if isinstance(chave, tuple)}
+    return _resultado(contagens, valores['pico_prog'], valores['pico_rob'], status,
+                      projetos_flexiveis, meses_ferias_idx, parametros)
+
+
+def _resultado(contagens: Dict[Tuple[str, str, int], int], pico_prog: int, pico_rob: int, status: str,
+               projetos_flexiveis: List[Projeto], meses_ferias_idx: List[int],
+               parametros: ParametrosOtimizacao) -> Dict:
+    """
+    Resultado do Estágio 1. `otimo_comprovado` só é verdadeiro com status
+    'OPTIMAL' em uma execução não interrompida; nos demais casos o cronograma
+    é a melhor solução disponível (rascunho).
+    """
+    interrompido = execucao_interrompida()
+    return {
+        "cronograma": _cronograma_das_contagens(contagens, projetos_flexiveis),
+        "pico_max": pico_prog + pico_rob,
+        "pico_prog": pico_prog,
+        "pico_rob": pico_rob,
+        "meses_ferias": meses_ferias_idx,
+        "parametros": parametros,
+        "status_solver": status,
+        "otimo_comprovado": status == 'OPTIMAL' and not interrompido,
+        "interrompido": interrompido,
+    }
@@ -1,35 +1,47 @@
 # ARQUIVO: otimizador/core/stage_2.py
 
 from collections import defaultdict
-from typing import List, Dict, Optional
-from ortools.sat.python import cp_model
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import List, Dict, Optional, Sequence, Tuple
 import time  # <<< ALTERAÇÃO >>>
 import sys  # <<< ALTERAÇÃO >>>
+import numpy as np
 
 # Import relativo para acessar modelos de dados e utils
-from ..data_models import Projeto, ParametrosOtimizacao, Turma, Instrutor
-from ..utils import calcular_meses_ativos
+from ..data_models import Projeto, ParametrosOtimizacao, Turma, Instrutor, Atribuicoes, TabelaTurmas
+from ..calendario import CoberturaMeses, construir_cobertura
+from .solver_config import CriterioParada, execucao_interrompida, capturar_ctrl_c, vincular_interrupcao
+from .backends import BackendSolver, BackendCpSat, criar_backend, STATUS_COM_SOLUCAO
+from .heuristics import construir_atribuicao_heuristica
+from .column_generation import resolver_por_geracao_colunas
+from .feasibility import analisar_spread_estagio2
+from .planner import perfis_das_turmas, escolher_motor_estagio2, aplicar_escolha_estagio2
 
 
 # <<< ALTERAÇÃO: INÍCIO DA DEFINIÇÃO DO CALLBACK >>>
-class Stage2Callback(cp_model.CpSolverSolutionCallback):
-    """Callback para monitorar o progresso da alocação de instrutores."""
+class Stage2Callback:
+    """Callback para monitorar o progresso da alocação de instrutores (qualquer backend)."""
 
-    def __init__(self, total_instrutores_var, spread_var):
-        cp_model.CpSolverSolutionCallback.__init__(self)
+    def __init__(self, total_instrutores_var, spread_var, intervalo_progresso: float = 0.0):
         self.__total_instrutores = total_instrutores_var
         self.__spread = spread_var
+        self.__intervalo_progresso = intervalo_progresso
+        self.__ultimo_progresso = float('-inf')
         self.__solution_count = 0
         self.__start_time = time.time()
         print("\n[Callback] Monitorando o progresso da otimização do Estágio 2...")
 
-    def on_solution_callback(self):
-        """Chamado a cada nova solução encontrada."""
+    def __call__(self, valor, objetivo: float):
+        """Chamado pelo backend a cada nova solução encontrada."""
         current_time = time.time()
-        instrutores = self.Value(self.__total_instrutores)
-        spread = self.Value(self.__spread)
-
         self.__solution_count += 1
+        # A solução em si é guardada pelo backend a cada chamada; o intervalo limita só a mensagem
+        if current_time - self.__ultimo_progresso < self.__intervalo_progresso:
+            return
+        self.__ultimo_progresso = current_time
+        instrutores = valor(self.__total_instrutores)
+        spread = valor(self.__spread)
 
         # O 'flush=True' força a impressão imediata no terminal, evitando problemas de buffer.
         print(f"\n  >>> NOVA SOLUÇÃO #{self.__solution_count} ({current_time - self.__start_time:.2f}s) | "
@@ -43,153 +55,1029 @@ class Stage2Callback(cp_model.CpSolverSolutionCallback):
 # <<< ALTERAÇÃO: FIM DA DEFINIÇÃO DO CALLBACK >>>
 
 
-def otimizar_atribuicao_e_carga(cronograma_flexivel: Dict,
-                                projetos: List[Projeto],
-                                meses: List[str],
-                                meses_ferias: List[int],
-                                parametros: ParametrosOtimizacao) -> Optional[Dict]:
+def _agrupar_coortes(turmas: List[Turma]) -> List[Tuple[Tuple[str, str, int], List[Turma]]]:
     """
-    Aloca turmas a instrutores com restrição de spread máximo.
-    (Versão Corrigida)
+    Agrupa turmas idênticas (mesmo projeto, habilidade e mês de início) em coortes,
+    preservando a ordem de criação das turmas.
     """
-    print("\n" + "=" * 80)
-    print("ESTÁGIO 2: Alocação de Instrutores")
-    print("=" * 80)
-    print(f"Capacidade máxima por instrutor: {parametros.capacidade_max_instrutor} turmas/mês")
-    print(f"Spread máximo configurado: {parametros.spread_maximo}\n")
+    coortes = defaultdict(list)
+    for t in turmas:
+        coortes[(t.projeto, t.habilidade, t.mes_inicio)].append(t)
+    return list(coortes.items())
 
-    # 1. Criação de Turmas a partir do cronograma do Estágio 1
-    all_turmas, turma_counter = [], 0
+
+def _indice_mes_itens(chaves: List[Tuple[int, int]], num_meses: int,
+                      cobertura: CoberturaMeses) -> List[Tuple[int, ...]]:
+    """
+    Índice mês -> posições dos itens ativos, para itens dados por (duração, mês de início).
+    Itens com a mesma chave compartilham a mesma linha da matriz de cobertura.
+    """
+    ativos = np.zeros((len(chaves), num_meses), dtype=bool)
+    posicoes_por_chave = defaultdict(list)
+    for pos, chave in enumerate(chaves): posicoes_por_chave[chave].append(pos)
+    for (duracao, mes_inicio), posicoes in posicoes_por_chave.items():
+        ativos[posicoes] = cobertura.matriz(duracao)[mes_inicio]
+    return [tuple(np.flatnonzero(ativos[:, m]).tolist()) for m in range(num_meses)]
+
+
+def _linhas_capacidade(indice_mes: List[Tuple[int, ...]], tamanhos: List[int],
+                       capacidades: np.ndarray) -> List[Tuple[List[int], int]]:
+    """
+    Restrições de capacidade mensal (itens, capacidade) de um instrutor.
+
+    `capacidades` é a capacidade restante em cada mês (a do instrutor menos a
+    ocupação já fixada). Meses cujo total de turmas ativas não passa da
+    capacidade não restringem nada; meses com o mesmo conjunto ativo ficam
+    com a menor capacidade; e uma linha contida em outra de capacidade não
+    maior já é implicada por ela.
+    """
+    menor_capacidade = {}
+    for linha, capacidade in zip(indice_mes, capacidades.tolist()):
+        if sum(tamanhos[k] for k in linha) > capacidade:
+            menor_capacidade[linha] = min(capacidade, menor_capacidade.get(linha, capacidade))
+    mantidas = []
+    for linha in sorted(menor_capacidade, key=len, reverse=True):
+        conjunto, capacidade = set(linha), menor_capacidade[linha]
+        if not any(conjunto <= outra and cap_outra <= capacidade for outra, cap_outra in mantidas):
+            mantidas.append((conjunto, capacidade))
+    return [(sorted(conjunto), capacidade) for conjunto, capacidade in mantidas]
+
+
+def _capacidades_mensais(instrutor: Instrutor, num_meses: int,
+                         ocupacao_fixa: Optional[Dict[str, np.ndarray]]) -> np.ndarray:
+    """Capacidade restante do instrutor em cada mês, descontadas as turmas já fixadas."""
+    capacidades = np.full(num_meses, instrutor.capacidade, dtype=np.int64)
+    if ocupacao_fixa and instrutor.id in ocupacao_fixa:
+        capacidades -= ocupacao_fixa[instrutor.id]
+    return capacidades
+
+
+def _adicionar_linhas_capacidade(backend: BackendSolver, instrutores: List[Instrutor], variaveis_por_id: Dict,
+                                 indice_mes: List[Tuple[int, ...]], tamanhos: List[int], num_meses: int,
+                                 ocupacao_fixa: Optional[Dict[str, np.ndarray]]):
+    """Adiciona as linhas de capacidade de cada instrutor; perfis de capacidade iguais reaproveitam as linhas."""
+    linhas_por_perfil = {}
+    for i in instrutores:
+        capacidades = _capacidades_mensais(i, num_meses, ocupacao_fixa)
+        perfil = capacidades.tobytes()
+        if perfil not in linhas_por_perfil:
+            linhas_por_perfil[perfil] = _linhas_capacidade(indice_mes, tamanhos, capacidades)
+        variaveis = variaveis_por_id[i.id]
+        for linha, capacidade in linhas_por_perfil[perfil]:
+            backend.adicionar(backend.soma([variaveis[k] for k in linha]) <= capacidade)
+
+
+def _construir_modelo_turmas(backend: BackendSolver, turmas_por_habilidade: Dict, instrutores_por_habilidade: Dict,
+                             num_meses: int, cobertura: CoberturaMeses,
+                             ocupacao_fixa: Optional[Dict[str, np.ndarray]] = None) -> Tuple[Dict, Dict]:
+    """
+    Formulação original: uma variável booleana por par (turma, instrutor).
+
+    Retorna o dicionário de variáveis de atribuição e, por instrutor, a lista de
+    termos cuja soma é a sua carga total.
+    """
+    assign, carga_por_id = {}, {}
+    for habilidade, instrutores in instrutores_por_habilidade.items():
+        turmas = turmas_por_habilidade.get(habilidade, [])
+        for t in turmas:
+            for i in instrutores:
+                assign[(t.id, i.id)] = backend.nova_booleana(f'assign_{t.id}_{i.id}')
+            backend.adicionar(backend.soma([assign[(t.id, i.id)] for i in instrutores]) == 1)
+
+        for i in instrutores:
+            carga_por_id[i.id] = [assign[(t.id, i.id)] for t in turmas]
+        indice_mes = _indice_mes_itens([(t.duracao, t.mes_inicio) for t in turmas], num_meses, cobertura)
+        _adicionar_linhas_capacidade(backend, instrutores, carga_por_id, indice_mes, [1] * len(turmas),
+                                     num_meses, ocupacao_fixa)
+    return assign, carga_por_id
+
+
+def _construir_modelo_coortes(backend: BackendSolver, coortes: List, instrutores_por_habilidade: Dict,
+                              num_meses: int, cobertura: CoberturaMeses,
+                              ocupacao_fixa: Optional[Dict[str, np.ndarray]] = None) -> Tuple[Dict, Dict]:
+    """
+    Formulação agregada: uma variável inteira por par (coorte, instrutor) contando
+    quantas turmas da coorte o instrutor recebe. Turmas de uma mesma coorte são
+    intercambiáveis, o que elimina a simetria entre elas.
+    """
+    qtd = {}
+    for c_idx, ((proj_nome, habilidade, mes_inicio), turmas) in enumerate(coortes):
+        for i in instrutores_por_habilidade.get(habilidade, []):
+            limite = min(len(turmas), i.capacidade)
+            qtd[(c_idx, i.id)] = backend.nova_inteira(0, limite, f'qtd_{proj_nome}_{mes_inicio}_{i.id}')
+        backend.adicionar(backend.soma(
+            [qtd[(c_idx, i.id)] for i in instrutores_por_habilidade.get(habilidade, [])]) == len(turmas))
+
+    coortes_por_habilidade = defaultdict(list)
+    for c_idx, ((_, habilidade, _), turmas) in enumerate(coortes):
+        coortes_por_habilidade[habilidade].append(c_idx)
+
+    carga_por_id = {}
+    for habilidade, instrutores in instrutores_por_habilidade.items():
+        indices = coortes_por_habilidade[habilidade]
+        for i in instrutores:
+            carga_por_id[i.id] = [qtd[(c_idx, i.id)] for c_idx in indices]
+        indice_mes = _indice_mes_itens([(coortes[c][1][0].duracao, coortes[c][0][2]) for c in indices],
+                                       num_meses, cobertura)
+        _adicionar_linhas_capacidade(backend, instrutores, carga_por_id, indice_mes,
+                                     [len(coortes[c][1]) for c in indices], num_meses, ocupacao_fixa)
+    return qtd, carga_por_id
+
+
+def _segmentos_ativos(meses_ativos: Tuple[int, ...]) -> List[Tuple[int, int]]:
+    """Divide os meses ativos de uma turma em trechos contíguos (início, tamanho), separados pelas férias."""
+    segmentos = []
+    for m in meses_ativos:
+        if segmentos and segmentos[-1][0] + segmentos[-1][1] == m:
+            segmentos[-1] = (segmentos[-1][0], segmentos[-1][1] + 1)
+        else:
+            segmentos.append((m, 1))
+    return segmentos
+
+
+def _construir_modelo_intervalos(backend: BackendCpSat, turmas_por_habilidade: Dict,
+                                 instrutores_por_habilidade: Dict, cobertura: CoberturaMeses,
+                                 ocupacao_fixa: Optional[Dict[str, np.ndarray]] = None) -> Tuple[Dict, Dict]:
+    """
+    Formulação de escalonamento: cada turma é um conjunto de intervalos (um por
+    trecho contíguo de meses ativos) e a carga mensal de cada instrutor é um
+    recurso cumulativo com capacidade igual à do instrutor.
+
+    Para cada par (turma, instrutor) os intervalos são opcionais e presentes
+    exatamente quando a turma é atribuída ao instrutor; as variáveis de
+    atribuição têm o mesmo formato da formulação por turmas. A ocupação já
+    fixada entra como intervalos fixos de um mês. Só o CP-SAT tem intervalos:
+    o modelo é montado diretamente em `backend.model`.
+    """
+    model = backend.model
+    assign, carga_por_id = {}, {}
+    for habilidade, instrutores in instrutores_por_habilidade.items():
+        turmas = turmas_por_habilidade.get(habilidade, [])
+        segmentos = {t.id: _segmentos_ativos(cobertura.meses_ativos(t.duracao, t.mes_inicio)) for t in turmas}
+        for t in turmas:
+            for i in instrutores:
+                assign[(t.id, i.id)] = model.NewBoolVar(f'assign_{t.id}_{i.id}')
+            model.AddExactlyOne(assign[(t.id, i.id)] for i in instrutores)
+
+        for i in instrutores:
+            intervalos = [
+                model.NewOptionalFixedSizeIntervalVar(inicio, tamanho, assign[(t.id, i.id)],
+                                                      f'int_{t.id}_{inicio}_{i.id}')
+                for t in turmas for inicio, tamanho in segmentos[t.id]]
+            demandas = [1] * len(intervalos)
+            ocupacao = (ocupacao_fixa or {}).get(i.id)
+            if ocupacao is not None:
+                for m in np.flatnonzero(ocupacao):
+                    intervalos.append(model.NewFixedSizeIntervalVar(int(m), 1, f'fixo_{m}_{i.id}'))
+                    demandas.append(int(ocupacao[m]))
+            model.AddCumulative(intervalos, demandas, i.capacidade)
+            carga_por_id[i.id] = [assign[(t.id, i.id)] for t in turmas]
+    return assign, carga_por_id
+
+
+def _adicionar_quebra_simetria(backend: BackendSolver, instrutores: List[Instrutor], primeira_turma,
+                               usado_por_id: Dict, carga_total_por_id: Dict):
+    """
+    Elimina as reordenações equivalentes do pool de instrutores de uma habilidade.
+
+    A turma (ou coorte) de menor índice fica com o primeiro instrutor; os demais
+    instrutores são usados em ordem (k só é usado se k-1 for) e com cargas totais
+    não crescentes. A ordenação das cargas começa no segundo instrutor, pois o
+    primeiro já está fixado pela turma e não é necessariamente o de maior carga.
+    Com `primeira_turma` None (nenhuma turma fixada) a ordenação vale desde o primeiro.
+    """
+    inicio_ordenacao = 0 if primeira_turma is None else 1
+    if primeira_turma is not None:
+        backend.adicionar(primeira_turma >= 1)
+    # Implicações entre booleanas escritas como desigualdades (atual usado => anterior usado)
+    for anterior, atual in zip(instrutores[inicio_ordenacao:], instrutores[inicio_ordenacao + 1:]):
+        backend.adicionar(usado_por_id[atual.id] <= usado_por_id[anterior.id])
+        backend.adicionar(carga_total_por_id[atual.id] <= carga_total_por_id[anterior.id])
+    if primeira_turma is not None and len(instrutores) > 1:
+        backend.adicionar(usado_por_id[instrutores[1].id] <= usado_por_id[instrutores[0].id])
+
+
+def _posicoes_dos_instrutores(instrutores_por_habilidade: Dict) -> Tuple[List[Instrutor], Dict[str, int]]:
+    """Lista única dos instrutores do pool e a posição, nela, do primeiro instrutor de cada habilidade."""
+    instrutores, deslocamento = [], {}
+    for habilidade, instrutores_hab in instrutores_por_habilidade.items():
+        deslocamento[habilidade] = len(instrutores)
+        instrutores += instrutores_hab
+    return instrutores, deslocamento
+
+
+def _extrair_atribuicoes_turmas(valores: np.ndarray, turmas: Sequence[Turma],
+                                instrutores_por_habilidade: Dict) -> Atribuicoes:
+    """
+    Monta as atribuições a partir dos valores das booleanas (turma, instrutor),
+    lidos em bloco na ordem de criação das variáveis: por habilidade, turma a
+    turma, com os instrutores do pool em sequência. O instrutor de cada turma é
+    a posição do 1 na sua linha.
+    """
+    instrutores, deslocamento = _posicoes_dos_instrutores(instrutores_por_habilidade)
+    posicoes_por_habilidade = defaultdict(list)
+    for k, t in enumerate(turmas): posicoes_por_habilidade[t.habilidade].append(k)
+
+    instrutor_da_turma = np.full(len(turmas), -1, dtype=np.int64)
+    inicio = 0
+    for habilidade, instrutores_hab in instrutores_por_habilidade.items():
+        posicoes = posicoes_por_habilidade.get(habilidade, [])
+        if not posicoes or not instrutores_hab: continue
+        fim = inicio + len(posicoes) * len(instrutores_hab)
+        bloco = valores[inicio:fim].reshape(len(posicoes), len(instrutores_hab))
+        instrutor_da_turma[posicoes] = deslocamento[habilidade] + bloco.argmax(axis=1)
+        inicio = fim
+
+    atribuidas = np.flatnonzero(instrutor_da_turma >= 0)
+    return Atribuicoes(TabelaTurmas.de_turmas(turmas).selecionar(atribuidas), instrutores,
+                       instrutor_da_turma[atribuidas])
+
+
+def _extrair_atribuicoes_coortes(valores: np.ndarray, coortes: List,
+                                 instrutores_por_habilidade: Dict) -> Atribuicoes:
+    """
+    Expande as contagens por coorte (lidas em bloco, na ordem de criação: coorte
+    a coorte, com os instrutores do pool em sequência) em atribuições turma -> instrutor.
+    """
+    instrutores, deslocamento = _posicoes_dos_instrutores(instrutores_por_habilidade)
+    turmas, posicoes = [], []
+    for (_, habilidade, _), turmas_coorte in coortes:
+        n_instrutores = len(instrutores_por_habilidade.get(habilidade, []))
+        if not n_instrutores: continue
+        turmas += turmas_coorte
+        posicoes.append(deslocamento[habilidade] + np.arange(n_instrutores))
+    if not posicoes:
+        return Atribuicoes([], instrutores, [])
+    return Atribuicoes(turmas, instrutores, np.repeat(np.concatenate(posicoes), valores))
+
+
+def _criar_turmas(cronograma_flexivel: Dict, projetos: List[Projeto]) -> TabelaTurmas:
+    """Cria as turmas individuais (em colunas) a partir do cronograma do Estágio 1."""
     projetos_dict = {p.nome: p for p in projetos}
+    nomes, projeto, habilidade, mes_inicio, duracao, quantidade = [], [], [], [], [], []
     for proj_nome, cronogramas in cronograma_flexivel.items():
         proj_details = projetos_dict.get(proj_nome)
         if not proj_details: continue
+        nomes.append(proj_nome)
         for crono in cronogramas:
-            habilidade_str = crono.get('habilidade', 'PROG')
-            habilidade = 'PROG' if habilidade_str == 'PROG' else 'ROBOTICA'
-            for _ in range(crono['num_turmas']):
-                all_turmas.append(
-                    Turma(f'{proj_nome}_{habilidade[:3]}_{turma_counter}', proj_nome, habilidade,
-                          crono['mes_inicio'], proj_details.duracao)
-                )
-                turma_counter += 1
-    print(f"Total de turmas criadas: {len(all_turmas)}")
+            projeto.append(len(nomes) - 1)
+            habilidade.append(0 if crono.get('habilidade', 'PROG') == 'PROG' else 1)
+            mes_inicio.append(crono['mes_inicio'])
+            duracao.append(proj_details.duracao)
+            quantidade.append(crono['num_turmas'])
+    # Uma linha por turma; o número sequencial (sufixo do id) segue a ordem do cronograma
+    return TabelaTurmas(nomes, *(np.repeat(np.asarray(coluna, dtype=np.int64), quantidade)
+                                 for coluna in (projeto, habilidade, mes_inicio, duracao)))
 
-    # 2. Criação do Pool de Instrutores
-    num_max_instrutores_flex = 80
-    all_instrutores = [
-        Instrutor(id=f'{hab}_{i}', habilidade=hab, capacidade=parametros.capacidade_max_instrutor, laboratorio_id=None)
-        for hab in ['PROG', 'ROBOTICA'] for i in range(num_max_instrutores_flex)]
-    print(f"Pool de instrutores: {len(all_instrutores)}\n")
 
-    # 3. Construção do Modelo de Otimização
-    model = cp_model.CpModel()
-    num_meses = len(meses)
-    turmas_por_habilidade = defaultdict(list)
-    for t in all_turmas: turmas_por_habilidade[t.habilidade].append(t)
-    instrutores_por_habilidade = defaultdict(list)
-    for i in all_instrutores: instrutores_por_habilidade[i.habilidade].append(i)
+def _criar_pool_instrutores(tamanhos_pool: Dict[str, int], capacidade: int,
+                            existentes: Optional[Dict[str, List[Instrutor]]] = None) -> List[Instrutor]:
+    """
+    Cria o pool de instrutores candidatos com o tamanho definido para cada habilidade.
+    Instrutores `existentes` entram primeiro, com os mesmos ids; os novos recebem índices ainda não usados.
+    """
+    existentes = existentes or {}
+    pool = []
+    for hab in ['PROG', 'ROBOTICA']:
+        ja_criados = existentes.get(hab, [])
+        proximo = max((int(i.id.split('_')[1]) + 1 for i in ja_criados), default=0)
+        pool += ja_criados
+        pool += [Instrutor(id=f'{hab}_{proximo + k}', habilidade=hab, capacidade=capacidade, laboratorio_id=None)
+                 for k in range(tamanhos_pool.get(hab, 0) - len(ja_criados))]
+    return pool
+
 
-    assign = {}
+def calcular_limites_inferiores(turmas_por_habilidade: Dict[str, List[Turma]], capacidade: int,
+                                num_meses: int, cobertura: CoberturaMeses) -> Dict[str, int]:
+    """
+    Limite inferior do número de instrutores por habilidade: o pico mensal de
+    turmas simultâneas dividido pela capacidade de cada instrutor (arredondado para cima).
+    """
+    limites = {}
     for habilidade, turmas in turmas_por_habilidade.items():
+        demanda = np.zeros(num_meses, dtype=np.int64)
         for t in turmas:
-            for i in instrutores_por_habilidade.get(habilidade, []):
-                assign[(t.id, i.id)] = model.NewBoolVar(f'assign_{t.id[:15]}_{i.id}')
+            demanda += cobertura.matriz(t.duracao)[t.mes_inicio]
+        pico = int(demanda.max()) if num_meses else 0
+        limites[habilidade] = -(-pico // capacidade)
+    return limites
 
-    for t_list in turmas_por_habilidade.values():
-        for t in t_list:
-            model.AddExactlyOne(assign[(t.id, i.id)] for i in instrutores_por_habilidade[t.habilidade])
 
-    for i in all_instrutores:
-        for m in range(num_meses):
-            carga_mensal = []
-            for t in turmas_por_habilidade[i.habilidade]:
-                meses_ativos = calcular_meses_ativos(t.mes_inicio, t.duracao, meses_ferias, num_meses)
-                if m in meses_ativos:
-                    carga_mensal.append(assign[(t.id, i.id)])
-            if carga_mensal:
-                model.Add(sum(carga_mensal) <= i.capacidade)
-
-    cargas_totais, instrutores_usados = [], []
-    for i in all_instrutores:
-        usado = model.NewBoolVar(f'usado_{i.id}')
-        carga_total = model.NewIntVar(0, 300, f'carga_{i.id}')
-        turmas_do_instrutor = [assign.get((t.id, i.id)) for t in turmas_por_habilidade[i.habilidade] if
-                               assign.get((t.id, i.id)) is not None]
+def _construir_modelo(backend: BackendSolver, all_turmas: Sequence[Turma], turmas_por_habilidade: Dict,
+                      all_instrutores: List[Instrutor], parametros: ParametrosOtimizacao, num_meses: int,
+                      cobertura: CoberturaMeses, carga_fixa: Optional[Dict[str, int]] = None,
+                      ocupacao_fixa: Optional[Dict[str, np.ndarray]] = None,
+                      limitar_spread: bool = True) -> Dict:
+    """
+    Monta o modelo completo do Estágio 2 para um pool de instrutores no backend
+    informado (CP-SAT ou MIP). O tempo gasto em cada fase da construção fica
+    em 'tempos_construcao'.
+
+    O modelo é linear (a formulação por intervalos, só do CP-SAT, é a exceção):
+    uso do instrutor e spread são linearizados com o limite da carga como
+    big-M. A maior carga e a menor carga usada são definidas apenas por
+    `max >= carga` e `min <= carga` (instrutores usados), o que basta para
+    limitar e minimizar o spread.
 
+    `carga_fixa` e `ocupacao_fixa` (por id de instrutor) descrevem turmas já
+    atribuídas fora do modelo: a carga entra no total e no spread, e a
+    ocupação mensal reduz a capacidade disponível. O spread máximo é uma
+    restrição nos dois objetivos (no ponderado o peso do spread só escolhe
+    entre as soluções que o respeitam); com `limitar_spread` False ele não é
+    imposto (apenas minimizado).
+    """
+    carga_fixa = carga_fixa or {}
+    tempos, marco = {}, time.time()
+    instrutores_por_habilidade = defaultdict(list)
+    for i in all_instrutores: instrutores_por_habilidade[i.habilidade].append(i)
+
+    coortes = None
+    if parametros.motor_estagio2 == 'coortes':
+        coortes = _agrupar_coortes(all_turmas)
+        print(f"Modo por coortes: {len(coortes)} coortes (projeto, habilidade, início)")
+        alocacao, carga_por_id = _construir_modelo_coortes(backend, coortes, instrutores_por_habilidade,
+                                                          num_meses, cobertura, ocupacao_fixa)
+    elif parametros.motor_estagio2 == 'intervalos':
+        alocacao, carga_por_id = _construir_modelo_intervalos(backend, turmas_por_habilidade,
+                                                              instrutores_por_habilidade, cobertura, ocupacao_fixa)
+    else:
+        alocacao, carga_por_id = _construir_modelo_turmas(backend, turmas_por_habilidade, instrutores_por_habilidade,
+                                                         num_meses, cobertura, ocupacao_fixa)
+    tempos["atribuicao_e_capacidade"], marco = time.time() - marco, time.time()
+
+    limite_carga = max(1, len(all_turmas) + max(carga_fixa.values(), default=0))
+    usado_por_id, carga_total_por_id = {}, {}
+    max_carga = backend.nova_inteira(0, limite_carga, 'max_carga')
+    min_carga_usada = backend.nova_inteira(0, limite_carga, 'min_carga_usada')
+    for i in all_instrutores:
+        turmas_do_instrutor = carga_por_id.get(i.id)
+        if not turmas_do_instrutor and not carga_fixa.get(i.id): continue
+        usado = backend.nova_booleana(f'usado_{i.id}')
+        carga_total = backend.nova_inteira(0, limite_carga, f'carga_{i.id}')
         if turmas_do_instrutor:
-            model.Add(sum(turmas_do_instrutor) == carga_total)
-            model.Add(carga_total > 0).OnlyEnforceIf(usado)
-            model.Add(carga_total == 0).OnlyEnforceIf(usado.Not())
-            cargas_totais.append(carga_total)
-            instrutores_usados.append(usado)
-
-    total_instrutores = model.NewIntVar(0, len(instrutores_usados), 'total_instrutores')
-    if instrutores_usados:
-        model.Add(total_instrutores == sum(instrutores_usados))
-
-    spread_var = model.NewIntVar(0, 300, 'spread_obj')
-    if cargas_totais:
-        max_carga = model.NewIntVar(0, 300, 'max_carga')
-        min_carga_usada = model.NewIntVar(0, 300, 'min_carga_usada')
-        model.AddMaxEquality(max_carga, cargas_totais)
-        cargas_ajustadas = []
-        for i, carga in enumerate(cargas_totais):
-            carga_ajustada = model.NewIntVar(0, 300, f'carga_ajustada_{i}')
-            model.Add(carga_ajustada == carga).OnlyEnforceIf(instrutores_usados[i])
-            model.Add(carga_ajustada == max_carga).OnlyEnforceIf(instrutores_usados[i].Not())
-            cargas_ajustadas.append(carga_ajustada)
-        model.AddMinEquality(min_carga_usada, cargas_ajustadas)
-        model.Add(spread_var == max_carga - min_carga_usada)
-        model.Add(spread_var <= parametros.spread_maximo)
+            backend.adicionar(carga_fixa.get(i.id, 0) + backend.soma(turmas_do_instrutor) == carga_total)
+        else:
+            backend.adicionar(carga_total == carga_fixa[i.id])
+        # usado <=> carga > 0
+        backend.adicionar(carga_total <= limite_carga * usado)
+        backend.adicionar(carga_total >= usado)
+        backend.adicionar(max_carga >= carga_total)
+        backend.adicionar(min_carga_usada <= carga_total + limite_carga * (1 - usado))
+        usado_por_id[i.id], carga_total_por_id[i.id] = usado, carga_total
+    tempos["cargas"], marco = time.time() - marco, time.time()
+
+    if parametros.quebra_simetria:
+        for habilidade, instrutores in instrutores_por_habilidade.items():
+            if not turmas_por_habilidade.get(habilidade): continue
+            # Instrutores com carga fixa não são intercambiáveis: só os novos são ordenados
+            livres = [i for i in instrutores if i.id not in carga_fixa]
+            if len(livres) < len(instrutores):
+                if livres:
+                    _adicionar_quebra_simetria(backend, livres, None, usado_por_id, carga_total_por_id)
+                continue
+            if coortes is not None:
+                c0 = next(c_idx for c_idx, (chave, _) in enumerate(coortes) if chave[1] == habilidade)
+                primeira_turma = alocacao[(c0, instrutores[0].id)]
+            else:
+                primeira_turma = alocacao[(turmas_por_habilidade[habilidade][0].id, instrutores[0].id)]
+            _adicionar_quebra_simetria(backend, instrutores, primeira_turma, usado_por_id, carga_total_por_id)
+        print("Quebra de simetria do pool de instrutores: ativada")
+    tempos["simetria"], marco = time.time() - marco, time.time()
+
+    total_instrutores = backend.nova_inteira(0, len(usado_por_id), 'total_instrutores')
+    spread_var = backend.nova_inteira(0, limite_carga, 'spread_obj')
+    if usado_por_id:
+        backend.adicionar(total_instrutores == backend.soma(list(usado_por_id.values())))
+        backend.adicionar(spread_var == max_carga - min_carga_usada)
+        if limitar_spread:
+            backend.adicionar(spread_var <= parametros.spread_maximo)
+    else:
+        backend.adicionar(total_instrutores == 0)
+        backend.adicionar(spread_var == 0)
+
+    if parametros.objetivo_estagio2 == 'ponderado':
+        backend.minimizar(parametros.peso_instrutores * total_instrutores + parametros.peso_spread * spread_var)
+    else:
+        # Fase 1 do modo lexicográfico; a fase de spread é resolvida por _resolver_fase_spread
+        backend.minimizar(total_instrutores)
+    tempos["objetivo"] = time.time() - marco
+
+    print("Construção do modelo: " + ", ".join(f"{fase} {duracao:.3f}s" for fase, duracao in tempos.items()))
+    return {
+        "backend": backend,
+        "alocacao": alocacao,
+        "coortes": coortes,
+        "instrutores_por_habilidade": instrutores_por_habilidade,
+        "total_instrutores": total_instrutores,
+        "spread": spread_var,
+        "usado": usado_por_id,
+        "carga": carga_total_por_id,
+        "tempos_construcao": tempos,
+    }
+
+
+def _aplicar_dicas(modelo: Dict, atribuicoes: List[Dict]):
+    """
+    Informa ao solver uma atribuição conhecida (turma -> instrutor do pool atual)
+    como ponto de partida da busca. Instrutores fora do pool são ignorados.
+    """
+    alocacao = modelo["alocacao"]
+    adicionar_dica = modelo["backend"].dica
+    ids_pool = {i.id for instrutores in modelo["instrutores_por_habilidade"].values() for i in instrutores}
+    if modelo["coortes"] is not None:
+        coorte_da_turma = {t.id: c_idx for c_idx, (_, turmas) in enumerate(modelo["coortes"]) for t in turmas}
+        contagem, dicas_por_coorte = defaultdict(int), defaultdict(int)
+        for atr in atribuicoes:
+            if atr['turma'].id in coorte_da_turma and atr['instrutor'].id in ids_pool:
+                c_idx = coorte_da_turma[atr['turma'].id]
+                contagem[(c_idx, atr['instrutor'].id)] += 1
+                dicas_por_coorte[c_idx] += 1
+        # Só coortes com todas as turmas atribuídas recebem dica (a soma das contagens é fixa)
+        for (c_idx, i_id), var in alocacao.items():
+            if dicas_por_coorte[c_idx] == len(modelo["coortes"][c_idx][1]):
+                adicionar_dica(var, contagem.get((c_idx, i_id), 0))
     else:
-        model.Add(spread_var == 0)
+        escolhido = {atr['turma'].id: atr['instrutor'].id for atr in atribuicoes}
+        for (t_id, i_id), var in alocacao.items():
+            if t_id in escolhido and escolhido[t_id] in ids_pool:
+                adicionar_dica(var, int(escolhido[t_id] == i_id))
 
-    model.Minimize(total_instrutores * 10000 + spread_var)
 
-    # 4. Resolução do Modelo
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = float(parametros.timeout_segundos)
+def _dicas_da_solucao_anterior(all_turmas: Sequence[Turma], solucao_anterior: List[Dict],
+                               capacidade: int) -> List[Dict]:
+    """
+    Converte a solução persistida de uma execução anterior em atribuições-dica
+    para as turmas atuais. A correspondência é feita por (projeto, habilidade,
+    mês de início); turmas sem correspondente ficam sem dica.
+    """
+    anteriores = defaultdict(list)
+    for item in solucao_anterior:
+        anteriores[(item['projeto'], item['habilidade'], item['mes_inicio'])].append(item['instrutor'])
+    dicas = []
+    for t in all_turmas:
+        fila = anteriores.get((t.projeto, t.habilidade, t.mes_inicio))
+        if fila:
+            instrutor = Instrutor(id=f'{t.habilidade}_{fila.pop(0)}', habilidade=t.habilidade,
+                                  capacidade=capacidade, laboratorio_id=None)
+            dicas.append({'turma': t, 'instrutor': instrutor})
+    return dicas
 
-    # <<< ALTERAÇÃO: ATIVAR O LOG PADRÃO PARA SEMPRE TER SAÍDA >>>
-    solver.parameters.log_search_progress = True
 
-    print("Resolvendo alocação... (com log de progresso ativado)")
+def _resumo_fase(nome: str, backend: BackendSolver, status: str, duracao: float) -> Dict:
+    """Tempo, objetivo, limite e gap relativo de uma fase de resolução."""
+    resumo = {"fase": nome, "status": status, "tempo": duracao, "objetivo": None, "limite": None, "gap": None}
+    if status in STATUS_COM_SOLUCAO:
+        objetivo, limite = backend.valor_objetivo(), backend.limite_objetivo()
+        resumo.update(objetivo=objetivo, limite=limite, gap=(objetivo - limite) / max(1.0, abs(objetivo)))
+    return resumo
 
-    # <<< ALTERAÇÃO: INSTANCIAR E PASSAR O CALLBACK >>>
-    callback = Stage2Callback(total_instrutores, spread_var)
-    status = solver.Solve(model, callback)
 
-    # ... (o resto do código permanece o mesmo) ...
+def _resolver_com_parada(modelo: Dict, tempo_limite: float, registrar_log: bool, criterio: CriterioParada) -> str:
+    """
+    Resolve o modelo com o critério de parada antecipada e o callback de
+    progresso; uma solução interrompida no limite inferior é ótima e recebe o
+    status 'OPTIMAL' (ver BackendSolver.resolver).
+    """
+    backend = modelo["backend"]
+    callback = Stage2Callback(modelo["total_instrutores"], modelo["spread"],
+                              backend.parametros.intervalo_captura_segundos)
+    status = backend.resolver(tempo_limite, callback, registrar_log, criterio)
+    if criterio.motivo:
+        print(f"Busca encerrada antes do tempo limite: {criterio.descrever()}")
+    return status
+
 
-    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        print(f"\n[✓] SUCESSO! Status: {solver.StatusName(status)}")
+def limite_inferior_spread(total_turmas: int, num_instrutores: int) -> int:
+    """
+    Spread mínimo com um número fixo de instrutores: a maior carga é pelo menos
+    ceil(T/n) e a menor no máximo floor(T/n).
+    """
+    if num_instrutores <= 0:
+        return 0
+    return -(-total_turmas // num_instrutores) - total_turmas // num_instrutores
 
-        atribuicoes = []
-        for t in all_turmas:
-            for i in instrutores_por_habilidade[t.habilidade]:
-                if solver.Value(assign.get((t.id, i.id), 0)):
-                    atribuicoes.append({'turma': t, 'instrutor': i})
-                    break
 
-        carga_por_instrutor = defaultdict(int)
-        for atr in atribuicoes:
-            carga_por_instrutor[atr['instrutor'].id] += 1
+def _resolver_fase_spread(modelo: Dict, otimo_provado: bool, parametros: ParametrosOtimizacao,
+                          tempo_limite: float, registrar_log: bool, total_turmas: int) -> str:
+    """
+    Segunda fase do modo lexicográfico: fixa o número de instrutores da fase 1
+    (igualdade se o ótimo foi provado, teto caso contrário), usa a solução da
+    fase 1 como dica completa e minimiza apenas o spread, no mesmo modelo. Com
+    a igualdade, o spread recebe o limite inferior da divisão das `total_turmas` cargas.
+    """
+    backend, total = modelo["backend"], modelo["total_instrutores"]
+    # Valores lidos antes de alterar o modelo (os MIPs descartam a solução a cada alteração)
+    melhor_total = backend.valor(total)
+    variaveis = list(modelo["alocacao"].values())
+    valores = backend.valores(variaveis)
+    limite_spread = 0
+    if otimo_provado:
+        backend.adicionar(total == melhor_total)
+        limite_spread = limite_inferior_spread(total_turmas, melhor_total)
+        backend.adicionar(modelo["spread"] >= limite_spread)
+    else:
+        backend.adicionar(total <= melhor_total)
+
+    backend.limpar_dicas()
+    for var, valor in zip(variaveis, valores.tolist()):
+        backend.dica(var, valor)
+    backend.minimizar(modelo["spread"])
+
+    print(f"\nFase 2 (spread) com {melhor_total} instrutores fixados...")
+    return _resolver_com_parada(modelo, max(1.0, tempo_limite), registrar_log,
+                                CriterioParada(parametros, limite_spread))
+
+
+def _extrair_atribuicoes(modelo: Dict, all_turmas: Sequence[Turma]) -> Atribuicoes:
+    """Atribuições da solução atual do backend, lidas em bloco."""
+    valores = modelo["backend"].valores(list(modelo["alocacao"].values()))
+    if modelo["coortes"] is not None:
+        return _extrair_atribuicoes_coortes(valores, modelo["coortes"], modelo["instrutores_por_habilidade"])
+    return _extrair_atribuicoes_turmas(valores, all_turmas, modelo["instrutores_por_habilidade"])
+
+
+def _resolver_pool_dinamico(all_turmas: Sequence[Turma], parametros: ParametrosOtimizacao, num_meses: int,
+                            cobertura: CoberturaMeses, tempo_limite: float, registrar_log: bool = True,
+                            dicas: Optional[List[Dict]] = None, fixas: Optional[List[Dict]] = None,
+                            limitar_spread: bool = True) -> Dict:
+    """
+    Resolve a alocação das turmas informadas com o pool dimensionado pelo limite inferior.
+
+    O pool de cada habilidade começa no limite inferior (pico de turmas
+    simultâneas / capacidade) e cresce geometricamente apenas quando o solver
+    prova que o modelo é inviável com o pool atual. Cada pool é resolvido pelo
+    backend `parametros.backend_estagio2` (CP-SAT ou MIP).
+
+    `fixas` são atribuições já decididas (por exemplo, de janelas anteriores
+    do horizonte rolante): seus instrutores fazem parte do pool, com a carga e
+    a ocupação mensal correspondentes, e só as turmas em `all_turmas` são decididas.
+    """
+    turmas_por_habilidade = defaultdict(list)
+    for t in all_turmas: turmas_por_habilidade[t.habilidade].append(t)
+
+    fixos_por_habilidade, turmas_fixas_por_habilidade = defaultdict(list), defaultdict(list)
+    carga_fixa, ocupacao_fixa = defaultdict(int), {}
+    for atr in fixas or []:
+        t, i = atr['turma'], atr['instrutor']
+        if i.id not in ocupacao_fixa:
+            ocupacao_fixa[i.id] = np.zeros(num_meses, dtype=np.int64)
+            fixos_por_habilidade[i.habilidade].append(i)
+        ocupacao_fixa[i.id] += cobertura.matriz(t.duracao)[t.mes_inicio]
+        carga_fixa[i.id] += 1
+        turmas_fixas_por_habilidade[t.habilidade].append(t)
+    for instrutores in fixos_por_habilidade.values():
+        instrutores.sort(key=lambda i: int(i.id.split('_')[1]))
+
+    habilidades = set(turmas_por_habilidade) | set(fixos_por_habilidade)
+    limites_inferiores = calcular_limites_inferiores(
+        {h: turmas_por_habilidade[h] + turmas_fixas_por_habilidade[h] for h in habilidades},
+        parametros.capacidade_max_instrutor, num_meses, cobertura)
+    tamanhos_pool = {hab: max(1, lb, len(fixos_por_habilidade[hab])) for hab, lb in limites_inferiores.items()}
+    print("Limite inferior de instrutores: " + ", ".join(f"{h}: {lb}" for h, lb in sorted(limites_inferiores.items())))
+
+    lexicografico = parametros.objetivo_estagio2 == 'lexicografico'
+    tempo_fase1 = tempo_limite * (1 - parametros.fracao_tempo_spread) if lexicografico else tempo_limite
+    # Limite inferior do objetivo da fase 1: soma dos limites por habilidade (com peso, no modo ponderado)
+    limite_total = sum(limites_inferiores.values())
+    limite_objetivo = limite_total if lexicografico else parametros.peso_instrutores * limite_total
+
+    inicio = time.time()
+    while True:
+        all_instrutores = _criar_pool_instrutores(tamanhos_pool, parametros.capacidade_max_instrutor,
+                                                  fixos_por_habilidade)
+        print(f"Pool de instrutores: {len(all_instrutores)} "
+              f"({', '.join(f'{h}: {n}' for h, n in sorted(tamanhos_pool.items()))})\n")
+
+        backend = criar_backend(parametros.backend_estagio2, parametros)
+        modelo = _construir_modelo(backend, all_turmas, turmas_por_habilidade, all_instrutores, parametros,
+                                   num_meses, cobertura, carga_fixa, ocupacao_fixa, limitar_spread)
+        if dicas:
+            _aplicar_dicas(modelo, dicas)
+        backend.adicionar(modelo["total_instrutores"] >= limite_total)
+
+        # <<< ALTERAÇÃO: ATIVAR O LOG PADRÃO PARA SEMPRE TER SAÍDA >>>
+        print(f"Resolvendo alocação com o backend '{backend.nome}'..."
+              + (" (com log de progresso ativado)" if registrar_log else ""))
+
+        # <<< ALTERAÇÃO: RESOLVER COM O CALLBACK E O CRITÉRIO DE PARADA >>>
+        status = _resolver_com_parada(modelo, tempo_fase1 - (time.time() - inicio), registrar_log,
+                                      CriterioParada(parametros, limite_objetivo))
+
+        # Só amplia o pool quando a inviabilidade foi provada e ainda há espaço para crescer
+        maximo_pool = {h: len(turmas_por_habilidade[h]) + len(fixos_por_habilidade[h]) for h in tamanhos_pool}
+        pode_crescer = [h for h, n in tamanhos_pool.items() if n < maximo_pool[h]]
+        if status != 'INFEASIBLE' or not pode_crescer or time.time() - inicio >= tempo_fase1:
+            break
+        for h in pode_crescer:
+            tamanhos_pool[h] = min(maximo_pool[h], max(tamanhos_pool[h] + 1, int(tamanhos_pool[h] * 1.5)))
+        print(f"\n[!] Pool inviável. Ampliando para: "
+              f"{', '.join(f'{h}: {n}' for h, n in sorted(tamanhos_pool.items()))}")
+
+    fases = [_resumo_fase("instrutores" if lexicografico else "ponderada", backend, status, time.time() - inicio)]
+    atribuicoes = []
+    if status in STATUS_COM_SOLUCAO:
+        atribuicoes = _extrair_atribuicoes(modelo, all_turmas)
+
+        # Fase 2 do modo lexicográfico: spread mínimo com o número de instrutores da fase 1
+        if lexicografico and not execucao_interrompida() and backend.valor(modelo["spread"]) > 0:
+            inicio_fase2 = time.time()
+            status2 = _resolver_fase_spread(modelo, status == 'OPTIMAL', parametros,
+                                            tempo_limite - (inicio_fase2 - inicio), registrar_log,
+                                            len(all_turmas) + sum(carga_fixa.values()))
+            fases.append(_resumo_fase("spread", backend, status2, time.time() - inicio_fase2))
+            if status2 in STATUS_COM_SOLUCAO:
+                atribuicoes = _extrair_atribuicoes(modelo, all_turmas)
+            # Sem solução na fase 2 vale a da fase 1, sem prova de spread mínimo
+            if status2 != 'OPTIMAL':
+                status = 'FEASIBLE'
+
+    for fase in fases:
+        gap = f"{fase['gap']:.1%}" if fase['gap'] is not None else "-"
+        print(f"  Fase '{fase['fase']}': {fase['status']} em {fase['tempo']:.2f}s | gap {gap}")
+
+    return {
+        "status_solver": status,
+        "atribuicoes": atribuicoes,
+        "instrutores": all_instrutores,
+        "limite_inferior_instrutores": dict(limites_inferiores),
+        "tamanho_pool": dict(tamanhos_pool),
+        "fases": fases,
+        "tempos_construcao": modelo["tempos_construcao"],
+    }
+
+
+def _resolver_habilidade(turmas_hab: List[Turma], parametros: ParametrosOtimizacao, num_meses: int,
+                         cobertura: CoberturaMeses, tempo_limite: float, dicas: Optional[List[Dict]] = None) -> Dict:
+    """Subproblema de uma única habilidade, executado em um processo separado."""
+    return _resolver_pool_dinamico(turmas_hab, parametros, num_meses, cobertura, tempo_limite,
+                                   registrar_log=False, dicas=dicas)
+
+
+def _reconciliar_habilidade(turmas_hab: List[Turma], atribuicoes_hab: List[Dict], alvo: int,
+                            parametros: ParametrosOtimizacao, num_meses: int, cobertura: CoberturaMeses,
+                            tempo_limite: float) -> List[Dict]:
+    """
+    Fase final barata da decomposição: mantém o número de instrutores da habilidade
+    e aproxima todas as cargas do alvo global, alinhando as faixas de carga das
+    duas habilidades para reduzir o spread global.
+    """
+    usados = sorted({atr['instrutor'].id for atr in atribuicoes_hab}, key=lambda i_id: int(i_id.split('_')[1]))
+    habilidade = turmas_hab[0].habilidade
+    instrutores = _criar_pool_instrutores({habilidade: len(usados)}, parametros.capacidade_max_instrutor)
+    mapa = dict(zip(usados, instrutores))
+
+    turmas_por_habilidade = {habilidade: turmas_hab}
+    backend = criar_backend(parametros.backend_estagio2, parametros)
+    modelo = _construir_modelo(backend, turmas_hab, turmas_por_habilidade, instrutores, parametros, num_meses,
+                               cobertura)
+    backend.adicionar(modelo["total_instrutores"] == len(instrutores))
+    # Cada carga fica entre 0 e o total de turmas da habilidade
+    desvio = backend.nova_inteira(0, max(alvo, len(turmas_hab) - alvo), 'desvio_alvo')
+    for carga in modelo["carga"].values():
+        backend.adicionar(carga - alvo <= desvio)
+        backend.adicionar(alvo - carga <= desvio)
+    backend.minimizar(desvio)
+    _aplicar_dicas(modelo, [{'turma': atr['turma'], 'instrutor': mapa[atr['instrutor'].id]}
+                            for atr in atribuicoes_hab])
+
+    if backend.resolver(tempo_limite) not in STATUS_COM_SOLUCAO:
+        return atribuicoes_hab
+    return _extrair_atribuicoes(modelo, turmas_hab)
+
+
+def _executar_em_processos(tarefas: Dict[str, Tuple]) -> Dict:
+    """
+    Executa cada tarefa (função, *argumentos) em um processo separado e retorna
+    os resultados pela mesma chave.
+
+    Um Ctrl-C durante a espera (ou uma interrupção anterior) marca um evento
+    compartilhado com os processos (vincular_interrupcao), e cada um encerra a
+    busca em andamento com a melhor solução que tiver.
+    """
+    contexto = multiprocessing.get_context()
+    parar = contexto.Event()
+    if execucao_interrompida():
+        parar.set()
+    with ProcessPoolExecutor(max_workers=max(1, len(tarefas)), mp_context=contexto,
+                             initializer=vincular_interrupcao, initargs=(parar,)) as executor:
+        futuros = {chave: executor.submit(*tarefa) for chave, tarefa in tarefas.items()}
+        # Depois do submit: os processos já foram criados e não herdam a captura do Ctrl-C
+        with capturar_ctrl_c(parar.set):
+            return {chave: f.result() for chave, f in futuros.items()}
+
+
+def _resolver_decomposto(all_turmas: Sequence[Turma], parametros: ParametrosOtimizacao, num_meses: int,
+                         cobertura: CoberturaMeses, dicas: Optional[List[Dict]] = None) -> Dict:
+    """
+    Resolve PROG e ROBOTICA em processos independentes e depois reconcilia o spread.
+
+    As duas habilidades só se ligam pelo spread global e pela soma de
+    instrutores; cada uma recebe o orçamento de tempo principal e a
+    reconciliação usa uma fração curta dele. O resultado da reconciliação só
+    substitui o das habilidades se reduzir o spread global.
+    """
+    turmas_por_habilidade = defaultdict(list)
+    for t in all_turmas: turmas_por_habilidade[t.habilidade].append(t)
+    habilidades = sorted(turmas_por_habilidade)
+    tempo_fase_final = max(1.0, parametros.timeout_segundos * 0.1)
+    tempo_principal = max(1.0, parametros.timeout_segundos - tempo_fase_final)
+
+    print(f"Modo decomposto: resolvendo {', '.join(habilidades)} em processos paralelos...")
+    parciais = _executar_em_processos({
+        h: (_resolver_habilidade, turmas_por_habilidade[h], parametros, num_meses, cobertura, tempo_principal,
+            [d for d in dicas or [] if d['turma'].habilidade == h])
+        for h in habilidades})
+
+    resultado = {
+        "status_solver": "FEASIBLE",
+        "atribuicoes": [],
+        "instrutores": [],
+        "limite_inferior_instrutores": {},
+        "tamanho_pool": {},
+        "fases": [],
+        "tempos_construcao": defaultdict(float),
+    }
+    for h in habilidades:
+        parcial = parciais[h]
+        resultado["fases"] += [dict(fase, habilidade=h) for fase in parcial["fases"]]
+        for fase, duracao in parcial["tempos_construcao"].items():
+            resultado["tempos_construcao"][fase] += duracao
+        print(f"  • {h}: {parcial['status_solver']}")
+        if not parcial["atribuicoes"]:
+            resultado["status_solver"] = parcial["status_solver"]
+            return resultado
+        resultado["instrutores"] += parcial["instrutores"]
+        resultado["limite_inferior_instrutores"].update(parcial["limite_inferior_instrutores"])
+        resultado["tamanho_pool"].update(parcial["tamanho_pool"])
+    if all(parciais[h]["status_solver"] == "OPTIMAL" for h in habilidades):
+        resultado["status_solver"] = "OPTIMAL"
+
+    # Reconciliação do spread global: alinha as cargas de cada habilidade à média global
+    cargas = {h: _contar_cargas(parciais[h]["atribuicoes"]) for h in habilidades}
+    todas = [c for h in habilidades for c in cargas[h].values()]
+    spread_por_hab = max(max(cargas[h].values()) - min(cargas[h].values()) for h in habilidades)
+    if max(todas) - min(todas) > spread_por_hab and not execucao_interrompida():
+        alvo = round(len(all_turmas) / len(todas))
+        print(f"Reconciliando spread global (alvo de carga: {alvo} turmas por instrutor)...")
+        reconciliadas = _executar_em_processos({
+            h: (_reconciliar_habilidade, turmas_por_habilidade[h], parciais[h]["atribuicoes"], alvo, parametros,
+                num_meses, cobertura, tempo_fase_final)
+            for h in habilidades})
+        # Só vale se reduzir o spread global (sem solução, a reconciliação devolve a entrada)
+        novas = [c for h in habilidades for c in _contar_cargas(reconciliadas[h]).values()]
+        if max(novas) - min(novas) < max(todas) - min(todas):
+            for h in habilidades:
+                parciais[h]["atribuicoes"] = reconciliadas[h]
+            # A reconciliação não prova otimalidade do spread global
+            resultado["status_solver"] = "FEASIBLE"
+        else:
+            print("  Reconciliação sem redução do spread global: mantendo as atribuições por habilidade.")
+
+    resultado["atribuicoes"] = Atribuicoes.concatenar(parciais[h]["atribuicoes"] for h in habilidades)
+    return resultado
+
+
+def _janelas_horizonte(num_meses: int, janela: int, sobreposicao: int) -> List[Tuple[int, int]]:
+    """
+    Janelas do horizonte rolante como (fim exclusivo, mês até o qual as turmas
+    são congeladas). Janelas consecutivas avançam `janela - sobreposicao` meses;
+    a última congela tudo.
+    """
+    passo, janelas, inicio = janela - sobreposicao, [], 0
+    while inicio + janela < num_meses:
+        janelas.append((inicio + janela, inicio + passo))
+        inicio += passo
+    janelas.append((num_meses, num_meses))
+    return janelas
+
+
+def _resolver_horizonte_rolante(all_turmas: Sequence[Turma], parametros: ParametrosOtimizacao, num_meses: int,
+                                cobertura: CoberturaMeses, dicas: Optional[List[Dict]] = None) -> Dict:
+    """
+    Resolve o Estágio 2 em janelas de meses sobrepostas, em sequência.
+
+    Cada janela decide as turmas pendentes que começam antes do seu fim. As
+    que começam antes do avanço da janela são congeladas; as da sobreposição
+    são decididas de novo na janela seguinte, que recebe a solução anterior
+    como dica. As turmas congeladas ocupam a capacidade dos seus instrutores e
+    a sua carga entra no spread das janelas seguintes. O spread máximo só é
+    imposto na última janela, quando as cargas estão completas.
+    """
+    janelas = _janelas_horizonte(num_meses, parametros.janela_meses, parametros.sobreposicao_meses)
+    print(f"Horizonte rolante: {len(janelas)} janelas de {parametros.janela_meses} meses "
+          f"(sobreposição de {parametros.sobreposicao_meses})")
+
+    turmas_por_habilidade = defaultdict(list)
+    for t in all_turmas: turmas_por_habilidade[t.habilidade].append(t)
+    resultado = {
+        "status_solver": "FEASIBLE",
+        "atribuicoes": [],
+        "instrutores": [],
+        "limite_inferior_instrutores": calcular_limites_inferiores(
+            turmas_por_habilidade, parametros.capacidade_max_instrutor, num_meses, cobertura),
+        "tamanho_pool": {},
+        "fases": [],
+        "tempos_construcao": defaultdict(float),
+    }
+
+    fixas, pendentes = [], list(all_turmas)
+    inicio = time.time()
+    for k, (fim_janela, congelar_ate) in enumerate(janelas):
+        turmas_janela = [t for t in pendentes if t.mes_inicio < fim_janela]
+        if not turmas_janela: continue
+        ultima = k == len(janelas) - 1
+        ids_janela = {t.id for t in turmas_janela}
+        dicas_janela = [d for d in dicas or [] if d['turma'].id in ids_janela]
+        tempo_janela = max(1.0, (parametros.timeout_segundos - (time.time() - inicio)) / (len(janelas) - k))
+
+        print(f"\n--- Janela {k + 1}/{len(janelas)}: {len(turmas_janela)} turmas até o mês {fim_janela - 1} "
+              f"({len(fixas)} congeladas) ---")
+        parcial = _resolver_pool_dinamico(turmas_janela, parametros, num_meses, cobertura, tempo_janela,
+                                          registrar_log=False, dicas=dicas_janela, fixas=fixas,
+                                          limitar_spread=ultima)
+        if ultima and not parcial["atribuicoes"]:
+            print("[!] Spread máximo inalcançável com as janelas congeladas; minimizando sem o limite.")
+            parcial = _resolver_pool_dinamico(turmas_janela, parametros, num_meses, cobertura, tempo_janela,
+                                              registrar_log=False, dicas=dicas_janela, fixas=fixas,
+                                              limitar_spread=False)
+        resultado["fases"] += [dict(fase, janela=k + 1) for fase in parcial["fases"]]
+        for fase, duracao in parcial["tempos_construcao"].items():
+            resultado["tempos_construcao"][fase] += duracao
+        if not parcial["atribuicoes"]:
+            resultado["status_solver"] = parcial["status_solver"]
+            return resultado
+
+        fixas += [atr for atr in parcial["atribuicoes"] if atr['turma'].mes_inicio < congelar_ate]
+        dicas = [atr for atr in parcial["atribuicoes"] if atr['turma'].mes_inicio >= congelar_ate]
+        pendentes = [t for t in pendentes if t.mes_inicio >= congelar_ate]
+        resultado["tamanho_pool"] = parcial["tamanho_pool"]
+
+    resultado["atribuicoes"] = Atribuicoes.de_lista(fixas)
+    resultado["instrutores"] = sorted(resultado["atribuicoes"].instrutores_usados(),
+                                      key=lambda i: (i.habilidade, int(i.id.split('_')[1])))
+    return resultado
+
+
+def _resolver_heuristico(all_turmas: Sequence[Turma], parametros: ParametrosOtimizacao, num_meses: int,
+                         cobertura: CoberturaMeses) -> Dict:
+    """Atribuição pela heurística construtiva, no mesmo formato interno dos demais motores."""
+    turmas_por_habilidade = defaultdict(list)
+    for t in all_turmas: turmas_por_habilidade[t.habilidade].append(t)
+    atribuicoes = construir_atribuicao_heuristica(all_turmas, num_meses, cobertura,
+                                                  parametros.capacidade_max_instrutor, parametros.spread_maximo)
+    instrutores = sorted(atribuicoes.instrutores_usados(), key=lambda i: (i.habilidade, int(i.id.split('_')[1])))
+    return {
+        "status_solver": "HEURISTICA",
+        "atribuicoes": atribuicoes,
+        "instrutores": instrutores,
+        "limite_inferior_instrutores": calcular_limites_inferiores(
+            turmas_por_habilidade, parametros.capacidade_max_instrutor, num_meses, cobertura),
+        "tamanho_pool": {h: sum(1 for i in instrutores if i.habilidade == h) for h in turmas_por_habilidade},
+        "fases": [],
+        "tempos_construcao": {},
+    }
+
+
+def _resolver_geracao_colunas(all_turmas: Sequence[Turma], parametros: ParametrosOtimizacao, num_meses: int,
+                              cobertura: CoberturaMeses, heuristico: Dict) -> Dict:
+    """Atribuição pelo motor de geração de colunas, no mesmo formato interno dos demais motores."""
+    print("Motor de geração de colunas (mestre LP + preço CP-SAT + mestre inteiro)...")
+    colunas = resolver_por_geracao_colunas(all_turmas, num_meses, cobertura, parametros, heuristico["atribuicoes"])
+    instrutores = sorted(colunas["atribuicoes"].instrutores_usados(),
+                         key=lambda i: (i.habilidade, int(i.id.split('_')[1])))
+    return {
+        "status_solver": "OPTIMAL" if colunas["otimo"] else "FEASIBLE",
+        "atribuicoes": colunas["atribuicoes"],
+        "instrutores": instrutores,
+        "limite_inferior_instrutores": colunas["limite_inferior"],
+        "tamanho_pool": {h: sum(1 for i in instrutores if i.habilidade == h) for h in colunas["limite_inferior"]},
+        "fases": colunas["fases"],
+        "tempos_construcao": {},
+        "limite_lp": colunas["limite_lp"],
+    }
+
+
+def _contar_cargas(atribuicoes: Sequence[Dict]) -> Dict[str, int]:
+    """Conta quantas turmas cada instrutor recebeu."""
+    atribuicoes = Atribuicoes.de_lista(atribuicoes)
+    return {atribuicoes.instrutores[k].id: int(n) for k, n in enumerate(atribuicoes.cargas()) if n}
+
+
+def otimizar_atribuicao_e_carga(cronograma_flexivel: Dict,
+                                projetos: List[Projeto],
+                                meses: Sequence[str],
+                                meses_ferias: List[int],
+                                parametros: ParametrosOtimizacao,
+                                cobertura: Optional[CoberturaMeses] = None,
+                                solucao_anterior: Optional[List[Dict]] = None) -> Optional[Dict]:
+    """
+    Aloca turmas a instrutores com restrição de spread máximo.
+
+    Com `parametros.decompor_por_habilidade`, PROG e ROBOTICA são resolvidos em
+    processos separados e combinados ao final. `solucao_anterior` (itens com
+    projeto, habilidade, mes_inicio e índice do instrutor) é usada como dica,
+    mesmo que só parte das turmas atuais tenha correspondente.
+    """
+    print("\n" + "=" * 80)
+    print("ESTÁGIO 2: Alocação de Instrutores")
+    print("=" * 80)
+    print(f"Capacidade máxima por instrutor: {parametros.capacidade_max_instrutor} turmas/mês")
+    print(f"Spread máximo configurado: {parametros.spread_maximo}\n")
+
+    # 1. Criação de Turmas a partir do cronograma do Estágio 1
+    all_turmas = _criar_turmas(cronograma_flexivel, projetos)
+    print(f"Total de turmas criadas: {len(all_turmas)}")
+
+    num_meses = len(meses)
+    if cobertura is None:
+        cobertura = construir_cobertura(num_meses, meses_ferias, projetos)
+
+    turmas_por_habilidade = defaultdict(list)
+    for t in all_turmas: turmas_por_habilidade[t.habilidade].append(t)
+    limites_inferiores = calcular_limites_inferiores(turmas_por_habilidade, parametros.capacidade_max_instrutor,
+                                                     num_meses, cobertura)
+    aviso_spread = analisar_spread_estagio2(all_turmas, limites_inferiores, parametros.spread_maximo)
+    if aviso_spread:
+        print(f"[Viabilidade] {aviso_spread}")
+
+    # Motor 'auto': estratégia escolhida pelo tamanho estimado com as turmas reais
+    if parametros.motor_estagio2 == 'auto':
+        escolha = escolher_motor_estagio2(perfis_das_turmas(turmas_por_habilidade, limites_inferiores),
+                                          num_meses, parametros)
+        parametros = aplicar_escolha_estagio2(parametros, escolha)
+        estimativa = escolha["estimativas"].get(escolha["estrategia"])
+        print(f"Estratégia escolhida automaticamente: {escolha['estrategia']}"
+              + (f" (~{estimativa['variaveis']:,} variáveis, ~{estimativa['memoria_mb']:.0f} MB)" if estimativa else ""))
+
+    # Heuristica construtiva: motor próprio, dica para o CP-SAT e plano de contingência
+    inicio_heuristica = time.time()
+    heuristico = _resolver_heuristico(all_turmas, parametros, num_meses, cobertura)
+    print(f"Heurística construtiva: {len(heuristico['instrutores'])} instrutores "
+          f"em {time.time() - inicio_heuristica:.3f}s")
+
+    if parametros.motor_estagio2 != 'heuristica' and execucao_interrompida():
+        print("[!] Execução interrompida: o Estágio 2 usa a atribuição da heurística como rascunho.")
+        resultado = heuristico
+    elif parametros.motor_estagio2 == 'heuristica':
+        resultado = heuristico
+    elif parametros.motor_estagio2 == 'geracao_colunas':
+        resultado = _resolver_geracao_colunas(all_turmas, parametros, num_meses, cobertura, heuristico)
+    else:
+        dicas = heuristico["atribuicoes"]
+        if solucao_anterior:
+            dicas_anteriores = _dicas_da_solucao_anterior(all_turmas, solucao_anterior,
+                                                          parametros.capacidade_max_instrutor)
+            print(f"[Warm start] {len(dicas_anteriores)} de {len(all_turmas)} turmas com dica da solução anterior.")
+            # Dica parcial: turmas sem correspondente ficam livres (ver _aplicar_dicas)
+            if dicas_anteriores:
+                dicas = dicas_anteriores
+
+        # 2-4. Dimensionamento do pool, construção e resolução do modelo
+        if parametros.horizonte_rolante:
+            resultado = _resolver_horizonte_rolante(all_turmas, parametros, num_meses, cobertura, dicas)
+        elif parametros.decompor_por_habilidade and len({t.habilidade for t in all_turmas}) > 1:
+            resultado = _resolver_decomposto(all_turmas, parametros, num_meses, cobertura, dicas)
+        else:
+            resultado = _resolver_pool_dinamico(all_turmas, parametros, num_meses, cobertura,
+                                                parametros.timeout_segundos, dicas=dicas)
+
+        # Sem solução por falta de tempo: usa a heurística em vez de deixar o planejamento vazio
+        if not resultado["atribuicoes"] and resultado["status_solver"] != "INFEASIBLE":
+            print(f"\n[!] Solver sem solução ({resultado['status_solver']}). Usando a heurística construtiva.")
+            resultado = heuristico
+
+    if resultado["atribuicoes"]:
+        print(f"\n[✓] SUCESSO! Status: {resultado['status_solver']}")
+
+        atribuicoes = resultado["atribuicoes"]
+        carga_por_instrutor = _contar_cargas(atribuicoes)
+        interrompido = execucao_interrompida()
 
         cargas_ativas_vals = list(carga_por_instrutor.values())
         spread_real_calculado = max(cargas_ativas_vals) - min(cargas_ativas_vals) if cargas_ativas_vals else 0
+        if spread_real_calculado > parametros.spread_maximo:
+            print(f"[!] Atenção: spread global {spread_real_calculado} acima do máximo configurado "
+                  f"({parametros.spread_maximo}).")
 
         return {
             "status": "sucesso",
             "atribuicoes": atribuicoes,
             "total_instrutores_flex": len(cargas_ativas_vals),
-            "carga_por_instrutor": dict(carga_por_instrutor),
+            "carga_por_instrutor": carga_por_instrutor,
             "spread_carga": spread_real_calculado,
             "turmas": all_turmas,
-            "instrutores": all_instrutores,
-            "capacidade_max": parametros.capacidade_max_instrutor
+            "instrutores": resultado["instrutores"],
+            "capacidade_max": parametros.capacidade_max_instrutor,
+            "limite_inferior_instrutores": resultado["limite_inferior_instrutores"],
+            "tamanho_pool": resultado["tamanho_pool"],
+            "status_solver": resultado["status_solver"],
+            "fases": resultado["fases"],
+            "tempos_construcao": dict(resultado["tempos_construcao"]),
+            "limite_lp_instrutores": resultado.get("limite_lp", {}),
+            "otimo_comprovado": resultado["status_solver"] == "OPTIMAL" and not interrompido,
+            "interrompido": interrompido,
         }
     else:
-        print(f"\n[✗] FALHA na Alocação: {solver.StatusName(status)}")
+        print(f"\n[✗] FALHA na Alocação: {resultado['status_solver']}")
         print("Sugestões: Aumente o 'Spread máximo' ou o 'Timeout do solver'.")
         return {"status": "falha"}
@@ -1,7 +1,10 @@
 from collections import namedtuple
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterable, List, Optional, Sequence as SequenciaTipada, Tuple
+
+import numpy as np
 
 # Estruturas de dados para a lógica do otimizador
 Projeto = namedtuple('Projeto', [
@@ -17,6 +20,261 @@ Turma = namedtuple('Turma', [
     'id', 'projeto', 'habilidade', 'mes_inicio', 'duracao'
 ])
 
+# Códigos das habilidades nas tabelas em colunas (posição na tupla)
+HABILIDADES = ('PROG', 'ROBOTICA')
+
+
+def _dividir_onda(nome_projeto: str) -> Tuple[str, int]:
+    """Separa o nome base e o número da onda (`DD2_Onda1` -> ('DD2', 1)); projetos sem onda têm onda 0."""
+    base, sep, onda = nome_projeto.rpartition('_Onda')
+    return (base, int(onda)) if sep and onda.isdigit() else (nome_projeto, 0)
+
+
+class TabelaTurmas(Sequence):
+    """
+    Turmas em colunas (struct-of-arrays): índice do projeto, código da
+    habilidade, mês de início, duração e o número sequencial usado no id.
+
+    O id textual (`<projeto>_<PRO|ROB>_<n>`) e a `Turma` de cada linha só são
+    montados quando acessados. O nome base e a onda de cada projeto são
+    calculados uma vez por projeto, não por turma.
+    """
+    __slots__ = ('projetos', 'projeto', 'habilidade', 'mes_inicio', 'duracao', 'numero',
+                 'projetos_base', '_base_do_projeto', '_onda_do_projeto')
+
+    def __init__(self, projetos: List[str], projeto, habilidade, mes_inicio, duracao, numero=None):
+        self.projetos = list(projetos)
+        self.projeto = np.asarray(projeto, dtype=np.int32)
+        self.habilidade = np.asarray(habilidade, dtype=np.int8)
+        self.mes_inicio = np.asarray(mes_inicio, dtype=np.int32)
+        self.duracao = np.asarray(duracao, dtype=np.int32)
+        self.numero = np.arange(len(self.projeto), dtype=np.int64) if numero is None \
+            else np.asarray(numero, dtype=np.int64)
+
+        bases = [_dividir_onda(nome) for nome in self.projetos]
+        self.projetos_base = list(dict.fromkeys(base for base, _ in bases))
+        posicao_base = {base: k for k, base in enumerate(self.projetos_base)}
+        self._base_do_projeto = np.array([posicao_base[base] for base, _ in bases], dtype=np.int32)
+        self._onda_do_projeto = np.array([onda for _, onda in bases], dtype=np.int32)
+
+    @classmethod
+    def de_turmas(cls, turmas: Iterable[Turma]) -> 'TabelaTurmas':
+        """Converte uma sequência de `Turma` (ou devolve a própria tabela)."""
+        if isinstance(turmas, cls):
+            return turmas
+        turmas = list(turmas)
+        posicao = {}
+        projeto = [posicao.setdefault(t.projeto, len(posicao)) for t in turmas]
+        return cls(list(posicao), projeto,
+                   [HABILIDADES.index(t.habilidade) for t in turmas],
+                   [t.mes_inicio for t in turmas],
+                   [t.duracao for t in turmas],
+                   [int(t.id.rsplit('_', 1)[1]) for t in turmas])
+
+    @classmethod
+    def concatenar(cls, tabelas: Iterable[Iterable[Turma]]) -> 'TabelaTurmas':
+        """Junta várias tabelas (ou sequências de turmas), unificando os projetos pelo nome."""
+        tabelas = [cls.de_turmas(t) for t in tabelas]
+        posicao = {}
+        projeto = [np.array([posicao.setdefault(nome, len(posicao)) for nome in t.projetos],
+                            dtype=np.int32)[t.projeto] if len(t) else t.projeto for t in tabelas]
+        colunas = [np.concatenate([getattr(t, c) for t in tabelas]) if tabelas else []
+                   for c in ('habilidade', 'mes_inicio', 'duracao', 'numero')]
+        return cls(list(posicao), np.concatenate(projeto) if tabelas else [], *colunas)
+
+    def selecionar(self, indices) -> 'TabelaTurmas':
+        """Subtabela com as linhas informadas (índices ou máscara booleana)."""
+        return TabelaTurmas(self.projetos, self.projeto[indices], self.habilidade[indices],
+                            self.mes_inicio[indices], self.duracao[indices], self.numero[indices])
+
+    @property
+    def onda(self) -> np.ndarray:
+        """Número da onda de cada turma (0 = projeto sem ondas)."""
+        return self._onda_do_projeto[self.projeto]
+
+    @property
+    def projeto_base(self) -> np.ndarray:
+        """Índice, em `projetos_base`, do projeto base (sem o sufixo da onda) de cada turma."""
+        return self._base_do_projeto[self.projeto]
+
+    def id(self, k: int) -> str:
+        return f'{self.projetos[self.projeto[k]]}_{HABILIDADES[self.habilidade[k]][:3]}_{self.numero[k]}'
+
+    def ids(self) -> List[str]:
+        """Ids textuais de todas as turmas."""
+        return [self.id(k) for k in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.projeto)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return self.selecionar(indice)
+        if indice < 0:
+            indice += len(self)
+        return Turma(self.id(indice), self.projetos[self.projeto[indice]], HABILIDADES[self.habilidade[indice]],
+                     int(self.mes_inicio[indice]), int(self.duracao[indice]))
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def __repr__(self) -> str:
+        return f"TabelaTurmas({len(self)} turmas, {len(self.projetos)} projetos)"
+
+
+class TabelaInstrutores(Sequence):
+    """
+    Instrutores em colunas: código da habilidade, número (sufixo do id) e
+    capacidade. O id textual é `<prefixo da habilidade>_<número>`, com os
+    prefixos dados por habilidade (p.ex. 'PROG'/'ROBOTICA' no pool do Estágio 2
+    e 'PROG'/'ROB' após a renumeração); o `Instrutor` de cada linha é montado sob demanda.
+    """
+    __slots__ = ('habilidade', 'numero', 'capacidade', 'prefixos', 'laboratorios')
+
+    def __init__(self, habilidade, numero, capacidade, prefixos: SequenciaTipada[str] = HABILIDADES,
+                 laboratorios: Optional[List] = None):
+        self.habilidade = np.asarray(habilidade, dtype=np.int8)
+        self.numero = np.asarray(numero, dtype=np.int64)
+        self.capacidade = np.asarray(capacidade, dtype=np.int32)
+        self.prefixos = tuple(prefixos)
+        # Laboratório de cada instrutor; None quando nenhum instrutor tem laboratório
+        self.laboratorios = laboratorios
+
+    @classmethod
+    def de_instrutores(cls, instrutores: Iterable[Instrutor]) -> 'TabelaInstrutores':
+        """Converte uma sequência de `Instrutor` (ou devolve a própria tabela)."""
+        if isinstance(instrutores, cls):
+            return instrutores
+        instrutores = list(instrutores)
+        prefixos = list(HABILIDADES)
+        vistos = set()
+        for i in instrutores:
+            codigo, prefixo = HABILIDADES.index(i.habilidade), i.id.rsplit('_', 1)[0]
+            if codigo in vistos and prefixos[codigo] != prefixo:
+                raise ValueError(f"Prefixos diferentes para a habilidade {i.habilidade}: "
+                                 f"'{prefixos[codigo]}' e '{prefixo}'.")
+            prefixos[codigo] = prefixo
+            vistos.add(codigo)
+        laboratorios = [i.laboratorio_id for i in instrutores]
+        return cls([HABILIDADES.index(i.habilidade) for i in instrutores],
+                   [int(i.id.rsplit('_', 1)[1]) for i in instrutores],
+                   [i.capacidade for i in instrutores], prefixos,
+                   laboratorios if any(lab is not None for lab in laboratorios) else None)
+
+    def id(self, k: int) -> str:
+        return f'{self.prefixos[self.habilidade[k]]}_{self.numero[k]}'
+
+    def ids(self) -> List[str]:
+        """Ids textuais de todos os instrutores."""
+        return [self.id(k) for k in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.habilidade)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            indices = range(len(self))[indice]
+            return TabelaInstrutores(self.habilidade[indice], self.numero[indice], self.capacidade[indice],
+                                     self.prefixos,
+                                     None if self.laboratorios is None else [self.laboratorios[k] for k in indices])
+        if indice < 0:
+            indice += len(self)
+        return Instrutor(self.id(indice), HABILIDADES[self.habilidade[indice]], int(self.capacidade[indice]),
+                         None if self.laboratorios is None else self.laboratorios[indice])
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def __repr__(self) -> str:
+        return f"TabelaInstrutores({len(self)} instrutores)"
+
+
+class Atribuicoes(Sequence):
+    """
+    Atribuições turma -> instrutor do Estágio 2 em forma compacta:
+    `instrutor_da_turma[k]` é a posição, em `instrutores`, do instrutor da
+    turma `turmas[k]`; turmas e instrutores ficam em tabelas em colunas.
+
+    Para o código que espera a lista de dicionários {'turma', 'instrutor'}, a
+    sequência cria cada dicionário apenas quando ele é acessado.
+    """
+    __slots__ = ('turmas', 'instrutores', 'instrutor_da_turma')
+
+    def __init__(self, turmas: Iterable[Turma], instrutores: Iterable[Instrutor], instrutor_da_turma):
+        self.turmas = TabelaTurmas.de_turmas(turmas)
+        self.instrutores = TabelaInstrutores.de_instrutores(instrutores)
+        self.instrutor_da_turma = np.asarray(instrutor_da_turma, dtype=np.int64).reshape(len(self.turmas))
+
+    @classmethod
+    def de_lista(cls, atribuicoes: Iterable[Dict]) -> 'Atribuicoes':
+        """Converte uma lista de dicionários {'turma', 'instrutor'} (ou devolve a própria instância)."""
+        if isinstance(atribuicoes, cls):
+            return atribuicoes
+        posicao, turmas, indices = {}, [], []
+        for atr in atribuicoes:
+            turmas.append(atr['turma'])
+            indices.append(posicao.setdefault(atr['instrutor'], len(posicao)))
+        return cls(turmas, list(posicao), indices)
+
+    @classmethod
+    def concatenar(cls, partes: Iterable[Iterable[Dict]]) -> 'Atribuicoes':
+        """Junta várias atribuições; instrutores iguais passam a ter uma única posição."""
+        partes = [cls.de_lista(parte) for parte in partes]
+        posicao, indices = {}, []
+        for parte in partes:
+            mapa = np.array([posicao.setdefault(i, len(posicao)) for i in parte.instrutores], dtype=np.int64)
+            indices.append(mapa[parte.instrutor_da_turma] if len(parte) else parte.instrutor_da_turma)
+        return cls(TabelaTurmas.concatenar(parte.turmas for parte in partes), list(posicao),
+                   np.concatenate(indices) if indices else [])
+
+    def cargas(self) -> np.ndarray:
+        """Número de turmas de cada instrutor, na ordem de `instrutores`."""
+        return np.bincount(self.instrutor_da_turma, minlength=len(self.instrutores))
+
+    def instrutores_usados(self) -> List[Instrutor]:
+        """Instrutores com pelo menos uma turma."""
+        return [self.instrutores[k] for k in np.flatnonzero(self.cargas())]
+
+    def __len__(self) -> int:
+        return len(self.turmas)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return Atribuicoes(self.turmas[indice], self.instrutores, self.instrutor_da_turma[indice])
+        return {'turma': self.turmas[indice], 'instrutor': self.instrutores[self.instrutor_da_turma[indice]]}
+
+    def __iter__(self):
+        instrutores = list(self.instrutores)
+        for turma, k in zip(self.turmas, self.instrutor_da_turma.tolist()):
+            yield {'turma': turma, 'instrutor': instrutores[k]}
+
+    def __add__(self, outra):
+        return Atribuicoes.concatenar([self, outra])
+
+    def __radd__(self, outra):
+        return Atribuicoes.concatenar([outra, self])
+
+    def __repr__(self) -> str:
+        return f"Atribuicoes({len(self.turmas)} turmas, {len(self.instrutores)} instrutores)"
+
+
+# Motores disponíveis para o Estágio 1 (nivelamento da demanda)
+MOTORES_ESTAGIO1 = ('auto', 'cpsat', 'heuristica')
+
+# Formulações disponíveis para o Estágio 2 (alocação de instrutores)
+MOTORES_ESTAGIO2 = ('auto', 'turmas', 'coortes', 'intervalos', 'geracao_colunas', 'heuristica')
+
+# Objetivos do Estágio 2: lexicográfico (instrutores, depois spread) ou soma ponderada pelos pesos
+OBJETIVOS_ESTAGIO2 = ('lexicografico', 'ponderado')
+
+# Backends de solver dos modelos exatos (ver otimizador/core/backends.py)
+BACKENDS_SOLVER = ('cpsat', 'scip', 'cbc')
+
+# Perfis nomeados de parâmetros do CP-SAT (ver otimizador/core/solver_config.py)
+PERFIS_SOLVER = ('padrao', 'rapido', 'prova_otimalidade')
+
 
 @dataclass
 class ConfiguracaoProjeto:
@@ -35,6 +293,9 @@ class ConfiguracaoProjeto:
     # Campos calculados
     mes_inicio_idx: int = field(default=None, init=False)
     mes_termino_idx: int = field(default=None, init=False)
+    # Datas interpretadas uma única vez, na validação
+    dt_inicio: datetime = field(default=None, init=False, repr=False, compare=False)
+    dt_termino: datetime = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """Valida os dados após inicialização"""
@@ -46,12 +307,12 @@ class ConfiguracaoProjeto:
             raise ValueError(f"Nome do projeto inválido: {self.nome}")
 
         try:
-            dt_inicio = datetime.strptime(self.data_inicio, "%d/%m/%Y")
-            dt_termino = datetime.strptime(self.data_termino, "%d/%m/%Y")
+            self.dt_inicio = datetime.strptime(self.data_inicio, "%d/%m/%Y")
+            self.dt_termino = datetime.strptime(self.data_termino, "%d/%m/%Y")
         except ValueError as e:
             raise ValueError(f"Formato de data inválido para {self.nome}. Use DD/MM/YYYY. Erro: {e}")
 
-        if dt_termino <= dt_inicio:
+        if self.dt_termino <= self.dt_inicio:
             raise ValueError(
                 f"Data de término ({self.data_termino}) deve ser posterior à de início ({self.data_inicio}) para {self.nome}")
 
@@ -82,6 +343,54 @@ class ParametrosOtimizacao:
     peso_spread: int = 1
     pico_maximo_turmas: int = 60
 
+    # Motor do Estágio 1: 'cpsat' (modelo exato), 'heuristica' (guloso + busca local) ou
+    # 'auto' (modelo exato se a estimativa de tamanho couber nos limites; ver core/planner.py)
+    motor_estagio1: str = 'auto'
+    # Formulação do Estágio 2: 'turmas' (booleana por turma/instrutor), 'coortes' (inteira por
+    # coorte/instrutor), 'intervalos' (intervalos opcionais + AddCumulative por instrutor),
+    # 'geracao_colunas' (particionamento em escalas por instrutor), 'heuristica' (construtiva, sem solver)
+    # ou 'auto' (turmas, coortes, decomposição, horizonte rolante ou geração de colunas, conforme o tamanho estimado)
+    motor_estagio2: str = 'auto'
+    # Memória disponível para os modelos, usada pela escolha automática dos motores
+    memoria_maxima_mb: int = 4096
+    # Objetivo do Estágio 2: 'lexicografico' minimiza instrutores e, com esse ótimo fixado, o spread
+    # em uma segunda resolução curta; 'ponderado' usa peso_instrutores e peso_spread em uma única resolução
+    objetivo_estagio2: str = 'lexicografico'
+    # Fração do tempo do Estágio 2 reservada à fase de spread no modo lexicográfico
+    fracao_tempo_spread: float = 0.2
+    # Restrições que eliminam reordenações equivalentes do pool de instrutores no Estágio 2
+    quebra_simetria: bool = True
+    # Resolve PROG e ROBOTICA em processos separados e reconcilia o spread ao final
+    decompor_por_habilidade: bool = False
+    # Horizonte rolante do Estágio 2: janelas de meses sobrepostas resolvidas em sequência,
+    # congelando as atribuições das janelas anteriores (para horizontes longos)
+    horizonte_rolante: bool = False
+    janela_meses: int = 12
+    sobreposicao_meses: int = 3
+
+    # Solver dos modelos exatos de cada estágio: 'cpsat' ou um MIP do OR-Tools ('scip', 'cbc').
+    # O Estágio 2 monta o mesmo modelo linear para qualquer backend; só a formulação por intervalos exige o CP-SAT
+    backend_estagio1: str = 'cpsat'
+    backend_estagio2: str = 'cpsat'
+
+    # Parada antecipada: gap relativo (0 = desligado) e segundos sem melhoria (0 = desligado; em tempo
+    # determinístico no modo determinístico); a busca também para quando a solução atinge o limite inferior
+    gap_relativo_parada: float = 0.0
+    segundos_sem_melhoria: int = 0
+
+    # Intervalo mínimo, em segundos, entre mensagens de progresso dos callbacks (0 = a cada solução);
+    # a melhor solução é copiada a cada melhoria, e com Ctrl-C a execução segue com ela
+    intervalo_captura_segundos: float = 1.0
+
+    # Configurações do CP-SAT aplicadas aos dois estágios
+    num_workers_solver: int = 0  # 0 = padrão do OR-Tools (todos os núcleos)
+    semente_solver: Optional[int] = None  # None = semente padrão do CP-SAT
+    limite_tempo_deterministico: float = 0.0  # 0 = sem limite determinístico
+    perfil_solver: str = 'padrao'
+    # Limita cada busca em tempo determinístico (limite_tempo_deterministico, ou o tempo da busca)
+    # em vez de tempo real, com busca intercalada: mesma entrada, semente e workers, mesmo resultado
+    modo_deterministico: bool = False
+
     def __post_init__(self):
         """Valida os parâmetros após inicialização"""
         self._validar_parametros()
@@ -105,4 +414,75 @@ class ParametrosOtimizacao:
             raise ValueError(f"Peso spread deve estar entre 0 e 10000. Recebido: {self.peso_spread}")
 
         if not isinstance(self.pico_maximo_turmas, int) or not (1 <= self.pico_maximo_turmas <= 500):
-            raise ValueError(f"Pico máximo deve estar entre 1 e 500. Recebido: {self.pico_maximo_turmas}")
\ No newline at end of file
+            raise ValueError(f"Pico máximo deve estar entre 1 e 500. Recebido: {self.pico_maximo_turmas}")
+
+        if self.motor_estagio1 not in MOTORES_ESTAGIO1:
+            raise ValueError(f"Motor do Estágio 1 deve ser um de {MOTORES_ESTAGIO1}. Recebido: {self.motor_estagio1}")
+
+        if self.motor_estagio2 not in MOTORES_ESTAGIO2:
+            raise ValueError(f"Motor do Estágio 2 deve ser um de {MOTORES_ESTAGIO2}. Recebido: {self.motor_estagio2}")
+
+        if not isinstance(self.memoria_maxima_mb, int) or not (64 <= self.memoria_maxima_mb <= 1048576):
+            raise ValueError(f"Memória máxima deve estar entre 64 e 1048576 MB. Recebido: {self.memoria_maxima_mb}")
+
+        if self.objetivo_estagio2 not in OBJETIVOS_ESTAGIO2:
+            raise ValueError(
+                f"Objetivo do Estágio 2 deve ser um de {OBJETIVOS_ESTAGIO2}. Recebido: {self.objetivo_estagio2}")
+
+        if not isinstance(self.fracao_tempo_spread, (int, float)) or not (0 < self.fracao_tempo_spread < 1):
+            raise ValueError(f"Fração de tempo do spread deve estar entre 0 e 1. Recebido: {self.fracao_tempo_spread}")
+
+        if not isinstance(self.quebra_simetria, bool):
+            raise ValueError(f"Quebra de simetria deve ser verdadeiro ou falso. Recebido: {self.quebra_simetria}")
+
+        if not isinstance(self.decompor_por_habilidade, bool):
+            raise ValueError(
+                f"Decomposição por habilidade deve ser verdadeiro ou falso. Recebido: {self.decompor_por_habilidade}")
+
+        if not isinstance(self.horizonte_rolante, bool):
+            raise ValueError(f"Horizonte rolante deve ser verdadeiro ou falso. Recebido: {self.horizonte_rolante}")
+
+        if not isinstance(self.janela_meses, int) or not (2 <= self.janela_meses <= 120):
+            raise ValueError(f"Janela do horizonte rolante deve estar entre 2 e 120 meses. Recebido: {self.janela_meses}")
+
+        if not isinstance(self.sobreposicao_meses, int) or not (0 <= self.sobreposicao_meses < self.janela_meses):
+            raise ValueError(
+                f"Sobreposição deve estar entre 0 e a janela - 1 ({self.janela_meses - 1}). "
+                f"Recebido: {self.sobreposicao_meses}")
+
+        if self.backend_estagio1 not in BACKENDS_SOLVER:
+            raise ValueError(f"Backend do Estágio 1 deve ser um de {BACKENDS_SOLVER}. Recebido: {self.backend_estagio1}")
+
+        if self.backend_estagio2 not in BACKENDS_SOLVER:
+            raise ValueError(f"Backend do Estágio 2 deve ser um de {BACKENDS_SOLVER}. Recebido: {self.backend_estagio2}")
+
+        if self.backend_estagio2 != 'cpsat' and self.motor_estagio2 == 'intervalos':
+            raise ValueError("A formulação por intervalos exige o backend 'cpsat' no Estágio 2.")
+
+        if not isinstance(self.gap_relativo_parada, (int, float)) or not (0 <= self.gap_relativo_parada < 1):
+            raise ValueError(f"Gap relativo de parada deve estar entre 0 e 1. Recebido: {self.gap_relativo_parada}")
+
+        if not isinstance(self.segundos_sem_melhoria, int) or not (0 <= self.segundos_sem_melhoria <= 3600):
+            raise ValueError(
+                f"Segundos sem melhoria devem estar entre 0 e 3600. Recebido: {self.segundos_sem_melhoria}")
+
+        if not isinstance(self.intervalo_captura_segundos, (int, float)) or \
+                not (0 <= self.intervalo_captura_segundos <= 600):
+            raise ValueError(
+                f"Intervalo de progresso deve estar entre 0 e 600 segundos. Recebido: {self.intervalo_captura_segundos}")
+
+        if not isinstance(self.num_workers_solver, int) or not (0 <= self.num_workers_solver <= 256):
+            raise ValueError(f"Workers do solver devem estar entre 0 e 256. Recebido: {self.num_workers_solver}")
+
+        if self.semente_solver is not None and (not isinstance(self.semente_solver, int) or self.semente_solver < 0):
+            raise ValueError(f"Semente do solver deve ser um inteiro não negativo. Recebido: {self.semente_solver}")
+
+        if not isinstance(self.limite_tempo_deterministico, (int, float)) or self.limite_tempo_deterministico < 0:
+            raise ValueError(
+                f"Limite de tempo determinístico deve ser não negativo. Recebido: {self.limite_tempo_deterministico}")
+
+        if self.perfil_solver not in PERFIS_SOLVER:
+            raise ValueError(f"Perfil do solver deve ser um de {PERFIS_SOLVER}. Recebido: {self.perfil_solver}")
+
+        if not isinstance(self.modo_deterministico, bool):
+            raise ValueError(f"Modo determinístico deve ser verdadeiro ou falso. Recebido: {self.modo_deterministico}")
\ No newline at end of file
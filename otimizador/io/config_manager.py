@@ -2,13 +2,21 @@
 
 import json
 from pathlib import Path
+from dataclasses import fields
 from datetime import datetime
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Sequence
 
 # Import relativo para acessar os modelos de dados
 from ..data_models import ParametrosOtimizacao, ConfiguracaoProjeto
+from ..calendario import Calendario
 
 CONFIGS_DIR = Path("configuracoes_otimizacao")
+# Soluções ficam em subdiretório para não aparecerem na listagem de configurações
+SOLUCOES_DIR = CONFIGS_DIR / "solucoes"
+
+# Nome da configuração carregada ou salva nesta execução (usado para associar a solução).
+# Sem configuração nomeada não há solução associada: nada é carregado nem salvo para warm start
+_nome_config_ativa: Optional[str] = None
 
 
 def inicializar_diretorio_configs():
@@ -31,11 +39,14 @@ def salvar_configuracao(parametros: ParametrosOtimizacao,
         config_data = {
             "metadata": {"nome": nome_config, "data_criacao": datetime.now().isoformat(), "versao": "2.0"},
             "parametros": parametros.__dict__,
-            "projetos": [p.__dict__ for p in projetos]
+            # Apenas os campos informados pelo usuário (índices e datas interpretadas são recalculados)
+            "projetos": [{f.name: getattr(p, f.name) for f in fields(p) if f.init} for p in projetos]
         }
         arquivo = CONFIGS_DIR / f"{nome_config}.json"
         with open(arquivo, 'w', encoding='utf-8') as f:
             json.dump(config_data, f, indent=2, ensure_ascii=False)
+        global _nome_config_ativa
+        _nome_config_ativa = nome_config
         print(f"\n[✓] Configuração salva com sucesso: {arquivo}")
         return True
     except Exception as e:
@@ -99,6 +110,8 @@ def carregar_configuracao(arquivo: Optional[Path] = None) -> Tuple[
         parametros = ParametrosOtimizacao(**config_data.get("parametros", {}))
         projetos = [ConfiguracaoProjeto(**p) for p in config_data.get("projetos", [])]
 
+        global _nome_config_ativa
+        _nome_config_ativa = arquivo.stem
         print(f"\n[✓] Configuração carregada com sucesso: {arquivo.stem}")
         return parametros, projetos
     except Exception as e:
@@ -106,6 +119,97 @@ def carregar_configuracao(arquivo: Optional[Path] = None) -> Tuple[
         return None, None
 
 
+def obter_nome_configuracao_ativa() -> Optional[str]:
+    """Nome da configuração em uso, ou None quando ela não foi salva nem carregada."""
+    return _nome_config_ativa
+
+
+def salvar_solucao(resultados_estagio1: Dict, resultados_estagio2: Dict, meses: Sequence[str],
+                   nome_config: Optional[str] = None) -> bool:
+    """
+    Salva a solução final dos dois estágios ao lado da configuração, para ser usada
+    como warm start na próxima execução. Meses são gravados pelo rótulo ('Jul/26')
+    para continuarem válidos se o horizonte de planejamento mudar. Sem configuração
+    nomeada, nada é salvo.
+    """
+    nome_config = nome_config or obter_nome_configuracao_ativa()
+    if not nome_config:
+        print("[INFO] Configuração não salva: solução não guardada para warm start.")
+        return False
+    try:
+        SOLUCOES_DIR.mkdir(parents=True, exist_ok=True)
+
+        cronograma = {
+            proj_nome: [{'mes': meses[c['mes_inicio']], 'num_turmas': c['num_turmas'], 'habilidade': c['habilidade']}
+                        for c in cronogramas]
+            for proj_nome, cronogramas in resultados_estagio1.get('cronograma', {}).items()
+        }
+
+        # Instrutores são gravados pelo índice (0, 1, ...) dentro de cada habilidade
+        atribuicoes = resultados_estagio2.get('atribuicoes', [])
+        ids_por_hab = {}
+        for atr in atribuicoes:
+            ids_por_hab.setdefault(atr['instrutor'].habilidade, set()).add(atr['instrutor'].id)
+        indice = {i_id: idx for ids in ids_por_hab.values()
+                  for idx, i_id in enumerate(sorted(ids, key=lambda i: int(i.split('_')[-1])))}
+        alocacao = [{'projeto': atr['turma'].projeto, 'habilidade': atr['turma'].habilidade,
+                     'mes': meses[atr['turma'].mes_inicio], 'instrutor': indice[atr['instrutor'].id]}
+                    for atr in atribuicoes]
+
+        solucao_data = {
+            "metadata": {"nome": nome_config, "data_criacao": datetime.now().isoformat(), "versao": "1.0"},
+            "estagio1": {"cronograma": cronograma},
+            "estagio2": {"atribuicoes": alocacao}
+        }
+        arquivo = SOLUCOES_DIR / f"{nome_config}.json"
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            json.dump(solucao_data, f, indent=2, ensure_ascii=False)
+        print(f"[✓] Solução salva para warm start: {arquivo}")
+        return True
+    except Exception as e:
+        print(f"[ERRO] Falha ao salvar solução: {e}")
+        return False
+
+
+def carregar_solucao(meses: Sequence[str], nome_config: Optional[str] = None) -> Optional[Dict]:
+    """
+    Carrega a solução salva da configuração em uso, convertendo os rótulos de mês
+    para índices do horizonte atual. Entradas em meses fora do horizonte são descartadas.
+
+    Returns:
+        Dicionário com 'cronograma' (formato do Estágio 1) e 'atribuicoes'
+        (projeto, habilidade, mes_inicio, instrutor), ou None se não houver solução
+        ou configuração nomeada.
+    """
+    nome_config = nome_config or obter_nome_configuracao_ativa()
+    if not nome_config:
+        return None
+    arquivo = SOLUCOES_DIR / f"{nome_config}.json"
+    if not arquivo.exists():
+        return None
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            solucao_data = json.load(f)
+        indice_mes = meses.indice_rotulo if isinstance(meses, Calendario) else {mes: idx for idx, mes in enumerate(meses)}
+
+        cronograma = {}
+        for proj_nome, cronogramas in solucao_data.get("estagio1", {}).get("cronograma", {}).items():
+            cronograma[proj_nome] = [
+                {'mes_inicio': indice_mes[c['mes']], 'num_turmas': c['num_turmas'], 'habilidade': c['habilidade']}
+                for c in cronogramas if c['mes'] in indice_mes]
+
+        atribuicoes = [
+            {'projeto': a['projeto'], 'habilidade': a['habilidade'], 'mes_inicio': indice_mes[a['mes']],
+             'instrutor': a['instrutor']}
+            for a in solucao_data.get("estagio2", {}).get("atribuicoes", []) if a['mes'] in indice_mes]
+
+        print(f"[✓] Solução anterior encontrada para warm start: {arquivo}")
+        return {"cronograma": cronograma, "atribuicoes": atribuicoes}
+    except Exception as e:
+        print(f"[!] Solução anterior ignorada ({arquivo}): {e}")
+        return None
+
+
 def deletar_configuracao() -> bool:
     """Deleta uma configuração salva."""
     # (Implementação omitida por brevidade, mas deve ser movida para cá)
@@ -47,13 +47,25 @@ def obter_parametros_usuario() -> ParametrosOtimizacao:
             valor_padrao=100, minimo=1, maximo=500, nome_parametro="Pico Máximo"
         )
 
+        num_workers = _obter_int_usuario(
+            prompt="Workers (núcleos) do solver, 0 = automático [padrão: 0]: ",
+            valor_padrao=0, minimo=0, maximo=256, nome_parametro="Workers do Solver"
+        )
+
+        semente = _obter_int_usuario(
+            prompt="Semente aleatória do solver, -1 = padrão do solver [padrão: -1]: ",
+            valor_padrao=-1, minimo=-1, maximo=2 ** 31 - 1, nome_parametro="Semente do Solver"
+        )
+
         parametros = ParametrosOtimizacao(
             capacidade_max_instrutor=capacidade_max,
             spread_maximo=spread_maximo,
             timeout_segundos=timeout,
             peso_instrutores=peso_instrutores,
             peso_spread=peso_spread,
-            pico_maximo_turmas=pico_maximo
+            pico_maximo_turmas=pico_maximo,
+            num_workers_solver=num_workers,
+            semente_solver=semente if semente >= 0 else None
         )
         exibir_resumo_parametros(parametros)
         return parametros
@@ -325,6 +337,24 @@ def exibir_resumo_parametros(params: ParametrosOtimizacao):
     print(f"  • Peso Minimização Instrutores: {params.peso_instrutores}")
     print(f"  • Peso Spread de Carga: {params.peso_spread}")
     print(f"  • Pico Máximo de Turmas: {params.pico_maximo_turmas}")
+    print(f"  • Motor do Estágio 1: {params.motor_estagio1} (backend {params.backend_estagio1})")
+    print(f"  • Motor do Estágio 2: {params.motor_estagio2} (backend {params.backend_estagio2})")
+    print(f"  • Objetivo do Estágio 2: {params.objetivo_estagio2}"
+          + (f" ({params.fracao_tempo_spread:.0%} do tempo para o spread)"
+             if params.objetivo_estagio2 == 'lexicografico' else ""))
+    print(f"  • Quebra de Simetria (Estágio 2): {'Sim' if params.quebra_simetria else 'Não'}")
+    print(f"  • Decomposição por Habilidade (Estágio 2): {'Sim' if params.decompor_por_habilidade else 'Não'}")
+    if params.horizonte_rolante:
+        print(f"  • Horizonte Rolante (Estágio 2): janelas de {params.janela_meses} meses, "
+              f"sobreposição de {params.sobreposicao_meses}")
+    if params.gap_relativo_parada > 0 or params.segundos_sem_melhoria > 0:
+        print(f"  • Parada Antecipada: gap {params.gap_relativo_parada:.1%} | "
+              f"{params.segundos_sem_melhoria or '-'}s sem melhoria")
+    semente = params.semente_solver if params.semente_solver is not None else 'padrão'
+    print(f"  • Solver: {params.num_workers_solver or 'auto'} workers | Semente: {semente} | "
+          f"Perfil: {params.perfil_solver} | Determinístico: {'Sim' if params.modo_deterministico else 'Não'}")
+    if params.limite_tempo_deterministico > 0:
+        print(f"  • Limite de Tempo Determinístico: {params.limite_tempo_deterministico}")
 
     print("=" * 80)
 
@@ -148,6 +148,28 @@ class PDF(FPDF):
 # A FUNÇÃO ABAIXO DEVE ESTAR FORA DA CLASSE PDF (SEM INDENTAÇÃO)
 # ==============================================================================
 
+def _aviso_solucao_nao_otima(resultados_estagio1: Dict, resultados_estagio2: Dict) -> str:
+    """
+    Texto de aviso quando algum estágio não comprovou a otimalidade (execução
+    interrompida, tempo esgotado ou heurística); vazio se ambos são ótimos.
+    """
+    motivos = []
+    for nome, resultados in (("Estágio 1", resultados_estagio1), ("Estágio 2", resultados_estagio2)):
+        if resultados.get('otimo_comprovado', True):
+            continue
+        status = resultados.get('status_solver', 'N/A')
+        if resultados.get('interrompido'):
+            motivos.append(f"{nome}: execução interrompida pelo usuário (status {status})")
+        elif status == 'HEURISTICA':
+            motivos.append(f"{nome}: solução obtida pela heurística, sem solver exato")
+        else:
+            motivos.append(f"{nome}: tempo limite ou parada antecipada antes da prova de otimalidade (status {status})")
+    if not motivos:
+        return ""
+    return ("Os resultados abaixo são a melhor solução encontrada, sem garantia de otimalidade. "
+            + "; ".join(motivos) + ".")
+
+
 def gerar_relatorio_pdf(
         projetos_config: List[ConfiguracaoProjeto],
         resultados_estagio1: Dict,
@@ -174,6 +196,10 @@ def gerar_relatorio_pdf(
     # ===========================
     pdf.chapter_title('1. Sumário Executivo')
 
+    aviso_rascunho = _aviso_solucao_nao_otima(resultados_estagio1, resultados_estagio2)
+    if aviso_rascunho:
+        pdf.metric_box("Solução Não Comprovadamente Ótima (Rascunho)", "ATENÇÃO", aviso_rascunho)
+
     total_instrutores = resultados_estagio2.get('total_instrutores_flex', 'N/A')
     spread = resultados_estagio2.get('spread_carga', 'N/A')
     pico_prog = resultados_estagio1.get('pico_prog', 'N/A')
@@ -5,8 +5,7 @@ Versão 4.0 - Lógica de Férias Sincronizada
 """
 
 import os
-from collections import defaultdict
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Sequence
 import calendar
 
 import matplotlib.pyplot as plt
@@ -16,9 +15,10 @@ import pandas as pd
 from pathlib import Path
 
 # --- Importações Corrigidas ---
-from ..data_models import Turma, Projeto
-# Importa a função central que contém a lógica de "pular" as férias
-from ..utils import calcular_meses_ativos
+from ..data_models import Turma, Projeto, TabelaTurmas, Atribuicoes
+# Índice compartilhado que contém a lógica de "pular" as férias
+from ..calendario import CoberturaMeses
+from ..core import avaliacao
 
 def _gerar_grafico_vazio(titulo: str, caminho: str = None) -> str:
     """
@@ -44,37 +44,24 @@ def _gerar_grafico_vazio(titulo: str, caminho: str = None) -> str:
     return caminho
 
 
-def gerar_grafico_turmas_projeto_mes(turmas: List[Turma], projetos: List[Projeto], meses: List[str],
-                                     meses_ferias: List[int]) -> str:
+def gerar_grafico_turmas_projeto_mes(turmas: Sequence[Turma], projetos: List[Projeto], meses: Sequence[str],
+                                     meses_ferias: List[int], cobertura: Optional[CoberturaMeses] = None) -> str:
     """
     CORRIGIDO: Gera gráfico de turmas por projeto, respeitando a lógica de pular férias.
     """
     print("  Calculando gráfico de turmas por projeto/mês (Lógica de Férias Sincronizada)...")
-    dados = []
-    num_meses_total = len(meses)
-
-    for turma in turmas:
-        projeto_base_nome = turma.projeto.split('_Onda')[0]
-
-        # --- Lógica Corrigida ---
-        # Usa a função central para obter os meses de atividade real
-        meses_ativos_reais = calcular_meses_ativos(turma.mes_inicio, turma.duracao, meses_ferias, num_meses_total)
+    if cobertura is None:
+        cobertura = CoberturaMeses(len(meses), meses_ferias)
+    tabela = TabelaTurmas.de_turmas(turmas)
 
-        for mes_idx in meses_ativos_reais:
-            dados.append({
-                'Projeto': projeto_base_nome,
-                'Mes': meses[mes_idx],
-            })
+    # Turmas ativas por projeto base (ondas somadas) e mês, usando o índice central de meses ativos
+    ativas = avaliacao.ativas_por_projeto(tabela, cobertura)
 
-    if not dados:
+    com_dados = sorted(np.flatnonzero(ativas.sum(axis=1)), key=lambda b: tabela.projetos_base[b])
+    if not com_dados:
         return _gerar_grafico_vazio("Turmas por Projeto/Mês")
 
-    df = pd.DataFrame(dados)
-    df['Mes'] = pd.Categorical(df['Mes'], categories=meses, ordered=True)
-    pivot = df.groupby(['Projeto', 'Mes'], observed=False).size().unstack(fill_value=0)
-
-    # Garante que todos os meses do calendário apareçam no gráfico na ordem correta
-    pivot = pivot.reindex(columns=meses, fill_value=0)
+    pivot = pd.DataFrame(ativas[com_dados], index=[tabela.projetos_base[b] for b in com_dados], columns=meses)
 
     fig, ax = plt.subplots(figsize=(16, 8))
     pivot.T.plot(kind='bar', stacked=True, ax=ax, colormap='tab20', width=0.8)
@@ -101,8 +88,9 @@ def gerar_grafico_turmas_projeto_mes(turmas: List[Turma], projetos: List[Projeto
     return caminho
 
 
-def gerar_grafico_demanda_prog_rob(turmas: List[Turma], projetos: List[Projeto], meses: List[str],
-                                   meses_ferias_idx: List[int]) -> Tuple[str, pd.DataFrame]:
+def gerar_grafico_demanda_prog_rob(turmas: Sequence[Turma], projetos: List[Projeto], meses: Sequence[str],
+                                   meses_ferias_idx: List[int],
+                                   cobertura: Optional[CoberturaMeses] = None) -> Tuple[str, pd.DataFrame]:
     """
     CORRIGIDO: Gera gráfico da demanda mensal por habilidade, respeitando a lógica de pular férias.
     """
@@ -112,21 +100,11 @@ def gerar_grafico_demanda_prog_rob(turmas: List[Turma], projetos: List[Projeto],
     caminho_grafico = str(output_dir / "grafico_demanda_prog_rob.png")
 
     num_meses_total = len(meses)
-    demanda = {"Mês": meses, "PROG": [0] * num_meses_total, "ROB": [0] * num_meses_total}
-
-    for turma in turmas:
-        tipo = turma.habilidade
-
-        # --- Lógica Corrigida ---
-        # Usa a função central para obter os meses de atividade real
-        meses_ativos_reais = calcular_meses_ativos(turma.mes_inicio, turma.duracao, meses_ferias_idx, num_meses_total)
-
-        # Adiciona demanda apenas nos meses de atividade real
-        for mes_idx in meses_ativos_reais:
-            if tipo == 'PROG':
-                demanda["PROG"][mes_idx] += 1
-            else:
-                demanda["ROB"][mes_idx] += 1
+    if cobertura is None:
+        cobertura = CoberturaMeses(num_meses_total, meses_ferias_idx)
+    # Demanda apenas nos meses de atividade real (índice central), por código de habilidade
+    por_habilidade = avaliacao.demanda_mensal(turmas, cobertura)
+    demanda = {"Mês": meses, "PROG": por_habilidade[0].tolist(), "ROB": por_habilidade[1].tolist()}
 
     df = pd.DataFrame(demanda)
     df.rename(columns={'PROG': 'Demanda PROG', 'ROB': 'Demanda ROB'}, inplace=True)
@@ -161,21 +139,22 @@ def gerar_grafico_demanda_prog_rob(turmas: List[Turma], projetos: List[Projeto],
 
     return caminho_grafico, df
 
-def gerar_grafico_turmas_instrutor_tipologia_projeto(atribuicoes: List[Dict]) -> str:
+def gerar_grafico_turmas_instrutor_tipologia_projeto(atribuicoes: Sequence[Dict]) -> str:
     """
-    Gera gráfico de turmas por instrutor e projeto. (Lógica original mantida)
+    Gera gráfico de turmas por instrutor e projeto base. (Lógica original mantida)
     """
     if not atribuicoes:
         return _gerar_grafico_vazio("Turmas por Instrutor/Projeto")
 
-    contagem = defaultdict(lambda: defaultdict(int))
-    for atr in atribuicoes:
-        instrutor_id = atr['instrutor'].id
-        projeto = atr['turma'].projeto.split('_Onda')[0]
-        contagem[instrutor_id][projeto] += 1
+    atribuicoes = Atribuicoes.de_lista(atribuicoes)
+    turmas = atribuicoes.turmas
+    contagem = avaliacao.turmas_por_instrutor_e_projeto(atribuicoes)
+    linhas, colunas = np.flatnonzero(contagem.sum(axis=1)), np.flatnonzero(contagem.sum(axis=0))
 
     # Ordena os instrutores para uma visualização consistente
-    df = pd.DataFrame(contagem).T.fillna(0).sort_index()
+    df = pd.DataFrame(contagem[np.ix_(linhas, colunas)],
+                      index=np.array(atribuicoes.instrutores.ids(), dtype=object)[linhas],
+                      columns=[turmas.projetos_base[b] for b in colunas]).sort_index()
     fig, ax = plt.subplots(figsize=(14, max(8, len(df) * 0.4)))
     df.plot(kind='barh', stacked=True, ax=ax, colormap='tab20b')
 
@@ -193,19 +172,18 @@ def gerar_grafico_turmas_instrutor_tipologia_projeto(atribuicoes: List[Dict]) ->
     return caminho
 
 
-def gerar_grafico_carga_por_instrutor(atribuicoes: List[Dict]) -> str:
+def gerar_grafico_carga_por_instrutor(atribuicoes: Sequence[Dict]) -> str:
     """
     Gera gráfico de carga de trabalho por instrutor. (Lógica original mantida)
     """
     if not atribuicoes:
         return _gerar_grafico_vazio("Carga por Instrutor")
 
-    carga = defaultdict(int)
-    habilidades = {}
-    for atr in atribuicoes:
-        instrutor_id = atr['instrutor'].id
-        carga[instrutor_id] += 1
-        habilidades[instrutor_id] = atr['instrutor'].habilidade
+    atribuicoes = Atribuicoes.de_lista(atribuicoes)
+    instrutores, cargas = atribuicoes.instrutores, atribuicoes.cargas()
+    usados = np.flatnonzero(cargas)
+    carga = {instrutores.id(k): int(cargas[k]) for k in usados}
+    habilidades = {instrutores.id(k): instrutores[k].habilidade for k in usados}
 
     # Ordena os instrutores alfabeticamente para consistência
     instrutores_ordenados = sorted(carga.keys(), key=lambda x: (isinstance(x, str), x))
@@ -236,33 +214,25 @@ def gerar_grafico_carga_por_instrutor(atribuicoes: List[Dict]) -> str:
     plt.close()
     return caminho
 
-def plotar_conclusoes_por_mes(turmas: List[Turma],
+def plotar_conclusoes_por_mes(turmas: Sequence[Turma],
                               projetos: List[Projeto],
-                              meses: List[str],
-                              meses_ferias_idx: List[int]) -> str:
+                              meses: Sequence[str],
+                              meses_ferias_idx: List[int],
+                              cobertura: Optional[CoberturaMeses] = None) -> str:
     """
     CORRIGIDO: Gera gráfico de turmas concluídas por mês, respeitando a lógica de pular férias.
     """
     print("  Calculando gráfico de conclusões por mês (Lógica de Férias Sincronizada)...")
-    conclusoes = defaultdict(lambda: defaultdict(int))
     num_meses_total = len(meses)
+    if cobertura is None:
+        cobertura = CoberturaMeses(num_meses_total, meses_ferias_idx)
+    tabela = TabelaTurmas.de_turmas(turmas)
 
-    for turma in turmas:
-        projeto_base_nome = turma.projeto.split('_Onda')[0]
-
-        # --- Lógica Corrigida ---
-        # Usa a função central para obter os meses de atividade real
-        meses_ativos_reais = calcular_meses_ativos(turma.mes_inicio, turma.duracao, meses_ferias_idx, num_meses_total)
-
-        # O mês de conclusão é o último mês na lista de meses ativos
-        if meses_ativos_reais:
-            mes_fim = meses_ativos_reais[-1]
-            conclusoes[mes_fim][projeto_base_nome] += 1
+    # O mês de conclusão é o último mês ativo, já pré-calculado no índice central
+    conclusoes = avaliacao.conclusoes_por_projeto(tabela, cobertura)
 
-    todos_projetos = set()
-    for meses_dict in conclusoes.values():
-        todos_projetos.update(meses_dict.keys())
-    projetos_unicos = sorted(todos_projetos)
+    com_conclusoes = sorted(np.flatnonzero(conclusoes.sum(axis=1)), key=lambda b: tabela.projetos_base[b])
+    projetos_unicos = [tabela.projetos_base[b] for b in com_conclusoes]
 
     output_dir = Path("resultados_otimizacao")
     output_dir.mkdir(exist_ok=True)
@@ -271,9 +241,7 @@ def plotar_conclusoes_por_mes(turmas: List[Turma],
     if not projetos_unicos:
         return _gerar_grafico_vazio("Turmas Concluídas por Mês", caminho_saida)
 
-    dados_por_projeto = {}
-    for projeto_nome in projetos_unicos:
-        dados_por_projeto[projeto_nome] = [conclusoes[mes].get(projeto_nome, 0) for mes in range(num_meses_total)]
+    dados_por_projeto = {tabela.projetos_base[b]: conclusoes[b].tolist() for b in com_conclusoes}
 
     fig, ax = plt.subplots(figsize=(16, 8))
     cores = plt.get_cmap('tab20')(np.linspace(0, 1, len(projetos_unicos)))
@@ -1,54 +1,57 @@
 # ARQUIVO: otimizador/reporting/spreadsheets.py
 
-from collections import defaultdict
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence
+import numpy as np
 import pandas as pd
 
 # Import relativo
-from ..data_models import Turma, Instrutor
-from ..utils import calcular_meses_ativos
+from ..data_models import Atribuicoes, HABILIDADES
+from ..calendario import CoberturaMeses
+from ..core.avaliacao import turmas_por_instrutor_e_projeto
 
 
-def gerar_planilha_detalhada(atribuicoes: List[Dict], meses: List[str], meses_ferias: List[int]) -> pd.DataFrame:
-    """Gera planilha detalhada com a carga horária."""
+def gerar_planilha_detalhada(atribuicoes: Sequence[Dict], meses: Sequence[str], meses_ferias: List[int],
+                             cobertura: Optional[CoberturaMeses] = None) -> pd.DataFrame:
+    """Gera planilha detalhada com a carga horária (uma linha por turma e mês ativo)."""
     print("\n--- Gerando Planilha Detalhada ---")
     if not atribuicoes: return pd.DataFrame()
 
-    carga_data = []
-    num_meses = len(meses)
-    for atr in atribuicoes:
-        turma, instrutor = atr['turma'], atr['instrutor']
-        for mes_idx in calcular_meses_ativos(turma.mes_inicio, turma.duracao, meses_ferias, num_meses):
-            carga_data.append({
-                "Instrutor": instrutor.id, "Mes": meses[mes_idx], "Habilidade": instrutor.habilidade,
-                "Projeto": turma.projeto, "Turma_ID": turma.id, "Carga": 1
-            })
-
-    if not carga_data: return pd.DataFrame()
-    df = pd.DataFrame(carga_data).sort_values(by=["Instrutor", "Mes"])
+    if cobertura is None:
+        cobertura = CoberturaMeses(len(meses), meses_ferias)
+    atribuicoes = Atribuicoes.de_lista(atribuicoes)
+    turmas, instrutores = atribuicoes.turmas, atribuicoes.instrutores
+    k, mes_idx = np.nonzero(cobertura.linhas(turmas.duracao, turmas.mes_inicio))
+    if not len(k): return pd.DataFrame()
+
+    instrutor = atribuicoes.instrutor_da_turma[k]
+    df = pd.DataFrame({
+        "Instrutor": np.array(instrutores.ids(), dtype=object)[instrutor],
+        "Mes": np.array(meses, dtype=object)[mes_idx],
+        "Habilidade": np.array(HABILIDADES, dtype=object)[instrutores.habilidade[instrutor]],
+        "Projeto": np.array(turmas.projetos, dtype=object)[turmas.projeto[k]],
+        "Turma_ID": np.array(turmas.ids(), dtype=object)[k],
+        "Carga": 1,
+    }).sort_values(by=["Instrutor", "Mes"])
     df.to_excel('1_carga_horaria_detalhada.xlsx', index=False, engine='openpyxl')
     print("Planilha salva: '1_carga_horaria_detalhada.xlsx'")
     return df
 
 
-def gerar_planilha_consolidada_instrutor(atribuicoes: List[Dict]) -> pd.DataFrame:
+def gerar_planilha_consolidada_instrutor(atribuicoes: Sequence[Dict]) -> pd.DataFrame:
     """Gera planilha consolidada por instrutor e projeto."""
     print("\n--- Gerando Planilha Consolidada por Instrutor ---")
     if not atribuicoes: return pd.DataFrame()
 
-    dados = defaultdict(lambda: defaultdict(int))
-    projetos_unicos = sorted(list(set(atr['turma'].projeto for atr in atribuicoes)))
+    atribuicoes = Atribuicoes.de_lista(atribuicoes)
+    turmas, instrutores = atribuicoes.turmas, atribuicoes.instrutores
+    contagem = turmas_por_instrutor_e_projeto(atribuicoes, por_base=False)
 
-    for atr in atribuicoes:
-        dados[atr['instrutor'].id][atr['turma'].projeto] += 1
-
-    rows = []
-    for instrutor_id, proj_dict in sorted(dados.items()):
-        row = {'Instrutor': instrutor_id, **{proj: proj_dict.get(proj, 0) for proj in projetos_unicos}}
-        row['Total'] = sum(proj_dict.values())
-        rows.append(row)
-
-    df = pd.DataFrame(rows)
+    ids = instrutores.ids()
+    linhas = sorted(np.flatnonzero(contagem.sum(axis=1)), key=lambda i: ids[i])
+    colunas = sorted(np.flatnonzero(contagem.sum(axis=0)), key=lambda p: turmas.projetos[p])
+    df = pd.DataFrame(contagem[np.ix_(linhas, colunas)], columns=[turmas.projetos[p] for p in colunas])
+    df.insert(0, 'Instrutor', [ids[i] for i in linhas])
+    df['Total'] = contagem[linhas].sum(axis=1)
     df.to_excel('2_consolidado_instrutor_projeto.xlsx', index=False, engine='openpyxl')
     print("Planilha salva: '2_consolidado_instrutor_projeto.xlsx'")
-    return df
\ No newline at end of file
+    return df
@@ -1,41 +1,40 @@
 # ARQUIVO: otimizador/utils.py
 
-from datetime import datetime, timedelta
-from typing import List, Tuple, Dict
-from collections import defaultdict
+from datetime import datetime
+from typing import List, Tuple, Dict, Sequence, Union
+
+import numpy as np
 
 # Import relativo para acessar os modelos de dados
-from .data_models import Projeto, ConfiguracaoProjeto, ParametrosOtimizacao, Instrutor
+from .data_models import (Projeto, ConfiguracaoProjeto, ParametrosOtimizacao, Atribuicoes, TabelaInstrutores,
+                          HABILIDADES)
+from .calendario import Calendario, CoberturaMeses, ordinal_mes, rotulo_mes
 
 
 def gerar_lista_meses(data_inicio: str, data_fim: str) -> List[str]:
     """Gera lista de meses entre duas datas."""
     try:
-        dt_inicio = datetime.strptime(data_inicio, "%d/%m/%Y").replace(day=1)
-        dt_fim = datetime.strptime(data_fim, "%d/%m/%Y").replace(day=1)
+        dt_inicio = datetime.strptime(data_inicio, "%d/%m/%Y")
+        dt_fim = datetime.strptime(data_fim, "%d/%m/%Y")
     except ValueError as e:
         raise ValueError(f"Formato de data inválido. Use DD/MM/YYYY. Erro: {e}")
-    if dt_fim < dt_inicio:
+    if ordinal_mes(dt_fim) < ordinal_mes(dt_inicio):
         raise ValueError(f"Data final ({data_fim}) deve ser posterior à inicial ({data_inicio})")
-
-    meses_nomes = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-    lista_meses = []
-    data_atual = dt_inicio
-    while data_atual <= dt_fim:
-        lista_meses.append(f"{meses_nomes[data_atual.month - 1]}/{str(data_atual.year)[2:]}")
-        data_atual = data_atual + timedelta(days=32)
-        data_atual = data_atual.replace(day=1)
-    return lista_meses
+    return [rotulo_mes(o) for o in range(ordinal_mes(dt_inicio), ordinal_mes(dt_fim) + 1)]
 
 
-def data_para_indice_mes(data: str, meses: List[str]) -> int:
-    """Converte data para índice na lista de meses."""
+def data_para_indice_mes(data: Union[str, datetime], meses: Sequence[str]) -> int:
+    """Converte data (texto DD/MM/YYYY ou já interpretada) para índice na lista de meses."""
+    try:
+        dt = datetime.strptime(data, "%d/%m/%Y") if isinstance(data, str) else data
+    except ValueError as e:
+        raise ValueError(f"Formato de data inválido: {data}. Use DD/MM/YYYY. Erro: {e}")
+    if isinstance(meses, Calendario):
+        return meses.indice_da_data(dt)
+    mes_procurado = rotulo_mes(ordinal_mes(dt))
     try:
-        dt = datetime.strptime(data, "%d/%m/%Y")
-        meses_map = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-        mes_procurado = f"{meses_map[dt.month - 1]}/{str(dt.year)[2:]}"
         return meses.index(mes_procurado)
-    except (ValueError, IndexError) as e:
+    except ValueError as e:
         raise ValueError(f"Data {data} ({mes_procurado}) não está no período de análise. Erro: {e}")
 
 
@@ -76,38 +75,55 @@ def calcular_meses_ativos(mes_inicio: int,
 
 
 def calcular_janela_inicio(mes_inicio_projeto: int, mes_fim_projeto: int, duracao: int, meses_ferias: List[int],
-                           num_meses: int, meses: List[str]) -> Tuple[int, int]:
+                           num_meses: int, meses: Sequence[str]) -> Tuple[int, int]:
     """Calcula a janela válida de início garantindo término dentro do prazo."""
-    inicio_min, inicio_max = -1, -1
-    for m_inicio in range(mes_inicio_projeto, min(mes_fim_projeto + 1, num_meses)):
-        meses_ativos = calcular_meses_ativos(m_inicio, duracao, meses_ferias, num_meses)
-        if len(meses_ativos) == duracao and max(meses_ativos) <= mes_fim_projeto:
-            if inicio_min == -1: inicio_min = m_inicio
-            inicio_max = m_inicio
-
-    if inicio_min == -1:
+    janela = CoberturaMeses(num_meses, meses_ferias).janelas_inicio([mes_inicio_projeto], [mes_fim_projeto], [duracao])
+    if janela["folga"][0] < 0:
         raise ValueError("Não há janela válida de início para um dos projetos. Verifique durações e prazos.")
+    inicio_min, inicio_max = int(janela["inicio_min"][0]), int(janela["inicio_max"][0])
     print(f"   Janela de início calculada: {meses[inicio_min]} a {meses[inicio_max]}")
     return inicio_min, inicio_max
 
 
+def calcular_janelas_projetos(projetos_config: List[ConfiguracaoProjeto], meses: Sequence[str],
+                              cobertura: CoberturaMeses) -> Dict[str, np.ndarray]:
+    """
+    Janelas de início de todos os projetos em uma única chamada, por somas de
+    prefixo dos meses letivos (ver `CoberturaMeses.janelas_inicio`). Também
+    preenche `mes_inicio_idx` e `mes_termino_idx` de cada configuração.
+
+    Returns:
+        Arrays 'inicio_min', 'inicio_max' (último início viável), 'folga' e
+        'fim_mais_cedo', na ordem de `projetos_config`.
+    """
+    for config in projetos_config:
+        config.mes_inicio_idx = data_para_indice_mes(config.dt_inicio, meses)
+        config.mes_termino_idx = data_para_indice_mes(config.dt_termino, meses)
+    return cobertura.janelas_inicio([c.mes_inicio_idx for c in projetos_config],
+                                    [c.mes_termino_idx for c in projetos_config],
+                                    [c.duracao_curso for c in projetos_config])
+
+
 def calcular_turmas_por_projeto(limite_total: int, percentual_prog: float) -> Tuple[int, int]:
     """Calcula número de turmas PROG e ROB baseado nos percentuais."""
     num_prog = round(limite_total * percentual_prog / 100)
     return num_prog, limite_total - num_prog
 
 
-def converter_projetos_para_modelo(projetos_config: List[ConfiguracaoProjeto], meses: List[str],
+def converter_projetos_para_modelo(projetos_config: List[ConfiguracaoProjeto], meses: Sequence[str],
                                    meses_ferias: List[int], parametros: ParametrosOtimizacao) -> List[Projeto]:
     """Converte configurações de projetos para estrutura do modelo."""
     print("\n" + "=" * 80 + "\nCONVERSÃO DE PROJETOS PARA MODELO\n" + "=" * 80)
+    cobertura = meses.cobertura if isinstance(meses, Calendario) else CoberturaMeses(len(meses), meses_ferias)
+    janelas = calcular_janelas_projetos(projetos_config, meses, cobertura)
     projetos_modelo = []
-    for config in projetos_config:
+    for k, config in enumerate(projetos_config):
         print(f"\nProcessando {config.nome} (PROG: {config.percentual_prog:.1f}% / ROB: {config.percentual_rob:.1f}%)")
-        config.mes_inicio_idx = data_para_indice_mes(config.data_inicio, meses)
-        config.mes_termino_idx = data_para_indice_mes(config.data_termino, meses)
-        inicio_min, inicio_max = calcular_janela_inicio(config.mes_inicio_idx, config.mes_termino_idx,
-                                                        config.duracao_curso, meses_ferias, len(meses), meses)
+        if janelas["folga"][k] < 0:
+            raise ValueError("Não há janela válida de início para um dos projetos. Verifique durações e prazos.")
+        inicio_min, inicio_max = int(janelas["inicio_min"][k]), int(janelas["inicio_max"][k])
+        print(f"   Janela de início calculada: {meses[inicio_min]} a {meses[inicio_max]} "
+              f"(folga de {int(janelas['folga'][k])} meses letivos)")
 
         prog_total, rob_total = calcular_turmas_por_projeto(config.num_turmas, config.percentual_prog)
 
@@ -133,50 +149,48 @@ def converter_projetos_para_modelo(projetos_config: List[ConfiguracaoProjeto], m
     return projetos_modelo
 
 
-def renumerar_instrutores_ativos(atribuicoes: List[Dict]) -> Tuple[List[Dict], Dict[str, int]]:
+def renumerar_instrutores_ativos(atribuicoes: Sequence[Dict]) -> Tuple[Atribuicoes, Dict[str, int]]:
     """Renumera apenas os instrutores que receberam turmas e retorna a contagem por habilidade."""
     print("\n--- Renumerando Instrutores Ativos ---")
-    instrutores_usados = sorted(list(set(atr['instrutor'] for atr in atribuicoes)),
-                                key=lambda i: (i.habilidade, int(i.id.split('_')[1])))
-    mapeamento, contador_por_hab = {}, defaultdict(int)
-
-    for inst_antigo in instrutores_usados:
-        hab = inst_antigo.habilidade
-        contador_por_hab[hab] += 1
-        prefixo = 'PROG' if hab == 'PROG' else 'ROB'
-        novo_id = f'{prefixo}_{contador_por_hab[hab]}'
-        mapeamento[inst_antigo.id] = Instrutor(novo_id, hab, inst_antigo.capacidade, inst_antigo.laboratorio_id)
+    atribuicoes = Atribuicoes.de_lista(atribuicoes)
+    instrutores = atribuicoes.instrutores
+
+    # Instrutores usados, ordenados por habilidade e número; o novo número é a posição na habilidade (base 1)
+    usados = np.flatnonzero(atribuicoes.cargas())
+    usados = usados[np.lexsort((instrutores.numero[usados], instrutores.habilidade[usados]))]
+    habilidades = instrutores.habilidade[usados]
+    contagem = np.bincount(habilidades, minlength=len(HABILIDADES))
+    novos_numeros = np.arange(len(usados)) - np.repeat(np.cumsum(contagem) - contagem, contagem) + 1
+    nova_posicao = np.full(len(instrutores), -1, dtype=np.int64)
+    nova_posicao[usados] = np.arange(len(usados))
+    novos = TabelaInstrutores(habilidades, novos_numeros, instrutores.capacidade[usados], ('PROG', 'ROB'),
+                              None if instrutores.laboratorios is None
+                              else [instrutores.laboratorios[k] for k in usados])
+    contador_por_hab = {HABILIDADES[h]: int(n) for h, n in enumerate(contagem) if n}
 
     print("Contagem final de instrutores por habilidade:")
     for hab, count in sorted(contador_por_hab.items()): print(f"   • {hab}: {count} instrutores")
 
-    atribuicoes_renumeradas = [{'turma': atr['turma'], 'instrutor': mapeamento[atr['instrutor'].id]} for atr in
-                               atribuicoes]
+    atribuicoes_renumeradas = Atribuicoes(atribuicoes.turmas, novos, nova_posicao[atribuicoes.instrutor_da_turma])
 
-    return atribuicoes_renumeradas, dict(contador_por_hab)
+    return atribuicoes_renumeradas, contador_por_hab
 
 
-def analisar_distribuicao_instrutores_por_projeto(atribuicoes: List[Dict]) -> Dict[str, Dict[str, int]]:
+def analisar_distribuicao_instrutores_por_projeto(atribuicoes: Sequence[Dict]) -> Dict[str, Dict[str, int]]:
     """
     Analisa as atribuições para contar quantos instrutores únicos de cada habilidade
-    foram alocados a cada projeto.
+    foram alocados a cada projeto (projeto base, somando as ondas: "DD2_Onda1" -> "DD2").
     """
-    # Estrutura: { 'NomeProjeto': {'PROG': set_de_ids, 'ROBOTICA': set_de_ids} }
-    instrutores_vistos = defaultdict(lambda: defaultdict(set))
-
-    for atr in atribuicoes:
-        # Pega o nome base do projeto, mesmo que seja uma onda (ex: "DD2_Onda1" -> "DD2")
-        projeto_base_nome = atr['turma'].projeto.split('_Onda')[0]
-        instrutor = atr['instrutor']
-        # Adiciona o ID do instrutor ao set daquele projeto/habilidade
-        instrutores_vistos[projeto_base_nome][instrutor.habilidade].add(instrutor.id)
-
-    # Converte os sets para contagens (len)
-    contagem_final = {
-        proj: {
-            'PROG': len(hab_sets.get('PROG', set())),
-            'ROBOTICA': len(hab_sets.get('ROBOTICA', set()))
-        }
-        for proj, hab_sets in instrutores_vistos.items()
+    atribuicoes = Atribuicoes.de_lista(atribuicoes)
+    turmas, instrutores = atribuicoes.turmas, atribuicoes.instrutores
+
+    # Pares distintos (projeto base, instrutor) e, por projeto, a contagem por habilidade do instrutor
+    pares = np.unique(turmas.projeto_base.astype(np.int64) * len(instrutores) + atribuicoes.instrutor_da_turma)
+    base, instrutor = np.divmod(pares, len(instrutores)) if len(instrutores) else (pares, pares)
+    contagem = np.zeros((len(turmas.projetos_base), len(HABILIDADES)), dtype=np.int64)
+    np.add.at(contagem, (base, instrutores.habilidade[instrutor]), 1)
+
+    return {
+        turmas.projetos_base[b]: {'PROG': int(contagem[b, 0]), 'ROBOTICA': int(contagem[b, 1])}
+        for b in np.unique(base)
     }
-    return contagem_final
\ No newline at end of file
@@ -0,0 +1,56 @@
+# ARQUIVO: tests/conftest.py
+"""
+Instância pequena usada pelos testes: 12 meses com férias em julho (mês 6),
+dois projetos com durações diferentes e um cronograma do Estágio 1 já pronto.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from otimizador.data_models import Projeto, ParametrosOtimizacao
+from otimizador.calendario import CoberturaMeses
+
+NUM_MESES = 12
+MESES_FERIAS = [6]
+
+
+@pytest.fixture
+def cobertura() -> CoberturaMeses:
+    return CoberturaMeses(NUM_MESES, MESES_FERIAS, (3, 4))
+
+
+@pytest.fixture
+def projetos():
+    return [
+        Projeto('ALFA', 4, 2, 3, 0, 5, 9),
+        Projeto('BETA', 3, 3, 4, 1, 5, 11),
+    ]
+
+
+@pytest.fixture
+def cronograma():
+    """Cronograma no formato do Estágio 1, com inícios dentro das janelas dos projetos."""
+    return {
+        'ALFA': [{'mes_inicio': 0, 'num_turmas': 2, 'habilidade': 'PROG'},
+                 {'mes_inicio': 2, 'num_turmas': 2, 'habilidade': 'PROG'},
+                 {'mes_inicio': 1, 'num_turmas': 2, 'habilidade': 'ROB'}],
+        'BETA': [{'mes_inicio': 3, 'num_turmas': 3, 'habilidade': 'PROG'},
+                 {'mes_inicio': 1, 'num_turmas': 2, 'habilidade': 'ROB'},
+                 {'mes_inicio': 4, 'num_turmas': 1, 'habilidade': 'ROB'}],
+    }
+
+
+@pytest.fixture
+def turmas(cronograma, projetos):
+    from otimizador.core.stage_2 import _criar_turmas
+    return list(_criar_turmas(cronograma, projetos))
+
+
+@pytest.fixture
+def parametros() -> ParametrosOtimizacao:
+    return ParametrosOtimizacao(capacidade_max_instrutor=2, spread_maximo=1, meses_ferias=[], timeout_segundos=10,
+                                pico_maximo_turmas=10, num_workers_solver=2, semente_solver=1)
@@ -0,0 +1,101 @@
+# ARQUIVO: tests/test_avaliacao.py
+"""Avaliadores incrementais comparados com o recálculo completo a cada movimento."""
+
+from collections import defaultdict
+
+import numpy as np
+
+from otimizador.data_models import Atribuicoes, Instrutor
+from otimizador.core.avaliacao import (AvaliadorCronograma, AvaliadorCargas, demanda_mensal, cargas_mensais,
+                                       conclusoes_por_projeto, codigo_habilidade)
+from otimizador.core.heuristics import AvaliadorDemanda
+
+
+def _cronograma(contagens, projetos):
+    cronograma = defaultdict(list)
+    for (p, hab, mes), n in contagens.items():
+        if n:
+            cronograma[projetos[p].nome].append({'mes_inicio': mes, 'num_turmas': n, 'habilidade': hab})
+    return dict(cronograma)
+
+
+def test_demanda_e_conclusoes_iguais_ao_calculo_direto(turmas, cobertura):
+    demanda = np.zeros((2, cobertura.num_meses), dtype=np.int64)
+    for t in turmas:
+        demanda[codigo_habilidade(t.habilidade)] += cobertura.matriz(t.duracao)[t.mes_inicio]
+    assert (demanda_mensal(turmas, cobertura) == demanda).all()
+
+    conclusoes = conclusoes_por_projeto(turmas, cobertura)
+    assert conclusoes.sum() == len(turmas)
+    for t in turmas:
+        assert conclusoes[:, cobertura.mes_fim(t.duracao, t.mes_inicio)].sum() > 0
+
+
+def test_avaliador_cronograma_igual_ao_recalculo(cronograma, projetos, cobertura):
+    contagens = defaultdict(int)
+    indice = {p.nome: k for k, p in enumerate(projetos)}
+    for nome, itens in cronograma.items():
+        for item in itens:
+            contagens[(indice[nome], item['habilidade'], item['mes_inicio'])] += item['num_turmas']
+    avaliador = AvaliadorCronograma.do_cronograma(cronograma, projetos, cobertura)
+    custo = AvaliadorDemanda(cobertura, (p.duracao for p in projetos), pico_maximo=5)
+    custo.demanda = avaliador.demanda.copy()
+
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        (p, hab, origem), n = list(contagens.items())[rng.integers(len(contagens))]
+        if not n: continue
+        destino = int(rng.integers(projetos[p].inicio_min, projetos[p].inicio_max + 1))
+        k = int(rng.integers(1, n + 1))
+        codigo = codigo_habilidade(hab)
+
+        delta = avaliador.delta_mover(p, origem, destino, k)
+        esperado_delta = avaliador.demanda[codigo] + delta
+        custo_previsto = custo.custo_com_delta(codigo, delta)
+        avaliador.mover(p, codigo, origem, destino, k)
+        custo.mover(p, codigo, origem, destino, k)
+        contagens[(p, hab, origem)] -= k
+        contagens[(p, hab, destino)] += k
+
+        recalculado = AvaliadorCronograma.do_cronograma(_cronograma(contagens, projetos), projetos, cobertura)
+        assert (avaliador.demanda == recalculado.demanda).all()
+        assert (avaliador.conclusoes == recalculado.conclusoes).all()
+        assert (avaliador.demanda[codigo] == esperado_delta).all()
+        assert custo.custo() == custo_previsto
+    assert avaliador.picos() == (int(avaliador.demanda[0].max()), int(avaliador.demanda[1].max()))
+
+
+def test_avaliador_cargas_igual_ao_recalculo(turmas, cobertura):
+    rng = np.random.default_rng(1)
+    linhas = cobertura.linhas([t.duracao for t in turmas], [t.mes_inicio for t in turmas]).astype(np.int64)
+    num_instrutores = 4
+    vetor = rng.integers(0, num_instrutores, size=len(turmas))
+    avaliador = AvaliadorCargas(linhas, vetor.copy(), num_instrutores)
+
+    for _ in range(200):
+        turma, destino = int(rng.integers(len(turmas))), int(rng.integers(num_instrutores))
+        previstos = avaliador.totais_com_reatribuicao(turma, destino)
+        cabe = avaliador.cabe(turma, destino, 3)
+        carga_destino = avaliador.carga_mensal[destino] + linhas[turma]
+        avaliador.reatribuir(turma, destino)
+        vetor[turma] = destino
+
+        recalculado = AvaliadorCargas(linhas, vetor.copy(), num_instrutores)
+        assert (avaliador.carga_mensal == recalculado.carga_mensal).all()
+        assert (avaliador.totais == recalculado.totais).all()
+        assert (avaliador.totais == previstos).all()
+        assert cabe == bool((carga_destino <= 3).all())
+        assert avaliador.spread() == recalculado.spread()
+
+
+def test_avaliador_cargas_das_atribuicoes(turmas, cobertura):
+    instrutores = [Instrutor(f'PROG_{k}', 'PROG', 2, None) for k in range(3)]
+    atribuicoes = Atribuicoes(turmas, instrutores, np.arange(len(turmas)) % 3)
+    avaliador = AvaliadorCargas.de_atribuicoes(atribuicoes, cobertura)
+    assert (avaliador.carga_mensal == cargas_mensais(list(atribuicoes), cobertura)).all()
+    assert avaliador.totais.tolist() == atribuicoes.cargas().tolist()
+
+    novo = avaliador.abrir_instrutor()
+    assert novo == 3 and avaliador.totais[novo] == 0 and not avaliador.carga_mensal[novo].any()
+    avaliador.reatribuir(0, novo)
+    assert avaliador.totais.sum() == len(turmas)
@@ -0,0 +1,38 @@
+# ARQUIVO: tests/test_backends.py
+"""Mesmo modelo linear nos três backends: construção, dicas, resolução e leitura em bloco."""
+
+import pytest
+
+from otimizador.core.backends import BackendSolver, criar_backend
+from otimizador.data_models import ParametrosOtimizacao
+
+
+def test_interface_abstrata():
+    with pytest.raises(TypeError):
+        BackendSolver()
+
+
+def test_backend_desconhecido():
+    with pytest.raises(ValueError):
+        criar_backend('gurobi', ParametrosOtimizacao())
+
+
+@pytest.mark.parametrize("nome", ['cpsat', 'scip', 'cbc'])
+def test_modelo_linear_pequeno(nome):
+    backend = criar_backend(nome, ParametrosOtimizacao(num_workers_solver=1))
+    x = [backend.nova_inteira(0, 5, f'x_{k}') for k in range(4)]
+    usado = backend.nova_booleana('usado')
+    backend.adicionar(backend.soma(x) >= 7)
+    backend.adicionar(x[0] + x[1] <= 3)
+    backend.adicionar(x[3] <= 5 * usado)
+    backend.minimizar(backend.soma([2 * x[0], x[1], 3 * x[2], 4 * x[3]]) + 10 * usado)
+    backend.dica(x[2], 4)
+    solucoes = []
+
+    assert backend.resolver(10, lambda valor, objetivo: solucoes.append(objetivo)) == 'OPTIMAL'
+    # x1 = 3 e x2 = 4 (custo 3 + 12); usar x3 custaria a parcela fixa de 10
+    assert backend.valor_objetivo() == pytest.approx(15)
+    assert backend.valores(x).tolist() == [backend.valor(v) for v in x] == [0, 3, 4, 0]
+    assert backend.valor(usado) == 0
+    assert solucoes and solucoes[-1] == pytest.approx(15)
+    assert backend.limite_objetivo() == pytest.approx(15)
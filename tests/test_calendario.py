@@ -0,0 +1,69 @@
+# ARQUIVO: tests/test_calendario.py
+"""Índice de cobertura de meses e janelas de início comparados com o cálculo mês a mês."""
+
+import numpy as np
+import pytest
+
+from otimizador.calendario import CoberturaMeses
+from otimizador.utils import calcular_meses_ativos
+
+CENARIOS = [
+    (12, [6], (3, 4)),
+    (24, [0, 6, 11, 12, 18, 23], (1, 5, 8)),
+    (10, [], (2, 10, 11)),
+]
+
+
+@pytest.mark.parametrize("num_meses, ferias, duracoes", CENARIOS)
+def test_meses_ativos_iguais_ao_calculo_direto(num_meses, ferias, duracoes):
+    cobertura = CoberturaMeses(num_meses, ferias, duracoes)
+    for duracao in duracoes:
+        matriz = cobertura.matriz(duracao)
+        for inicio in range(num_meses):
+            esperado = calcular_meses_ativos(inicio, duracao, ferias, num_meses)
+            assert list(cobertura.meses_ativos(duracao, inicio)) == esperado
+            assert np.flatnonzero(matriz[inicio]).tolist() == esperado
+            assert cobertura.mes_fim(duracao, inicio) == (esperado[-1] if esperado else -1)
+            assert cobertura.completa(duracao, inicio) == (len(esperado) == duracao)
+
+
+def test_linhas_e_meses_fim_em_bloco(cobertura):
+    duracoes = np.array([3, 4, 3, 4, 7])
+    inicios = np.array([0, 5, 11, 2, 1])
+    linhas = cobertura.linhas(duracoes, inicios)
+    for k, (d, s) in enumerate(zip(duracoes, inicios)):
+        assert (linhas[k] == cobertura.matriz(int(d))[s]).all()
+    assert cobertura.meses_fim(duracoes, inicios).tolist() == [cobertura.mes_fim(int(d), int(s))
+                                                                for d, s in zip(duracoes, inicios)]
+
+
+def test_matrizes_somente_leitura(cobertura):
+    with pytest.raises(ValueError):
+        cobertura.matriz(3)[0, 0] = False
+
+
+def _janela_forca_bruta(cobertura: CoberturaMeses, inicio: int, termino: int, duracao: int):
+    """Inícios que concluem até o término, testados um a um."""
+    termino = min(termino, cobertura.num_meses - 1)
+    validos = [s for s in range(inicio, termino + 1)
+               if cobertura.completa(duracao, s) and cobertura.mes_fim(duracao, s) <= termino]
+    folga = int(cobertura.letivo[inicio:termino + 1].sum()) - duracao
+    fim_mais_cedo = cobertura.mes_fim(duracao, inicio) if cobertura.completa(duracao, inicio) else -1
+    return (validos[0] if validos else -1), (validos[-1] if validos else -1), folga, fim_mais_cedo
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_janelas_inicio_iguais_a_forca_bruta(semente):
+    rng = np.random.default_rng(semente)
+    num_meses = int(rng.integers(6, 30))
+    ferias = sorted(rng.choice(num_meses, size=int(rng.integers(0, num_meses // 3 + 1)), replace=False).tolist())
+    cobertura = CoberturaMeses(num_meses, ferias)
+    inicios = rng.integers(0, num_meses, size=40)
+    terminos = inicios + rng.integers(0, num_meses + 3, size=40)
+    duracoes = rng.integers(1, 10, size=40)
+
+    janelas = cobertura.janelas_inicio(inicios, terminos, duracoes)
+    for k in range(len(inicios)):
+        esperado = _janela_forca_bruta(cobertura, int(inicios[k]), int(terminos[k]), int(duracoes[k]))
+        obtido = tuple(int(janelas[campo][k]) for campo in ('inicio_min', 'inicio_max', 'folga', 'fim_mais_cedo'))
+        assert obtido == esperado, f"projeto {k}: início {inicios[k]}, término {terminos[k]}, duração {duracoes[k]}"
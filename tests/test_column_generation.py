@@ -0,0 +1,71 @@
+# ARQUIVO: tests/test_column_generation.py
+"""Motor de geração de colunas: escalas viáveis, atribuição válida e limites inferiores coerentes."""
+
+from collections import defaultdict
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from otimizador.calendario import CoberturaMeses
+from otimizador.data_models import Turma
+from otimizador.core.column_generation import resolver_por_geracao_colunas, _precificar, _tipos_de_turma
+from otimizador.core.heuristics import construir_atribuicao_heuristica
+from otimizador.core.stage_2 import calcular_limites_inferiores
+from verificacao import verificar_atribuicao
+
+
+def _resolver(turmas, cobertura, parametros):
+    iniciais = construir_atribuicao_heuristica(turmas, cobertura.num_meses, cobertura,
+                                               parametros.capacidade_max_instrutor, parametros.spread_maximo)
+    return resolver_por_geracao_colunas(turmas, cobertura.num_meses, cobertura, parametros, iniciais)
+
+
+def _verificar(resultado, turmas, cobertura, parametros):
+    """Atribuição completa e viável; limites inferiores abaixo do número de instrutores usados."""
+    atribuicoes = resultado['atribuicoes']
+    verificar_atribuicao(atribuicoes, turmas, cobertura, parametros.capacidade_max_instrutor)
+
+    turmas_por_habilidade = defaultdict(list)
+    for t in turmas: turmas_por_habilidade[t.habilidade].append(t)
+    picos = calcular_limites_inferiores(turmas_por_habilidade, parametros.capacidade_max_instrutor,
+                                        cobertura.num_meses, cobertura)
+    usados = defaultdict(set)
+    for atr in atribuicoes:
+        usados[atr['instrutor'].habilidade].add(atr['instrutor'].id)
+    for hab in turmas_por_habilidade:
+        assert resultado['limite_inferior'][hab] <= len(usados[hab])
+        assert resultado['limite_lp'][hab] <= len(usados[hab]) + 1e-6
+        assert picos[hab] <= len(usados[hab])
+    return {hab: len(ids) for hab, ids in usados.items()}
+
+
+def test_instancia_pequena_com_otimo_provado(turmas, cobertura, parametros):
+    resultado = _resolver(turmas, cobertura, parametros)
+    usados = _verificar(resultado, turmas, cobertura, parametros)
+    assert resultado['otimo']
+    assert usados == {'PROG': 3, 'ROBOTICA': 2}
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_instancias_aleatorias(semente, parametros):
+    rng = np.random.default_rng(semente)
+    cobertura = CoberturaMeses(24, [6, 18])
+    turmas = [Turma(f'P_{"PRO" if k % 3 else "ROB"}_{k}', 'P', 'PROG' if k % 3 else 'ROBOTICA',
+                    int(rng.integers(0, 18)), int(rng.integers(2, 6))) for k in range(50)]
+    parametros = replace(parametros, capacidade_max_instrutor=3, spread_maximo=4)
+    _verificar(_resolver(turmas, cobertura, parametros), turmas, cobertura, parametros)
+
+
+def test_coluna_do_preco_respeita_a_capacidade(turmas, cobertura, parametros):
+    turmas_prog = [t for t in turmas if t.habilidade == 'PROG']
+    tipos, posicoes = _tipos_de_turma(turmas_prog)
+    demanda = np.array([len(p) for p in posicoes])
+    ativos = np.array([cobertura.matriz(d)[m] for d, m in tipos], dtype=bool)
+    duais = np.linspace(0.2, 0.9, len(tipos))
+
+    coluna, limite = _precificar(duais, ativos, demanda, parametros.capacidade_max_instrutor, parametros, 5.0)
+    assert coluna is not None
+    assert ((coluna[:, None] * ativos).sum(axis=0) <= parametros.capacidade_max_instrutor).all()
+    assert (coluna <= demanda).all()
+    assert float(duais @ coluna) <= limite + 1e-6
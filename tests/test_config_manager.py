@@ -0,0 +1,31 @@
+# ARQUIVO: tests/test_config_manager.py
+"""Solução salva para warm start: associada à configuração nomeada em uso."""
+
+import pytest
+
+from otimizador.io import config_manager
+
+
+@pytest.fixture
+def diretorio_solucoes(monkeypatch, tmp_path):
+    monkeypatch.setattr(config_manager, 'SOLUCOES_DIR', tmp_path / 'solucoes')
+    monkeypatch.setattr(config_manager, '_nome_config_ativa', None)
+    return tmp_path / 'solucoes'
+
+
+def test_sem_configuracao_nomeada_nada_e_salvo_nem_carregado(diretorio_solucoes, cronograma):
+    meses = [f'M{m}' for m in range(12)]
+    assert not config_manager.salvar_solucao({'cronograma': cronograma}, {'atribuicoes': []}, meses)
+    assert not diretorio_solucoes.exists()
+    assert config_manager.carregar_solucao(meses) is None
+
+
+def test_solucao_fica_ao_lado_da_configuracao(diretorio_solucoes, monkeypatch, cronograma):
+    meses = [f'M{m}' for m in range(12)]
+    monkeypatch.setattr(config_manager, '_nome_config_ativa', 'turma_a')
+    assert config_manager.salvar_solucao({'cronograma': cronograma}, {'atribuicoes': []}, meses)
+    assert (diretorio_solucoes / 'turma_a.json').exists()
+    assert config_manager.carregar_solucao(meses)['cronograma'] == cronograma
+
+    monkeypatch.setattr(config_manager, '_nome_config_ativa', 'turma_b')
+    assert config_manager.carregar_solucao(meses) is None
@@ -0,0 +1,102 @@
+# ARQUIVO: tests/test_estagio1.py
+"""Estágio 1 na instância pequena, comparado com a enumeração de todos os cronogramas."""
+
+from dataclasses import replace
+from functools import lru_cache
+from itertools import product
+
+import numpy as np
+import pytest
+
+from otimizador.calendario import CoberturaMeses
+from otimizador.data_models import Projeto
+from otimizador.core.feasibility import limites_inferiores_pico
+from otimizador.core.heuristics import nivelar_demanda_heuristica
+from otimizador.core.stage_1 import otimizar_curva_demanda
+
+
+def _distribuicoes(total: int, partes: int):
+    """Todas as formas de distribuir `total` turmas entre `partes` meses de início."""
+    if partes == 1:
+        yield (total,)
+        return
+    for primeiro in range(total + 1):
+        for resto in _distribuicoes(total - primeiro, partes - 1):
+            yield (primeiro,) + resto
+
+
+def picos_minimos(projetos, cobertura):
+    """Menor pico possível de cada habilidade ('PROG', 'ROB'), por enumeração."""
+    @lru_cache(maxsize=None)
+    def demandas(p: int, campo: str):
+        proj = projetos[p]
+        validos = cobertura.inicios_letivos(proj.inicio_min, proj.inicio_max)
+        linhas = cobertura.matriz(proj.duracao)[validos].astype(np.int64)
+        return [np.asarray(d) @ linhas for d in _distribuicoes(getattr(proj, campo), len(validos))]
+
+    return {hab: min(int(sum(combinacao).max())
+                     for combinacao in product(*(demandas(p, campo) for p in range(len(projetos)))))
+            for hab, campo in (('PROG', 'prog'), ('ROB', 'rob'))}
+
+
+def _verificar_contagens(contagens, projetos, cobertura):
+    """Totais por projeto e habilidade e inícios em meses letivos dentro da janela; retorna os picos."""
+    demanda = {'PROG': np.zeros(cobertura.num_meses, dtype=np.int64),
+               'ROB': np.zeros(cobertura.num_meses, dtype=np.int64)}
+    por_projeto = {p.nome: p for p in projetos}
+    for proj in projetos:
+        for hab, total in (('PROG', proj.prog), ('ROB', proj.rob)):
+            assert sum(n for (nome, h, _), n in contagens.items() if nome == proj.nome and h == hab) == total
+    for (nome, hab, mes), n in contagens.items():
+        proj = por_projeto[nome]
+        assert mes in cobertura.inicios_letivos(proj.inicio_min, proj.inicio_max)
+        demanda[hab] += n * cobertura.matriz(proj.duracao)[mes]
+    return int(demanda['PROG'].max()), int(demanda['ROB'].max())
+
+
+def test_heuristica_de_nivelamento(projetos, cobertura):
+    resultado = nivelar_demanda_heuristica(projetos, cobertura, cobertura.meses_ferias_idx, pico_maximo=10)
+    picos = _verificar_contagens(resultado['contagens'], projetos, cobertura)
+    assert picos == (resultado['pico_prog'], resultado['pico_rob'])
+    assert resultado['excesso'] == 0
+
+    minimos = picos_minimos(projetos, cobertura)
+    assert resultado['pico_prog'] >= minimos['PROG'] and resultado['pico_rob'] >= minimos['ROB']
+
+
+def _contagens(cronograma):
+    return {(nome, item['habilidade'], item['mes_inicio']): item['num_turmas']
+            for nome, itens in cronograma.items() for item in itens}
+
+
+@pytest.mark.parametrize("motor, backend", [('cpsat', 'cpsat'), ('cpsat', 'scip'), ('heuristica', 'cpsat')])
+def test_motores_do_estagio1(motor, backend, projetos, cobertura, parametros):
+    parametros = replace(parametros, motor_estagio1=motor, backend_estagio1=backend)
+    resultado = otimizar_curva_demanda(projetos, [f'M{m}' for m in range(cobertura.num_meses)], parametros, cobertura)
+    picos = _verificar_contagens(_contagens(resultado['cronograma']), projetos, cobertura)
+    assert picos == (resultado['pico_prog'], resultado['pico_rob'])
+
+    minimos = picos_minimos(projetos, cobertura)
+    if motor == 'heuristica':
+        assert resultado['status_solver'] == 'HEURISTICA'
+        assert resultado['pico_max'] >= minimos['PROG'] + minimos['ROB']
+    else:
+        assert resultado['status_solver'] == 'OPTIMAL'
+        assert resultado['pico_max'] == minimos['PROG'] + minimos['ROB']
+
+
+@pytest.mark.parametrize("semente", range(6))
+def test_limites_inferiores_dos_picos(semente, projetos, cobertura):
+    if semente:
+        # Um único mês de férias e janelas de pelo menos dois meses: sempre há início válido
+        rng = np.random.default_rng(semente)
+        cobertura = CoberturaMeses(10, [int(rng.integers(0, 10))])
+        projetos = []
+        for k in range(3):
+            inicio = int(rng.integers(0, 5))
+            projetos.append(Projeto(f'P{k}', int(rng.integers(0, 4)), int(rng.integers(0, 3)),
+                                    int(rng.integers(1, 4)), inicio, inicio + int(rng.integers(1, 3)), 9))
+    limites = limites_inferiores_pico(projetos, cobertura)
+    minimos = picos_minimos(projetos, cobertura)
+    assert limites['PROG'] <= minimos['PROG']
+    assert limites['ROB'] <= minimos['ROB']
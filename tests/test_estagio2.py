@@ -0,0 +1,86 @@
+# ARQUIVO: tests/test_estagio2.py
+"""Cada motor do Estágio 2 devolve uma atribuição válida na instância pequena."""
+
+from dataclasses import replace
+
+import pytest
+
+from otimizador.core.stage_2 import otimizar_atribuicao_e_carga, _janelas_horizonte
+from verificacao import verificar_atribuicao
+
+# Instrutores mínimos da instância pequena com capacidade 2: picos de 5 turmas PROG e 4 ROB (3 + 2)
+MINIMO_INSTRUTORES = 5
+
+CASOS = [
+    {'motor_estagio2': 'turmas'},
+    {'motor_estagio2': 'coortes'},
+    {'motor_estagio2': 'coortes', 'decompor_por_habilidade': True},
+    {'motor_estagio2': 'intervalos'},
+    {'motor_estagio2': 'coortes', 'horizonte_rolante': True, 'janela_meses': 6, 'sobreposicao_meses': 2},
+    {'motor_estagio2': 'geracao_colunas'},
+    {'motor_estagio2': 'turmas', 'backend_estagio2': 'scip'},
+    {'motor_estagio2': 'coortes', 'backend_estagio2': 'cbc'},
+    {'motor_estagio2': 'heuristica'},
+]
+
+
+def _otimizar(cronograma, projetos, cobertura, parametros, **ajustes):
+    meses = [f'M{m}' for m in range(cobertura.num_meses)]
+    return otimizar_atribuicao_e_carga(cronograma, projetos, meses, cobertura.meses_ferias_idx,
+                                       replace(parametros, **ajustes), cobertura)
+
+
+def verificar_resultado(resultado, turmas, cobertura, parametros):
+    """Todas as turmas atribuídas uma vez, habilidade e capacidade mensal respeitadas e spread coerente."""
+    assert resultado['status'] == 'sucesso'
+    verificar_atribuicao(list(resultado['atribuicoes']), turmas, cobertura, parametros.capacidade_max_instrutor)
+
+    totais = resultado['carga_por_instrutor']
+    assert sum(totais.values()) == len(turmas)
+    assert resultado['total_instrutores_flex'] == len(totais)
+    assert resultado['spread_carga'] == max(totais.values()) - min(totais.values())
+
+
+@pytest.mark.parametrize("ajustes", CASOS, ids=lambda a: '-'.join(str(v) for v in a.values()))
+def test_motores_do_estagio2(ajustes, cronograma, projetos, turmas, cobertura, parametros):
+    resultado = _otimizar(cronograma, projetos, cobertura, parametros, **ajustes)
+    verificar_resultado(resultado, turmas, cobertura, parametros)
+    assert resultado['total_instrutores_flex'] >= MINIMO_INSTRUTORES
+    assert resultado['spread_carga'] <= parametros.spread_maximo
+    if resultado['otimo_comprovado']:
+        assert resultado['total_instrutores_flex'] == MINIMO_INSTRUTORES
+
+
+def test_modo_deterministico_reproduz_a_atribuicao(cronograma, projetos, cobertura, parametros):
+    execucoes = [_otimizar(cronograma, projetos, cobertura, parametros, motor_estagio2='turmas',
+                           modo_deterministico=True, semente_solver=3) for _ in range(2)]
+    assert [atr['instrutor'].id for atr in execucoes[0]['atribuicoes']] == \
+        [atr['instrutor'].id for atr in execucoes[1]['atribuicoes']]
+
+
+@pytest.mark.parametrize("num_meses, janela, sobreposicao", [(12, 6, 2), (30, 12, 3), (10, 12, 3), (9, 3, 0)])
+def test_janelas_do_horizonte_rolante(num_meses, janela, sobreposicao):
+    janelas = _janelas_horizonte(num_meses, janela, sobreposicao)
+    passo = janela - sobreposicao
+    # Janela k cobre [k * passo, k * passo + janela) e congela as turmas que começam antes de (k + 1) * passo
+    for k, (fim, congelar) in enumerate(janelas[:-1]):
+        assert (fim, congelar) == (k * passo + janela, (k + 1) * passo)
+        assert fim < num_meses
+    # A última cobre o restante do horizonte (no máximo uma janela) e congela tudo
+    assert janelas[-1] == (num_meses, num_meses)
+    assert num_meses - (len(janelas) - 1) * passo <= janela
+
+
+@pytest.mark.parametrize("motor", ['turmas', 'coortes'])
+@pytest.mark.parametrize("objetivo", ['lexicografico', 'ponderado'])
+def test_spread_maximo_e_restricao_nos_dois_objetivos(motor, objetivo, cronograma, projetos, turmas, cobertura,
+                                                        parametros):
+    # Spread 0 com 7 turmas PROG e 5 ROB exige uma turma por instrutor; sem peso de spread, o objetivo
+    # ponderado preferiria o número mínimo de instrutores se o spread fosse apenas penalizado
+    parametros = replace(parametros, spread_maximo=0, peso_spread=0)
+    resultado = _otimizar(cronograma, projetos, cobertura, parametros, motor_estagio2=motor,
+                          objetivo_estagio2=objetivo)
+    verificar_resultado(resultado, turmas, cobertura, parametros)
+    assert resultado['status_solver'] in ('OPTIMAL', 'FEASIBLE')
+    assert resultado['spread_carga'] == 0
+    assert resultado['total_instrutores_flex'] == len(turmas)
@@ -0,0 +1,57 @@
+# ARQUIVO: tests/test_extracao.py
+"""Extração em bloco das atribuições do Estágio 2 comparada com a leitura variável a variável."""
+
+from collections import Counter, defaultdict
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from otimizador.core.backends import BackendCpSat, STATUS_COM_SOLUCAO
+from otimizador.core.stage_2 import _construir_modelo, _criar_pool_instrutores, _extrair_atribuicoes
+
+
+def _resolver_modelo(turmas, parametros, cobertura):
+    turmas_por_habilidade = defaultdict(list)
+    for t in turmas: turmas_por_habilidade[t.habilidade].append(t)
+    instrutores = _criar_pool_instrutores({'PROG': 5, 'ROBOTICA': 3}, parametros.capacidade_max_instrutor)
+    modelo = _construir_modelo(BackendCpSat(parametros), turmas, turmas_por_habilidade, instrutores, parametros,
+                               cobertura.num_meses, cobertura)
+    assert modelo["backend"].resolver(10) in STATUS_COM_SOLUCAO
+    return modelo
+
+
+def test_extracao_por_turma(turmas, parametros, cobertura):
+    modelo = _resolver_modelo(turmas, replace(parametros, motor_estagio2='turmas'), cobertura)
+    backend = modelo["backend"]
+    esperado = {id_turma: id_instrutor for (id_turma, id_instrutor), var in modelo["alocacao"].items()
+                if backend.valor(var)}
+
+    atribuicoes = _extrair_atribuicoes(modelo, turmas)
+    assert len(atribuicoes) == len(turmas)
+    assert {atr['turma'].id: atr['instrutor'].id for atr in atribuicoes} == esperado
+
+
+def test_extracao_por_coorte(turmas, parametros, cobertura):
+    modelo = _resolver_modelo(turmas, replace(parametros, motor_estagio2='coortes'), cobertura)
+    backend = modelo["backend"]
+    esperado = Counter({(c_idx, id_instrutor): backend.valor(var)
+                        for (c_idx, id_instrutor), var in modelo["alocacao"].items() if backend.valor(var)})
+
+    atribuicoes = _extrair_atribuicoes(modelo, turmas)
+    coorte_da_turma = {t.id: c_idx for c_idx, (_, turmas_coorte) in enumerate(modelo["coortes"]) for t in turmas_coorte}
+    obtido = Counter((coorte_da_turma[atr['turma'].id], atr['instrutor'].id) for atr in atribuicoes)
+    assert obtido == esperado
+    assert sorted(atr['turma'].id for atr in atribuicoes) == sorted(t.id for t in turmas)
+
+
+@pytest.mark.parametrize("motor", ['turmas', 'coortes'])
+def test_extracao_respeita_capacidade_e_habilidade(motor, turmas, parametros, cobertura):
+    modelo = _resolver_modelo(turmas, replace(parametros, motor_estagio2=motor), cobertura)
+    atribuicoes = _extrair_atribuicoes(modelo, turmas)
+    carga = defaultdict(lambda: np.zeros(cobertura.num_meses, dtype=np.int64))
+    for atr in atribuicoes:
+        t, i = atr['turma'], atr['instrutor']
+        assert t.habilidade == i.habilidade
+        carga[i.id] += cobertura.matriz(t.duracao)[t.mes_inicio]
+    assert all((c <= parametros.capacidade_max_instrutor).all() for c in carga.values())
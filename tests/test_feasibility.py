@@ -0,0 +1,66 @@
+# ARQUIVO: tests/test_feasibility.py
+"""Pré-verificação de viabilidade do Estágio 1: cada verificação em um caso que só ela detecta."""
+
+import pytest
+
+from otimizador.calendario import CoberturaMeses
+from otimizador.core.feasibility import analisar_viabilidade
+from otimizador.data_models import ConfiguracaoProjeto, ParametrosOtimizacao
+from otimizador.utils import gerar_lista_meses
+
+
+@pytest.fixture
+def meses():
+    return gerar_lista_meses('01/01/2026', '31/12/2026')
+
+
+def _analisar(meses, projetos, pico_maximo, usar_nucleo_cpsat=True):
+    parametros = ParametrosOtimizacao(pico_maximo_turmas=pico_maximo, meses_ferias=['Jul/26'], timeout_segundos=10)
+    return analisar_viabilidade(projetos, meses, parametros, CoberturaMeses(len(meses), [6]), usar_nucleo_cpsat)
+
+
+def _projeto(nome, inicio, termino, num_turmas, duracao):
+    return ConfiguracaoProjeto(nome, inicio, termino, num_turmas, duracao)
+
+
+def test_instancia_viavel(meses):
+    projetos = [_projeto('A', '01/01/2026', '30/11/2026', 6, 3), _projeto('B', '01/02/2026', '31/12/2026', 4, 4)]
+    resultado = _analisar(meses, projetos, pico_maximo=10)
+    assert resultado['viavel'] is True
+    assert resultado['problemas'] == []
+
+
+def test_janela_vazia(meses):
+    # Março a junho tem 4 meses letivos; o curso precisa de 8
+    resultado = _analisar(meses, [_projeto('CURTO', '01/03/2026', '30/06/2026', 2, 8)], pico_maximo=10)
+    assert resultado['viavel'] is False
+    assert [p['tipo'] for p in resultado['problemas']] == ['janela_vazia']
+    assert resultado['problemas'][0]['projeto'] == 'CURTO'
+
+
+def test_pico_obrigatorio(meses):
+    # Sem folga: as 10 turmas estão ativas de janeiro a abril em qualquer cronograma
+    resultado = _analisar(meses, [_projeto('CHEIO', '01/01/2026', '30/04/2026', 10, 4)], pico_maximo=5,
+                          usar_nucleo_cpsat=False)
+    assert resultado['viavel'] is False
+    assert {p['tipo'] for p in resultado['problemas']} == {'pico_obrigatorio'}
+    assert len(resultado['problemas']) == 4
+
+
+def test_capacidade_do_periodo(meses):
+    # Nenhum mês é obrigatório, mas 3 x 6 turmas x 2 meses não cabem em 8 turmas x 4 meses letivos
+    projetos = [_projeto(nome, '01/01/2026', '30/04/2026', 6, 2) for nome in ('A', 'B', 'C')]
+    resultado = _analisar(meses, projetos, pico_maximo=8, usar_nucleo_cpsat=False)
+    assert resultado['viavel'] is False
+    assert [p['tipo'] for p in resultado['problemas']] == ['capacidade_periodo']
+
+
+def test_nucleo_inviavel_do_cpsat(meses):
+    # Passa nas verificações analíticas; só o modelo com suposições prova a inviabilidade
+    projetos = [_projeto('P0', '01/05/2026', '28/11/2026', 1, 3), _projeto('P1', '01/05/2026', '28/11/2026', 5, 3),
+                _projeto('P2', '01/08/2026', '28/12/2026', 1, 3)]
+    assert _analisar(meses, projetos, pico_maximo=3, usar_nucleo_cpsat=False)['viavel'] is True
+    resultado = _analisar(meses, projetos, pico_maximo=3)
+    assert resultado['viavel'] is False
+    assert [p['tipo'] for p in resultado['problemas']] == ['nucleo_inviavel']
+    assert 'P1' in resultado['problemas'][0]['projeto']
@@ -0,0 +1,71 @@
+# ARQUIVO: tests/test_heuristics.py
+"""Heurísticas construtivas: first-fit e balanceamento do Estágio 2."""
+
+import numpy as np
+import pytest
+
+from otimizador.calendario import CoberturaMeses
+from otimizador.data_models import Turma
+from otimizador.core.avaliacao import spread
+from otimizador.core.heuristics import _primeiro_encaixe, balancear_cargas, construir_atribuicao_heuristica
+from verificacao import verificar_atribuicao
+
+
+def _turmas_aleatorias(semente: int, num_meses: int, quantidade: int):
+    rng = np.random.default_rng(semente)
+    turmas = []
+    for k in range(quantidade):
+        habilidade = 'PROG' if rng.random() < 0.6 else 'ROBOTICA'
+        turmas.append(Turma(f'P{k % 3}_{habilidade[:3]}_{k}', f'P{k % 3}', habilidade,
+                            int(rng.integers(0, num_meses - 4)), int(rng.integers(2, 5))))
+    return turmas
+
+
+def test_atribuicao_da_instancia_pequena(turmas, cobertura, parametros):
+    atribuicoes = construir_atribuicao_heuristica(turmas, cobertura.num_meses, cobertura,
+                                                  parametros.capacidade_max_instrutor, parametros.spread_maximo)
+    verificar_atribuicao(atribuicoes, turmas, cobertura, parametros.capacidade_max_instrutor)
+    assert spread(atribuicoes.cargas()) <= parametros.spread_maximo
+
+
+@pytest.mark.parametrize("semente", range(4))
+@pytest.mark.parametrize("capacidade, spread_maximo", [(1, 0), (3, 2), (4, 5)])
+def test_atribuicao_aleatoria(semente, capacidade, spread_maximo):
+    cobertura = CoberturaMeses(24, [6, 18])
+    turmas = _turmas_aleatorias(semente, 24, 60)
+    atribuicoes = construir_atribuicao_heuristica(turmas, 24, cobertura, capacidade, spread_maximo)
+    verificar_atribuicao(atribuicoes, turmas, cobertura, capacidade)
+    assert spread(atribuicoes.cargas()) <= spread_maximo
+
+
+def test_primeiro_encaixe_abre_instrutor_so_quando_nenhum_cabe():
+    cobertura = CoberturaMeses(24, [6, 18])
+    turmas = _turmas_aleatorias(7, 24, 40)
+    linhas = np.array([cobertura.matriz(t.duracao)[t.mes_inicio] for t in turmas], dtype=np.int32)
+    ordem = np.arange(len(turmas))
+    capacidade = 2
+    vetor = _primeiro_encaixe(linhas, ordem, capacidade)
+
+    cargas = np.zeros((len(turmas), 24), dtype=np.int64)
+    abertos = 0
+    for k in ordem:
+        cabe = [i for i in range(abertos) if ((cargas[i] + linhas[k]) <= capacidade).all()]
+        assert vetor[k] == (cabe[0] if cabe else abertos)
+        abertos = max(abertos, vetor[k] + 1)
+        cargas[vetor[k]] += linhas[k]
+
+
+def test_balanceamento_mantem_capacidade_e_reduz_spread():
+    cobertura = CoberturaMeses(12, [])
+    # Oito turmas de um mês em meses distintos: um instrutor recebe todas pelo first-fit
+    linhas = {'PROG': np.array([cobertura.matriz(1)[m] for m in range(8)], dtype=np.int32),
+              'ROBOTICA': np.array([cobertura.matriz(1)[m] for m in range(2)], dtype=np.int32)}
+    vetores = {'PROG': np.zeros(8, dtype=np.int64), 'ROBOTICA': np.array([0, 1])}
+    balancear_cargas(linhas, vetores, capacidade=1, spread_maximo=1)
+
+    totais = np.concatenate([np.bincount(v) for v in vetores.values()])
+    assert spread(totais) <= 1
+    for hab, vetor in vetores.items():
+        carga = np.zeros((len(vetor), 12), dtype=np.int64)
+        np.add.at(carga, vetor, linhas[hab])
+        assert carga.max() <= 1
@@ -0,0 +1,83 @@
+# ARQUIVO: tests/test_solver_config.py
+"""Configuração do solver, critério de parada e interrupção compartilhada entre processos."""
+
+import multiprocessing
+import threading
+import time
+from dataclasses import replace
+
+import pytest
+from ortools.sat.python import cp_model
+
+from otimizador.core import solver_config
+from otimizador.core.column_generation import resolver_por_geracao_colunas
+from otimizador.core.heuristics import construir_atribuicao_heuristica
+from verificacao import verificar_atribuicao
+from otimizador.data_models import ParametrosOtimizacao
+
+
+@pytest.fixture
+def interrupcao_isolada(monkeypatch):
+    """Estado de interrupção próprio do teste (o módulo guarda o Ctrl-C da execução inteira)."""
+    monkeypatch.setattr(solver_config, '_interrupcao', threading.Event())
+    monkeypatch.setattr(solver_config, '_interrupcao_externa', None)
+
+
+def test_evento_do_processo_pai_vale_como_interrupcao(interrupcao_isolada):
+    evento = multiprocessing.Event()
+    solver_config.vincular_interrupcao(evento)
+    assert not solver_config.execucao_interrompida()
+    evento.set()
+    assert solver_config.execucao_interrompida()
+
+
+def test_evento_do_processo_pai_para_a_busca_em_andamento(interrupcao_isolada):
+    evento, parado = multiprocessing.Event(), threading.Event()
+    solver_config.vincular_interrupcao(evento)
+    with solver_config.capturar_ctrl_c(parado.set):
+        evento.set()
+        assert parado.wait(5)
+    assert solver_config.execucao_interrompida()
+
+
+def test_semente_so_alterada_quando_informada():
+    padrao = cp_model.CpSolver().parameters.random_seed
+    solver = cp_model.CpSolver()
+    solver_config.configurar_solver(solver, ParametrosOtimizacao(), 30)
+    assert solver.parameters.random_seed == padrao
+    solver_config.configurar_solver(solver, ParametrosOtimizacao(semente_solver=padrao + 7), 30)
+    assert solver.parameters.random_seed == padrao + 7
+
+
+def test_modo_deterministico_limita_o_tempo_deterministico():
+    solver = cp_model.CpSolver()
+    solver_config.configurar_solver(solver, ParametrosOtimizacao(modo_deterministico=True), 30)
+    assert solver.parameters.max_deterministic_time == 30
+    assert solver.parameters.max_time_in_seconds > 30
+    assert solver.parameters.interleave_search
+
+    parametros = ParametrosOtimizacao(modo_deterministico=True, limite_tempo_deterministico=12.5)
+    solver_config.configurar_solver(solver, parametros, 30)
+    assert solver.parameters.max_deterministic_time == 12.5
+
+
+def test_sem_melhoria_medido_em_tempo_deterministico(interrupcao_isolada):
+    criterio = solver_config.CriterioParada(ParametrosOtimizacao(modo_deterministico=True, segundos_sem_melhoria=3))
+    assert not criterio.nova_solucao(10, tempo_deterministico=0.5)
+    assert not criterio.nova_solucao(9, tempo_deterministico=2.0)
+    assert criterio.nova_solucao(8, tempo_deterministico=5.5)
+    assert criterio.motivo == 'sem_melhoria'
+
+
+def test_geracao_de_colunas_para_na_interrupcao(interrupcao_isolada, turmas, cobertura, parametros):
+    solver_config._interrupcao.set()
+    iniciais = construir_atribuicao_heuristica(turmas, cobertura.num_meses, cobertura,
+                                               parametros.capacidade_max_instrutor, parametros.spread_maximo)
+    inicio = time.time()
+    resultado = resolver_por_geracao_colunas(turmas, cobertura.num_meses, cobertura,
+                                             replace(parametros, timeout_segundos=60), iniciais)
+    assert time.time() - inicio < 5
+    verificar_atribuicao(resultado['atribuicoes'], turmas, cobertura, parametros.capacidade_max_instrutor)
+    # Nenhuma iteração de preço (o limite LP fica zerado) e cobertura da heurística
+    assert all(limite == 0 for limite in resultado['limite_lp'].values())
+    assert not resultado['otimo']
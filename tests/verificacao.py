@@ -0,0 +1,17 @@
+# ARQUIVO: tests/verificacao.py
+"""Verificações compartilhadas pelos testes dos motores do Estágio 2."""
+
+from collections import defaultdict
+
+import numpy as np
+
+
+def verificar_atribuicao(atribuicoes, turmas, cobertura, capacidade):
+    """Cada turma uma única vez, com instrutor da mesma habilidade e carga mensal dentro da capacidade."""
+    assert sorted(atr['turma'].id for atr in atribuicoes) == sorted(t.id for t in turmas)
+    carga = defaultdict(lambda: np.zeros(cobertura.num_meses, dtype=np.int64))
+    for atr in atribuicoes:
+        t, i = atr['turma'], atr['instrutor']
+        assert t.habilidade == i.habilidade
+        carga[i.id] += cobertura.matriz(t.duracao)[t.mes_inicio]
+    assert all(int(c.max()) <= capacidade for c in carga.values())